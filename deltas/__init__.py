@@ -1,23 +1,62 @@
+import sys
+import types
+from importlib import import_module
+
 from .apply import apply
 from .operations import Operation, Insert, Delete, Equal
-from .algorithms.diff_engine import DiffEngine
-from .algorithms import segment_matcher, SegmentMatcher
-from .algorithms import sequence_matcher, SequenceMatcher
-from .tokenizers import (Token, Tokenizer, RegexTokenizer, text_split,
-                         wikitext_split)
-from .segmenters import (Segmenter, Segment, MatchableSegment,
-                         ParagraphsSentencesAndWhitespace)
-
 from .about import (__name__, __version__, __author__, __author_email__,
                     __description__, __license__, __url__)
 
-__all__ = [apply,
-           Operation, Insert, Delete, Equal,
-           DiffEngine,
-           segment_matcher, SegmentMatcher,
-           sequence_matcher, SequenceMatcher,
-           Token, Tokenizer, RegexTokenizer, text_split, wikitext_split,
-           Segmenter, Segment, MatchableSegment,
-           ParagraphsSentencesAndWhitespace,
-           __name__, __version__, __author__, __author_email__,
-           __description__, __license__, __url__]
+# Names are imported from their modules the first time that they are
+# accessed so that `import deltas` stays cheap.  Module-level __getattr__
+# needs Python 3.7 (PEP 562), so the module's class is swapped instead.
+_LAZY = {
+    'DiffEngine': ".algorithms.diff_engine",
+    'Budget': ".algorithms", 'BudgetExceeded': ".algorithms",
+    'segment_matcher': ".algorithms", 'SegmentMatcher': ".algorithms",
+    'sequence_matcher': ".algorithms", 'SequenceMatcher': ".algorithms",
+    'myers_diff': ".algorithms", 'MyersDiff': ".algorithms",
+    'histogram_diff': ".algorithms", 'HistogramDiff': ".algorithms",
+    'Token': ".tokenizers", 'TokenStream': ".tokenizers",
+    'Tokenizer': ".tokenizers", 'RegexTokenizer': ".tokenizers",
+    'Vocabulary': ".tokenizers",
+    'text_split': ".tokenizers", 'wikitext_split': ".tokenizers",
+    'Segmenter': ".segmenters", 'Segment': ".segmenters",
+    'MatchableSegment': ".segmenters", 'SegmentTree': ".segmenters",
+    'ParagraphsSentencesAndWhitespace': ".segmenters",
+    'SectionsParagraphsSentencesAndWhitespace': ".segmenters"
+}
+
+__all__ = ['apply',
+           'Operation', 'Insert', 'Delete', 'Equal',
+           'DiffEngine', 'Budget', 'BudgetExceeded',
+           'segment_matcher', 'SegmentMatcher',
+           'sequence_matcher', 'SequenceMatcher',
+           'myers_diff', 'MyersDiff',
+           'histogram_diff', 'HistogramDiff',
+           'Token', 'TokenStream', 'Tokenizer', 'RegexTokenizer',
+           'Vocabulary', 'text_split', 'wikitext_split',
+           'Segmenter', 'Segment', 'MatchableSegment', 'SegmentTree',
+           'ParagraphsSentencesAndWhitespace',
+           'SectionsParagraphsSentencesAndWhitespace',
+           '__name__', '__version__', '__author__', '__author_email__',
+           '__description__', '__license__', '__url__']
+
+
+class _LazyModule(types.ModuleType):
+
+    def __getattr__(self, name):
+        if name not in _LAZY:
+            raise AttributeError(
+                "module {0!r} has no attribute {1!r}".format(__package__,
+                                                             name))
+
+        value = getattr(import_module(_LAZY[name], __package__), name)
+        setattr(self, name, value)
+        return value
+
+    def __dir__(self):
+        return sorted(set(self.__dict__) | set(_LAZY))
+
+
+sys.modules[__package__].__class__ = _LazyModule
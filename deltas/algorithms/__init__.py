@@ -1,6 +1,6 @@
 """
 The primary use-case of this library is to detect differences between two
-sequences of tokens.  So far, two such algorithmic strategies are available:
+sequences of tokens.  So far, four such algorithmic strategies are available:
 
 :class:`~deltas.algorithms.sequence_matcher`
     implementes :func:`~deltas.algorithms.sequence_matcher.diff` that will
@@ -9,9 +9,20 @@ sequences of tokens.  So far, two such algorithmic strategies are available:
 :class:`~deltas.algorithms.segment_matcher`
     implementes :func:`~deltas.algorithms.segment_matcher.diff` that
     uses a :class:`~deltas.Segmenter` to detect block moves
-
-Both of these algorithms are supplimented with a :class:`deltas.DiffEngine`
-for efficiently processing several revisions of the same text
+:class:`~deltas.algorithms.myers_diff`
+    implementes :func:`~deltas.algorithms.myers_diff.diff` that finds a
+    shortest edit script in time proportional to the size of the change.
+    It can also be used by
+    :func:`~deltas.algorithms.segment_matcher.diff_segments` in place of
+    :func:`~deltas.algorithms.sequence_matcher.diff`.
+:class:`~deltas.algorithms.histogram_diff`
+    implementes :func:`~deltas.algorithms.histogram_diff.diff` that anchors
+    on rare tokens in the style of ``git diff --histogram``.  It can also be
+    used by :func:`~deltas.algorithms.segment_matcher.diff_segments`.
+
+All of these algorithms are supplimented with a :class:`deltas.DiffEngine`
+for efficiently processing several revisions of the same text.  Their work
+can be limited with a :class:`deltas.Budget`.
 
 Implemented Algorithms
 ----------------------
@@ -24,13 +35,29 @@ Sequence Matcher
 ++++++++++++++++
 .. automodule:: deltas.algorithms.sequence_matcher
 
+Myers Diff
+++++++++++
+.. automodule:: deltas.algorithms.myers_diff
+
+Histogram Diff
+++++++++++++++
+.. automodule:: deltas.algorithms.histogram_diff
+
 Diff engine
 -----------
 .. automodule:: deltas.algorithms.diff_engine
+
+Budgets
+-------
+.. automodule:: deltas.algorithms.budget
 """
+from .budget import Budget, BudgetExceeded
 from .diff_engine import DiffEngine
+from .histogram_diff import HistogramDiff
+from .myers_diff import MyersDiff
 from .segment_matcher import SegmentMatcher
 from .sequence_matcher import SequenceMatcher
 
 
-__all__ = [DiffEngine, SegmentMatcher, SequenceMatcher]
+__all__ = [Budget, BudgetExceeded, DiffEngine, HistogramDiff, MyersDiff,
+           SegmentMatcher, SequenceMatcher]
@@ -0,0 +1,103 @@
+"""
+Limits the work that a diff may do.  A :class:`~deltas.Budget` counts
+comparisons and/or watches a wall-clock deadline.  The diff functions that
+accept a `budget` raise :class:`~deltas.BudgetExceeded` when it runs out.
+:func:`~deltas.algorithms.segment_matcher.diff_segments` catches it and falls
+back to cheaper strategies instead (see :data:`TIERS`).  The processors of
+the sequence engines (e.g. :class:`~deltas.SequenceMatcher`) fall straight
+back to ``"replace"``.
+
+.. autoclass:: deltas.Budget
+    :members:
+
+.. autoclass:: deltas.BudgetExceeded
+
+.. autoclass:: deltas.algorithms.budget.TieredOperations
+
+.. autodata:: deltas.algorithms.budget.TIERS
+"""
+import time
+
+FULL = "full"
+SEGMENTS = "segments"
+PARAGRAPHS = "paragraphs"
+REPLACE = "replace"
+TIERS = [FULL, SEGMENTS, PARAGRAPHS, REPLACE]
+"""
+The strategies of a bounded diff from the most to the least detailed:
+
+* ``"full"`` -- matched segments and tokens are diffed as usual
+* ``"segments"`` -- only matched segments are diffed; unmatched tokens are
+  deleted and inserted in runs
+* ``"paragraphs"`` -- whole top-level segments are diffed
+* ``"replace"`` -- the changed region is deleted and re-inserted
+"""
+
+
+class BudgetExceeded(RuntimeError):
+    """
+    Raised when a :class:`~deltas.Budget` runs out.
+    """
+    pass
+
+
+class Budget:
+    """
+    Constructs a budget for a diff.  The clock starts when the budget is
+    constructed or restarted.
+
+    :Parameters:
+        comparisons : `int`
+            The most comparisons that may be made.  Counts are estimates of
+            the work done by a diff's inner loops.
+        seconds : `float`
+            The most wall-clock time that may be spent
+    """
+    __slots__ = ('comparisons', 'seconds', 'spent', 'deadline')
+
+    def __init__(self, comparisons=None, seconds=None):
+        self.comparisons = comparisons
+        self.seconds = seconds
+        self.restart()
+
+    def restart(self):
+        """
+        Forgets all spending and restarts the clock.  Returns `self`.
+        """
+        self.spent = 0
+        self.deadline = time.monotonic() + self.seconds \
+            if self.seconds is not None else None
+        return self
+
+    def spend(self, comparisons=1):
+        """
+        Records `comparisons` and raises :class:`~deltas.BudgetExceeded` if
+        too many comparisons have been made or the deadline has passed.
+        """
+        self.spent += comparisons
+        if self.comparisons is not None and self.spent > self.comparisons:
+            raise BudgetExceeded("{0} comparisons is more than {1}"
+                                 .format(self.spent, self.comparisons))
+        if self.deadline is not None and time.monotonic() > self.deadline:
+            raise BudgetExceeded("{0} seconds have passed"
+                                 .format(self.seconds))
+
+    def __repr__(self):
+        return "{0}(comparisons={1}, seconds={2})".format(
+            self.__class__.__name__, self.comparisons, self.seconds)
+
+
+class TieredOperations(list):
+    """
+    A `list` of operations produced by a bounded diff.  `tier` is the name
+    of the strategy that produced them (see :data:`TIERS`).
+    """
+    __slots__ = ('tier',)
+
+    def __init__(self, operations=(), tier=FULL):
+        super().__init__(operations)
+        self.tier = tier
+
+    def __repr__(self):
+        return "{0}({1}, tier={2!r})".format(
+            self.__class__.__name__, super().__repr__(), self.tier)
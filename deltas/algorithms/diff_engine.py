@@ -6,7 +6,6 @@ state, various efficiencies can be implemented.
 .. autoclass:: deltas.DiffEngine
     :members:
 """
-import yamlconf
 
 
 class DiffEngine:
@@ -35,6 +34,8 @@ class DiffEngine:
         Constructs a :class:`deltas.DiffEngine` from a configuration
         doc.
         """
+        import yamlconf
+
         section = config[section_key][name]
         if 'module' in section:
             return yamlconf.import_module(section['module'])
@@ -0,0 +1,210 @@
+"""
+Histogram Diff
+--------------
+
+Performs a diff in the style of ``git diff --histogram``.  The tokens of `a`
+are counted and the longest run of matching tokens that contains the
+least-frequent token is used as an anchor.  The regions before and after the
+anchor are then diffed in the same way.  Frequent, low-information tokens
+such as whitespace, ``|``, ``[[`` and ``]]`` are never used to anchor a
+match on their own, so they can't pull unrelated parts of a page together.
+Regions that share no tokens rare enough to anchor on are diffed with
+:func:`~deltas.algorithms.myers_diff.diff`.
+
+.. autofunction:: deltas.algorithms.histogram_diff.diff
+
+.. autofunction:: deltas.algorithms.histogram_diff.process
+
+.. autoclass:: deltas.HistogramDiff
+    :members:
+"""
+from . import myers_diff, sequence_matcher
+
+MAX_OCCURRENCES = 64
+"""
+Tokens that occur more often than this in a region of `a` are not used as
+anchors
+"""
+
+
+def diff(a, b, max_occurrences=MAX_OCCURRENCES, budget=None):
+    """
+    Performs a histogram diff.
+
+    :Example:
+        >>> from deltas.algorithms import histogram_diff
+        >>> from deltas import text_split
+        >>>
+        >>> a = text_split.tokenize("Apples are red.")
+        >>> b = text_split.tokenize("Apples are tasty and red.")
+        >>> for op in histogram_diff.diff(a, b):
+        ...     print(op.name, repr(''.join(b[op.b1:op.b2])))
+        ...
+        equal 'Apples are '
+        insert 'tasty and '
+        equal 'red.'
+
+    :Parameters:
+        a : sequence of `hashable`
+            Initial sequence
+        b : sequence of `hashable`
+            Changed sequence
+        max_occurrences : `int`
+            Tokens that occur more often than this in a region of `a` are
+            not used as anchors
+        budget : :class:`~deltas.Budget`
+            If provided, :class:`~deltas.BudgetExceeded` is raised when the
+            diff makes more comparisons or takes longer than allowed.
+
+    :Returns:
+        An `iterable` of operations.
+    """
+    a, b = list(a), list(b)
+    blocks = _matching_blocks(a, b, max_occurrences, budget)
+    return sequence_matcher.parse_opcodes(
+        _opcodes(blocks, len(a), len(b)))
+
+
+def process(texts, *args, **kwargs):
+    processor = HistogramDiff.Processor(*args, **kwargs)
+
+    for text in texts:
+        yield processor.process(text)
+
+
+class HistogramDiff(sequence_matcher.SequenceMatcher):
+    """
+    Constructs a diff engine that works like
+    :class:`~deltas.SequenceMatcher` but uses :func:`diff`.
+
+    :Example:
+        >>> from deltas.algorithms import HistogramDiff
+        >>> engine = HistogramDiff()
+        >>>
+        >>> processor = engine.processor()
+        >>> ops, a, b = processor.process("This is a version.")
+        >>> ops, a, b = processor.process("This is a new version.")
+        >>> print(" ".join(repr(''.join(b[op.b1:op.b2])) for op in ops))
+        'This is a ' 'new ' 'version.'
+    """
+
+    class Processor(sequence_matcher.SequenceMatcher.Processor):
+        """
+        A processor used by the HistogramDiff difference engine to track the
+        history of a single text.  See
+        :class:`deltas.SequenceMatcher.Processor`.
+        """
+        diff = staticmethod(diff)
+
+    def process(self, texts, *args, **kwargs):
+        return process(texts, self.tokenizer, *args, **kwargs)
+
+
+def _matching_blocks(a, b, max_occurrences, budget=None):
+    """
+    Returns ascending ( `i`, `j`, `size` ) blocks such that
+    ``a[i:i + size] == b[j:j + size]``.  Regions are split at their anchors
+    iteratively so that there is no limit to the depth.  Each region is
+    charged to `budget` for its size.
+    """
+    blocks = []
+    regions = [(0, len(a), 0, len(b))]
+    while len(regions) > 0:
+        region = regions.pop()
+        if len(region) == 3:  # An anchor that was set aside
+            blocks.append(region)
+            continue
+
+        a_lo, a_hi, b_lo, b_hi = region
+        if a_lo == a_hi or b_lo == b_hi:
+            continue
+        if budget is not None:
+            budget.spend((a_hi - a_lo) + (b_hi - b_lo))
+
+        anchor = _anchor(a, b, a_lo, a_hi, b_lo, b_hi, max_occurrences)
+        if anchor is None:
+            for op in myers_diff.diff(a[a_lo:a_hi], b[b_lo:b_hi],
+                                      budget=budget):
+                if op.name == "equal":
+                    blocks.append((a_lo + op.a1, b_lo + op.b1,
+                                   op.a2 - op.a1))
+        else:
+            i, j, size = anchor
+            # Visit the region before the anchor, then the anchor, then the
+            # region after it.
+            regions.append((i + size, a_hi, j + size, b_hi))
+            regions.append(anchor)
+            regions.append((a_lo, i, b_lo, j))
+
+    return blocks
+
+
+def _anchor(a, b, a_lo, a_hi, b_lo, b_hi, max_occurrences):
+    """
+    Finds the longest run of matching tokens that contains one of the
+    least-frequent tokens in ``a[a_lo:a_hi]``.  Returns `None` if no token
+    of ``b[b_lo:b_hi]`` occurs in ``a[a_lo:a_hi]`` at least once and at
+    most `max_occurrences` times.
+    """
+    histogram = {}
+    for i in range(a_lo, a_hi):
+        histogram.setdefault(a[i], []).append(i)
+
+    best = None
+    best_count = None
+    j = b_lo
+    while j < b_hi:
+        positions = histogram.get(b[j])
+        next_j = j + 1
+        if positions is None or len(positions) > max_occurrences or \
+           (best_count is not None and len(positions) > best_count):
+            j = next_j
+            continue
+
+        for i in positions:
+            start_i, start_j, count = i, j, len(positions)
+            while start_i > a_lo and start_j > b_lo and \
+                    a[start_i - 1] == b[start_j - 1]:
+                start_i -= 1
+                start_j -= 1
+                count = min(count, len(histogram[a[start_i]]))
+            end_i, end_j = i + 1, j + 1
+            while end_i < a_hi and end_j < b_hi and a[end_i] == b[end_j]:
+                count = min(count, len(histogram[a[end_i]]))
+                end_i += 1
+                end_j += 1
+
+            next_j = max(next_j, end_j)
+            if best is None or end_i - start_i > best[2] or \
+               count < best_count:
+                best = (start_i, start_j, end_i - start_i)
+                best_count = count
+
+        j = next_j
+
+    return best
+
+
+def _opcodes(blocks, a_len, b_len):
+    """
+    Converts ascending matching blocks into :mod:`difflib`-style opcodes.
+    """
+    opcodes = []
+    a1 = b1 = 0
+    for i, j, size in blocks + [(a_len, b_len, 0)]:
+        if a1 < i and b1 < j:
+            opcodes.append(("replace", a1, i, b1, j))
+        elif a1 < i:
+            opcodes.append(("delete", a1, i, b1, j))
+        elif b1 < j:
+            opcodes.append(("insert", a1, i, b1, j))
+
+        if size > 0:
+            if len(opcodes) > 0 and opcodes[-1][0] == "equal":
+                opcodes[-1] = ("equal", opcodes[-1][1], i + size,
+                               opcodes[-1][3], j + size)
+            else:
+                opcodes.append(("equal", i, i + size, j, j + size))
+        a1, b1 = i + size, j + size
+
+    return opcodes
@@ -0,0 +1,319 @@
+"""
+Myers Diff
+----------
+
+Performs a *shortest edit script* diff using Eugene Myers' O(ND) algorithm
+with the linear-space "middle snake" refinement.  The cost is proportional to
+the size of the sequences times the number of tokens that changed (`D`), so
+revisions that differ by a few tokens are diffed in near linear time.  Unlike
+:class:`difflib.SequenceMatcher`, no heuristics are applied to long
+sequences.  Tokens that do not appear in the other sequence can never match,
+so they are set aside before searching.  Boxes of the edit graph that are
+much longer than they are wide (e.g. when most of a page was blanked) are
+solved with a simple dynamic program instead, since Myers' search would cost
+the square of the difference of their sides.  The cost of other large changes
+still grows with `D`.
+
+    Myers, E. W. (1986). An O(ND) difference algorithm and its variations.
+    Algorithmica, 1(1-4), 251-266.
+
+.. autofunction:: deltas.algorithms.myers_diff.diff
+
+.. autofunction:: deltas.algorithms.myers_diff.process
+
+.. autoclass:: deltas.MyersDiff
+    :members:
+"""
+from . import sequence_matcher
+
+MAX_TABLE = 2 ** 20
+"""
+The largest box (in cells) that will be solved with a dynamic program
+"""
+
+
+def diff(a, b, budget=None):
+    """
+    Performs a shortest edit script diff.
+
+    :Example:
+        >>> from deltas.algorithms import myers_diff
+        >>> from deltas import text_split
+        >>>
+        >>> a = text_split.tokenize("Apples are red.")
+        >>> b = text_split.tokenize("Apples are tasty and red.")
+        >>> for op in myers_diff.diff(a, b):
+        ...     print(op.name, repr(''.join(b[op.b1:op.b2])))
+        ...
+        equal 'Apples are'
+        insert ' tasty and'
+        equal ' red.'
+
+    :Parameters:
+        a : sequence of `comparable`
+            Initial sequence
+        b : sequence of `comparable`
+            Changed sequence
+        budget : :class:`~deltas.Budget`
+            If provided, :class:`~deltas.BudgetExceeded` is raised when the
+            diff makes more comparisons or takes longer than allowed.
+
+    :Returns:
+        An `iterable` of operations.
+    """
+    a, b = list(a), list(b)
+    a_kept, b_kept = _shared(a, b), _shared(b, a)
+    a_items = [a[i] for i in a_kept]
+    b_items = [b[j] for j in b_kept]
+    matches = ((a_kept[x], b_kept[y])
+               for x, y in _matches(_path(a_items, b_items, budget),
+                                    a_items, b_items))
+    return sequence_matcher.parse_opcodes(
+        _opcodes(matches, len(a), len(b)))
+
+
+def process(texts, *args, **kwargs):
+    processor = MyersDiff.Processor(*args, **kwargs)
+
+    for text in texts:
+        yield processor.process(text)
+
+
+class MyersDiff(sequence_matcher.SequenceMatcher):
+    """
+    Constructs a diff engine that works like
+    :class:`~deltas.SequenceMatcher` but uses :func:`diff`.
+
+    :Example:
+        >>> from deltas.algorithms import MyersDiff
+        >>> engine = MyersDiff()
+        >>>
+        >>> processor = engine.processor()
+        >>> ops, a, b = processor.process("This is a version.")
+        >>> ops, a, b = processor.process("This is a new version.")
+        >>> print(" ".join(repr(''.join(b[op.b1:op.b2])) for op in ops))
+        'This is a ' 'new ' 'version.'
+    """
+
+    class Processor(sequence_matcher.SequenceMatcher.Processor):
+        """
+        A processor used by the MyersDiff difference engine to track the
+        history of a single text.  See
+        :class:`deltas.SequenceMatcher.Processor`.
+        """
+        diff = staticmethod(diff)
+
+    def process(self, texts, *args, **kwargs):
+        return process(texts, self.tokenizer, *args, **kwargs)
+
+
+def _path(a, b, budget=None):
+    """
+    Returns the points ( `x`, `y` ) of a shortest path through the edit graph
+    of `a` and `b`.  Consecutive points are joined by at most one insertion
+    or deletion and any number of matches.  Boxes are split at their middle
+    snakes iteratively so that there is no limit to the depth.
+    """
+    path = []
+    boxes = [(0, 0, len(a), len(b))]
+    while len(boxes) > 0:
+        box = boxes.pop()
+        if len(box) == 2:  # A point that was set aside
+            path.append(box)
+            continue
+
+        left, top, right, bottom = box
+        width, height = right - left, bottom - top
+        if width * height < (width - height) ** 2 and \
+           width * height <= MAX_TABLE:
+            if budget is not None:
+                budget.spend(width * height)
+            path.extend(_table_path(a, b, left, top, right, bottom))
+            continue
+
+        snake = _middle_snake(a, b, left, top, right, bottom, budget)
+        if snake is None:
+            path.append((left, top))
+        else:
+            (x1, y1), (x2, y2) = snake
+            # Visit the head, then the snake, then the tail.
+            boxes.append((x2, y2, right, bottom))
+            boxes.append((x2, y2))
+            boxes.append((left, top, x1, y1))
+
+    # Drop repeated points where boxes meet
+    deduped = []
+    for point in path:
+        if len(deduped) == 0 or deduped[-1] != point:
+            deduped.append(point)
+    if deduped[-1] != (len(a), len(b)):
+        deduped.append((len(a), len(b)))
+    return deduped
+
+
+def _middle_snake(a, b, left, top, right, bottom, budget=None):
+    """
+    Finds the middle snake of the edit graph of ``a[left:right]`` and
+    ``b[top:bottom]`` by searching forwards from the top left and backwards
+    from the bottom right at the same time.  Returns a pair of points or
+    `None` if the box is empty.  Each round is charged to `budget` for the
+    diagonals that it extends.
+    """
+    width = right - left
+    height = bottom - top
+    size = width + height
+    if size == 0:
+        return None
+
+    max_d = (size + 1) // 2
+    delta = width - height
+    odd = delta % 2 == 1
+    offset = max_d + 1
+    forward = [0] * (2 * max_d + 3)
+    backward = [0] * (2 * max_d + 3)
+    forward[offset + 1] = left
+    backward[offset + 1] = bottom
+
+    for d in range(max_d + 1):
+        if budget is not None:
+            budget.spend(2 * d + 2)
+
+        # Forward paths along diagonals k = x - y
+        for k in range(d, -d - 1, -2):
+            c = k - delta
+            if k == -d or \
+                    (k != d and
+                     forward[offset + k - 1] < forward[offset + k + 1]):
+                px = x = forward[offset + k + 1]
+            else:
+                px = forward[offset + k - 1]
+                x = px + 1
+            y = top + (x - left) - k
+            py = y if d == 0 or x != px else y - 1
+            while x < right and y < bottom and a[x] == b[y]:
+                x += 1
+                y += 1
+            forward[offset + k] = x
+            if odd and -(d - 1) <= c <= d - 1 and \
+               y >= backward[offset + c]:
+                return (px, py), (x, y)
+
+        # Backward paths along diagonals c = k - delta
+        for c in range(d, -d - 1, -2):
+            k = c + delta
+            if c == -d or \
+                    (c != d and
+                     backward[offset + c - 1] > backward[offset + c + 1]):
+                py = y = backward[offset + c + 1]
+            else:
+                py = backward[offset + c - 1]
+                y = py - 1
+            x = left + (y - top) + k
+            px = x if d == 0 or y != py else x + 1
+            while x > left and y > top and a[x - 1] == b[y - 1]:
+                x -= 1
+                y -= 1
+            backward[offset + c] = y
+            if not odd and -d <= k <= d and x <= forward[offset + k]:
+                return (x, y), (px, py)
+
+    raise RuntimeError("No middle snake was found")  # Should never happen
+
+
+def _table_path(a, b, left, top, right, bottom):
+    """
+    Finds a shortest path through a box of the edit graph with a table of
+    the lengths of the longest common subsequences of the suffixes.  The path
+    takes one step at a time.
+    """
+    width, height = right - left, bottom - top
+    b_items = b[top:bottom]
+    rows = [[0] * (height + 1) for _ in range(width + 1)]
+    for i in range(width - 1, -1, -1):
+        item, row, below = a[left + i], rows[i], rows[i + 1]
+        for j in range(height - 1, -1, -1):
+            if item == b_items[j]:
+                row[j] = below[j + 1] + 1
+            else:
+                row[j] = max(below[j], row[j + 1])
+
+    i = j = 0
+    path = [(left, top)]
+    while i < width or j < height:
+        if i < width and j < height and a[left + i] == b_items[j]:
+            i, j = i + 1, j + 1
+        elif j == height or (i < width and rows[i + 1][j] >= rows[i][j + 1]):
+            i += 1
+        else:
+            j += 1
+        path.append((left + i, top + j))
+    return path
+
+
+def _shared(a, b):
+    """
+    Returns the positions of the items in `a` that also appear in `b`.
+    """
+    try:
+        b_items = set(b)
+    except TypeError:  # Unhashable
+        return list(range(len(a)))
+    return [i for i, item in enumerate(a) if item in b_items]
+
+
+def _matches(path, a, b):
+    """
+    Generates the ( `x`, `y` ) positions of matching items along a path
+    through the edit graph.
+    """
+    for (x1, y1), (x2, y2) in zip(path, path[1:]):
+        # Leading matches
+        x, y = x1, y1
+        while x < x2 and y < y2 and a[x] == b[y]:
+            yield x, y
+            x += 1
+            y += 1
+
+        # At most one edit
+        if x2 - x < y2 - y:
+            y += 1
+        elif x2 - x > y2 - y:
+            x += 1
+
+        # Trailing matches
+        while x < x2:
+            yield x, y
+            x += 1
+            y += 1
+
+
+def _opcodes(matches, a_len, b_len):
+    """
+    Converts ascending pairs of matching positions into :mod:`difflib`-style
+    opcodes.
+    """
+    opcodes = []
+    a1 = b1 = 0
+    for x, y in matches:
+        if x == a1 and y == b1 and len(opcodes) > 0 and \
+           opcodes[-1][0] == "equal":
+            opcodes[-1] = ("equal", opcodes[-1][1], x + 1,
+                           opcodes[-1][3], y + 1)
+        else:
+            opcodes.extend(_gap(a1, x, b1, y))
+            opcodes.append(("equal", x, x + 1, y, y + 1))
+        a1, b1 = x + 1, y + 1
+    opcodes.extend(_gap(a1, a_len, b1, b_len))
+
+    return opcodes
+
+
+def _gap(a1, a2, b1, b2):
+    if a1 < a2 and b1 < b2:
+        return [("replace", a1, a2, b1, b2)]
+    elif a1 < a2:
+        return [("delete", a1, a2, b1, b2)]
+    elif b1 < b2:
+        return [("insert", a1, a2, b1, b2)]
+    else:
+        return []
@@ -14,18 +14,24 @@ to content moves.  This module supports the use of a custom
 """
 from collections import defaultdict
 
+from .. import serialization
 from . import sequence_matcher
 from ..operations import Delete, Equal, Insert
 from ..segmenters import (MatchableSegment, ParagraphsSentencesAndWhitespace,
-                          Segment, Segmenter)
+                          Segment, Segmenter, SegmentTree)
+from ..segmenters.segment_tree import MATCHABLE, SegmentView
 from ..tokenizers import Token, Tokenizer, text_split
+from ..util import LRUCache, edit_span
+from .budget import (FULL, PARAGRAPHS, REPLACE, SEGMENTS, TIERS,
+                     BudgetExceeded, TieredOperations)
 from .diff_engine import DiffEngine
 
 SEGMENTER = ParagraphsSentencesAndWhitespace()
 TOKENIZER = text_split
 
 
-def diff(a, b, segmenter=None):
+def diff(a, b, segmenter=None, vocabulary=None, inner_diff=None,
+         budget=None):
     """
     Performs a diff comparison between two sequences of tokens (`a` and `b`)
     using `segmenter` to cluster and match
@@ -54,46 +60,104 @@ def diff(a, b, segmenter=None):
             Changed sequence
         segmenter : :class:`deltas.Segmenter`
             A segmenter to use on the tokens.
+        vocabulary : :class:`deltas.Vocabulary`
+            If provided, tokens are compared as integer ids
+        inner_diff : `func`
+            A function that diffs the unmatched tokens and matched segments.
+            Defaults to :func:`deltas.algorithms.sequence_matcher.diff`.
+        budget : :class:`~deltas.Budget`
+            If provided, limits the work done by the diff.  See
+            :func:`~deltas.algorithms.segment_matcher.diff_segments`.
 
     :Returns:
         An `iterable` of operations.
     """
-    a, b = list(a), list(b)
     segmenter = segmenter or SEGMENTER
 
     # Cluster the input tokens
     a_segments = segmenter.segment(a)
     b_segments = segmenter.segment(b)
 
-    return diff_segments(a_segments, b_segments)
+    return diff_segments(a_segments, b_segments, vocabulary=vocabulary,
+                         inner_diff=inner_diff, budget=budget)
 
 
-def diff_segments(a_segments, b_segments):
+def diff_segments(a_segments, b_segments, vocabulary=None, inner_diff=None,
+                  budget=None):
     """
     Performs a diff comparison between two pre-clustered
     :class:`deltas.Segment` trees.  In most cases, segmentation
-    takes 100X more time than actually performing the diff.
+    takes 100X more time than actually performing the diff.  If either tree
+    is a :class:`~deltas.SegmentTree`, both are matched as flat
+    trees.  Top-level segments that are the same at the start and end of
+    both trees are set aside first, so only the segments in between are
+    clustered and diffed.  The segments that were set aside can still be
+    matched by content that was copied or moved from them.
 
     :Parameters:
-        a_segments : :class:`deltas.Segment`
+        a_segments : :class:`deltas.Segment` | :class:`~deltas.SegmentTree`
             An initial sequence
-        b_segments : :class:`deltas.Segment`
+        b_segments : :class:`deltas.Segment` | :class:`~deltas.SegmentTree`
             A changed sequence
+        vocabulary : :class:`deltas.Vocabulary`
+            If provided, unmatched tokens and matched segments are compared
+            as integer ids
+        inner_diff : `func`
+            A function that diffs the unmatched tokens and matched segments.
+            Defaults to :func:`deltas.algorithms.sequence_matcher.diff`.
+            :func:`deltas.algorithms.myers_diff.diff` is faster when few
+            tokens changed.
+        budget : :class:`~deltas.Budget`
+            If provided, `inner_diff` is passed the budget.  When it runs
+            out, the budget is restarted and cheaper strategies are tried in
+            the order of :data:`~deltas.algorithms.budget.TIERS` until one
+            finishes.
 
     :Returns:
-        An `iterable` of operations.
+        An `iterable` of operations.  If a `budget` is provided, a
+        :class:`~deltas.algorithms.budget.TieredOperations` that records the
+        strategy that was used.
     """
+    # Set aside the top-level segments that the trees share at their start
+    # and end.  Only the segments in between are clustered and diffed.
+    flat = isinstance(a_segments, SegmentTree) or \
+        isinstance(b_segments, SegmentTree)
+    if flat:
+        a_tree, b_tree = _as_tree(a_segments), _as_tree(b_segments)
+        a_items, b_items = list(a_tree.segment()), list(b_tree.segment())
+    else:
+        a_items, b_items = list(a_segments), list(b_segments)
+    prefix, a_end, b_end = edit_span([_key(item) for item in a_items],
+                                     [_key(item) for item in b_items])
+    suffix = len(a_items) - a_end
+    a_middle, b_middle = a_items[prefix:a_end], b_items[prefix:b_end]
+
     # Match and re-sequence unmatched tokens
-    a_segment_tokens, b_segment_tokens = _cluster_matching_segments(a_segments,
-                                                                    b_segments)
+    if flat:
+        a_segment_tokens, b_segment_tokens = _cluster_matching_nodes(
+            a_tree, a_items, b_tree, b_items, prefix, suffix)
+    else:
+        a_segment_tokens, b_segment_tokens = _cluster_matching_segments(
+            a_items, b_items, prefix, suffix)
+
+    prefix_length = _length(a_items[:prefix])
+    suffix_length = _length(a_items[len(a_items) - suffix:])
+    inner_diff = inner_diff or sequence_matcher.diff
+    if budget is not None:
+        return _diff_bounded(a_middle, b_middle,
+                             a_segment_tokens, b_segment_tokens,
+                             prefix_length, suffix_length,
+                             vocabulary, inner_diff, budget)
 
     # Perform a simple LCS over unmatched tokens and clusters
-    clustered_ops = sequence_matcher.diff(a_segment_tokens, b_segment_tokens)
+    clustered_ops = _diff_clusters(a_segment_tokens, b_segment_tokens,
+                                   vocabulary, inner_diff)
 
     # Return the expanded (de-clustered) operations
-    return (op for op in SegmentOperationsExpander(clustered_ops,
-                                                   a_segment_tokens,
-                                                   b_segment_tokens).expand())
+    expander = SegmentOperationsExpander(
+        clustered_ops, a_segment_tokens, b_segment_tokens,
+        prefix=prefix_length, suffix=suffix_length)
+    return (op for op in expander.expand())
 
 
 def process(texts, *args, **kwargs):
@@ -147,100 +211,417 @@ class SegmentMatcher(DiffEngine):
     class Processor(DiffEngine.Processor):
         """
         A processor used by the SegmentMatcher difference engine to track the
-        history of a single text.
+        history of a single text.  If `compact` is set, tokens are held as a
+        :class:`~deltas.TokenStream` rather than a `list`.  If a
+        :class:`~deltas.Vocabulary` is provided, tokens are compared as
+        integer ids.  If `incremental` is set, only the region of a text that
+        changed since the last version is re-tokenized.  If `cache_size` is
+        set, the segmenter is given a :class:`~deltas.util.LRUCache` of that
+        many segments so that unchanged paragraphs are not re-segmented.  If
+        `flat` is set, segments are written straight into, held and matched
+        as a :class:`~deltas.SegmentTree` (see
+        :func:`~deltas.Segmenter.segment_tree`).  `inner_diff` is passed to
+        :func:`~deltas.algorithms.segment_matcher.diff_segments`.
         """
 
         def __init__(self, tokenizer=None, segmenter=None, last_text=None,
-                     last_tokens=None, last_segments=None):
+                     last_tokens=None, last_segments=None, compact=False,
+                     vocabulary=None, incremental=False, cache_size=None,
+                     flat=False, inner_diff=None):
             self.tokenizer = tokenizer or TOKENIZER
             self.segmenter = segmenter or SEGMENTER
+            self.compact = compact
+            self.vocabulary = vocabulary
+            self.incremental = incremental
+            self.cache = LRUCache(cache_size) if cache_size else None
+            self.flat = flat
+            self.inner_diff = inner_diff
             self.update(last_text, last_tokens, last_segments)
 
         def update(self, last_text=None, last_tokens=None, last_segments=None):
-            if last_segments is not None:
+            """
+            Resets the state of the processor.  `last_segments` may be data
+            written by :func:`deltas.serialization.dumps`.
+            """
+            self.last_text = None
+            if isinstance(last_segments, serialization.BUFFER_TYPES):
+                last_tokens, last_segments = \
+                    serialization.loads(last_segments)
+
+            if isinstance(last_segments, SegmentTree):
                 self.last_segments = last_segments
-                self.last_tokens = self.last_segments.tokens()
+                self.last_tokens = last_segments.tokens
+            elif last_segments is not None:
+                self.last_segments = last_segments
+                self.last_tokens = list(self.last_segments.tokens())
             elif last_tokens is not None:
                 self.last_tokens = last_tokens
-                self.last_segments = self.segmenter.segment(last_tokens)
+                self.last_segments = self._segment(last_tokens)
             elif last_text is not None:
-                self.last_tokens = self.tokenizer.tokenize(last_text)
-                self.last_segments = self.segmenter.segment(self.last_tokens)
+                self.last_tokens = self._tokenize(last_text)
+                self.last_segments = self._segment(self.last_tokens)
+                self.last_text = last_text
             else:
                 self.last_tokens = []
                 self.last_segments = Segment()
 
-        def process(self, text, token_class=Token):
+        def process(self, text, token_class=Token, span=None, budget=None):
             """
             Processes a new version of a text and returns the delta.
 
             :Parameters:
                 text : `str`
                     The text to process
+                token_class : `class`
+                    A class to construct tokens with
+                span : ( `int`, `int`, `int` )
+                    A hint about the (`start`, `last_end`, `end`) character
+                    span of the edit such that ``text[start:end]`` replaced
+                    ``last_text[start:last_end]``.  If provided, only the
+                    tokens around the edit are re-tokenized.
+                budget : :class:`~deltas.Budget`
+                    If provided, limits the work done by the diff.  See
+                    :func:`~deltas.algorithms.segment_matcher.diff_segments`.
 
             :Returns:
                     A tuple of `operations`, `a_tokens`, `b_tokens`
             """
             # Tokenize and segment
-            tokens = self.tokenizer.tokenize(text, token_class=token_class)
-            segments = self.segmenter.segment(tokens)
+            tokens = self._tokenize(text, span=span, token_class=token_class)
+            segments = self._segment(tokens)
 
-            return self.process_segments(segments, tokens=tokens)
+            return self.process_segments(segments, tokens=tokens,
+                                         budget=budget, text=text)
 
-        def process_segments(self, segments, tokens=None):
+        def _segment(self, tokens):
+            segment = self.segmenter.segment_tree if self.flat else \
+                self.segmenter.segment
+            if self.cache is not None:
+                return segment(tokens, cache=self.cache)
+            else:
+                return segment(tokens)
+
+        def _tokenize(self, text, span=None, **kwargs):
+            if (span is not None or self.incremental) and \
+               self.last_text is not None:
+                return self.tokenizer.retokenize(
+                    text, self.last_text, self.last_tokens, span=span,
+                    **kwargs)
+            elif self.compact:
+                return self.tokenizer.tokenize_compact(text, **kwargs)
+            else:
+                return self.tokenizer.tokenize(text, **kwargs)
 
+        def process_segments(self, segments, tokens=None, budget=None,
+                             text=None):
+            """
+            Processes a new version of a text that has already been segmented
+            and returns the delta.
+
+            :Parameters:
+                segments : :class:`~deltas.Segment` | :class:`~deltas.SegmentTree`
+                    The segments of the new version
+                tokens : `list` ( :class:`~deltas.Token` )
+                    The tokens of the new version.  If not provided, they are
+                    read from `segments`.
+                budget : :class:`~deltas.Budget`
+                    If provided, limits the work done by the diff.  See
+                    :func:`~deltas.algorithms.segment_matcher.diff_segments`.
+                text : `str`
+                    The text of the new version.  Unless it is provided, the
+                    next version will be tokenized from scratch.
+
+            :Returns:
+                    A tuple of `operations`, `a_tokens`, `b_tokens`
+            """
             if tokens is None:
-                tokens = segments.tokens()
+                if isinstance(segments, SegmentTree):
+                    tokens = segments.tokens
+                else:
+                    tokens = list(segments.tokens())
 
             # Perform diff
             _clear_matches(self.last_segments)
-            operations = diff_segments(self.last_segments, segments)
+            operations = diff_segments(self.last_segments, segments,
+                                       vocabulary=self.vocabulary,
+                                       inner_diff=self.inner_diff,
+                                       budget=budget)
 
             # Update state
             a = self.last_tokens
             b = tokens
             self.last_tokens = tokens
             self.last_segments = segments
+            self.last_text = text
 
             # Return delta
             return operations, a, b
 
-    def __init__(self, tokenizer=None, segmenter=None):
+    def __init__(self, tokenizer=None, segmenter=None, inner_diff=None):
         self.tokenizer = tokenizer or TOKENIZER
         self.segmenter = segmenter or SEGMENTER
+        self.inner_diff = inner_diff
 
     def processor(self, *args, **kwargs):
         """
         Constructs and configures a processor to process versions of a text.
         """
+        kwargs.setdefault('inner_diff', self.inner_diff)
         return self.Processor(self.tokenizer, self.segmenter, *args, **kwargs)
 
     def process(self, texts, *args, **kwargs):
+        kwargs.setdefault('inner_diff', self.inner_diff)
         return process(texts, self.tokenizer, self.segmenter, *args, **kwargs)
 
     @classmethod
     def from_config(cls, config, name, section_key="diff_engines"):
+        import yamlconf
+
         section = config[section_key][name]
+        if 'inner_diff' in section:
+            inner_diff = yamlconf.import_module(section['inner_diff'])
+        else:
+            inner_diff = None
         return cls(
             Tokenizer.from_config(config, section['tokenizer']),
-            Segmenter.from_config(config, section['segmenter'])
+            Segmenter.from_config(config, section['segmenter']),
+            inner_diff=inner_diff
         )
 
 
-def _cluster_matching_segments(a_segments, b_segments):
+def _cluster_matching_segments(a_segments, b_segments, prefix=0, suffix=0):
+    # Only the top-level segments between the first `prefix` and the last
+    # `suffix` are clustered, but all of them are matched.
+    a_end, b_end = len(a_segments) - suffix, len(b_segments) - suffix
 
     # Generate a look-up map for matchable segments in 'a'
     a_segment_map = _build_segment_map(a_segments)
 
     # Find and cluster matching content in 'b'
-    b_segment_tokens = list(_match_segments(a_segment_map, b_segments))
+    for _ in _match_segments(a_segment_map, b_segments[:prefix]):
+        pass  # Only flag matches
+    b_segment_tokens = list(_match_segments(a_segment_map,
+                                            b_segments[prefix:b_end]))
+    for _ in _match_segments(a_segment_map, b_segments[b_end:]):
+        pass  # Only flag matches
 
     # Expand unmatched segments from 'a'
-    a_segment_tokens = list(_expand_unmatched_segments(a_segments))
+    a_segment_tokens = list(_expand_unmatched_segments(
+        a_segments[prefix:a_end]))
+
+    return a_segment_tokens, b_segment_tokens
+
+
+def _cluster_matching_nodes(a_tree, a_items, b_tree, b_items, prefix=0,
+                            suffix=0):
+    # Only the top-level nodes between the first `prefix` and the last
+    # `suffix` are clustered, but all of them are matched.
+    a_middle = a_items[prefix:len(a_items) - suffix]
+    b_middle = b_items[prefix:len(b_items) - suffix]
+
+    # Generate a look-up map for matchable nodes in 'a'
+    a_node_map = defaultdict(list)
+    a_fingerprint = a_tree.fingerprint
+    for node in _get_matchable_nodes(a_tree, a_items):
+        a_node_map[a_fingerprint[node]].append(node)
+
+    # Find and cluster matching content in 'b'
+    b_kind, b_fingerprint = b_tree.kind, b_tree.fingerprint
+    a_matched = set()
+    b_matches = {}
+
+    def is_matched(node):
+        if b_kind[node] == MATCHABLE:
+            matched_nodes = a_node_map.get(b_fingerprint[node])
+            if matched_nodes is not None:
+                a_matched.update(matched_nodes)  # flag as matched
+                b_matches[node] = matched_nodes[0]  # first match
+                return True
+        return False
+
+    _flatten(b_tree, b_items[:prefix], is_matched)  # Only flag matches
+    b_segment_tokens = _flatten(b_tree, b_middle, is_matched)
+    _flatten(b_tree, b_items[len(b_items) - suffix:], is_matched)
+    for s_t in b_segment_tokens:
+        if isinstance(s_t, SegmentView):
+            s_t.match = SegmentView(a_tree, b_matches[s_t.node])
+
+    # Expand unmatched nodes from 'a'
+    a_segment_tokens = _flatten(a_tree, a_middle, a_matched.__contains__)
 
     return a_segment_tokens, b_segment_tokens
 
 
+def _flatten(tree, items, is_cluster):
+    """
+    Flattens a sequence of top-level tokens and
+    :class:`~deltas.segmenters.segment_tree.SegmentView` like
+    :func:`deltas.SegmentTree.flatten`.
+    """
+    flattened = []
+    for item in items:
+        if not isinstance(item, SegmentView):
+            flattened.append(item)
+        elif is_cluster(item.node):
+            flattened.append(item)
+        else:
+            flattened.extend(tree.flatten(is_cluster, item.node))
+
+    return flattened
+
+
+def _as_tree(segments):
+    if isinstance(segments, SegmentTree):
+        return segments
+    else:
+        return SegmentTree.from_segments(segments)
+
+
+def _diff_clusters(a_segment_tokens, b_segment_tokens, vocabulary,
+                   inner_diff, **kwargs):
+    if vocabulary is not None:
+        a_ids, b_ids = _encode_clusters(a_segment_tokens, b_segment_tokens,
+                                        vocabulary)
+        return inner_diff(a_ids, b_ids, **kwargs)
+    else:
+        return inner_diff(a_segment_tokens, b_segment_tokens, **kwargs)
+
+
+def _diff_bounded(a_middle, b_middle, a_segment_tokens, b_segment_tokens,
+                  prefix, suffix, vocabulary, inner_diff, budget):
+    """
+    Tries each of the :data:`~deltas.algorithms.budget.TIERS` in turn.  Each
+    strategy after the first starts with a restarted `budget`.
+    """
+    def full():
+        clustered_ops = _diff_clusters(a_segment_tokens, b_segment_tokens,
+                                       vocabulary, inner_diff, budget=budget)
+        return SegmentOperationsExpander(
+            clustered_ops, a_segment_tokens, b_segment_tokens,
+            prefix=prefix, suffix=suffix).expand()
+
+    def segments():
+        # Runs of unmatched tokens are diffed as opaque units so that only
+        # matched segments can be equal.
+        a_units, a_bounds = _token_runs(a_segment_tokens)
+        b_units, b_bounds = _token_runs(b_segment_tokens)
+        clustered_ops = _rescale(
+            sequence_matcher.diff(a_units, b_units, budget=budget),
+            a_bounds, b_bounds, 0)
+        return SegmentOperationsExpander(
+            clustered_ops, a_segment_tokens, b_segment_tokens,
+            prefix=prefix, suffix=suffix).expand()
+
+    def paragraphs():
+        operations = _rescale(
+            sequence_matcher.diff([_key(item) for item in a_middle],
+                                  [_key(item) for item in b_middle],
+                                  budget=budget),
+            _bounds(a_middle), _bounds(b_middle), prefix)
+        return _with_affixes(operations, prefix, suffix,
+                             _length(a_middle), _length(b_middle))
+
+    def replace():
+        a_length, b_length = _length(a_middle), _length(b_middle)
+        operations = [Delete(prefix, prefix + a_length, prefix, prefix),
+                      Insert(prefix + a_length, prefix + a_length,
+                             prefix, prefix + b_length)]
+        return _with_affixes((op for op in operations if op.a1 < op.a2 or
+                              op.b1 < op.b2),
+                             prefix, suffix, a_length, b_length)
+
+    strategies = {FULL: full, SEGMENTS: segments, PARAGRAPHS: paragraphs,
+                  REPLACE: replace}
+    for tier in TIERS:
+        try:
+            return TieredOperations(strategies[tier](), tier=tier)
+        except BudgetExceeded:
+            budget.restart()
+
+    assert False, "Should never happen"  # Replacing has no cost
+
+
+def _token_runs(segment_tokens):
+    """
+    Replaces each run of tokens with a unit that is only equal to itself.
+    Returns the units and the position of each unit's first item.
+    """
+    units, bounds = [], []
+    for i, s_t in enumerate(segment_tokens):
+        if isinstance(s_t, (Segment, SegmentView)):
+            units.append(s_t)
+            bounds.append(i)
+        elif len(units) == 0 or \
+                isinstance(units[-1], (Segment, SegmentView)):
+            units.append(object())
+            bounds.append(i)
+    bounds.append(len(segment_tokens))
+    return units, bounds
+
+
+def _bounds(segments_or_tokens):
+    bounds = [0]
+    for s_t in segments_or_tokens:
+        bounds.append(bounds[-1] + _length([s_t]))
+    return bounds
+
+
+def _rescale(operations, a_bounds, b_bounds, offset):
+    # Converts positions in units to positions in the items they cover
+    for op in operations:
+        yield op.__class__(offset + a_bounds[op.a1], offset + a_bounds[op.a2],
+                           offset + b_bounds[op.b1], offset + b_bounds[op.b2])
+
+
+def _key(segment_or_token):
+    # A hashable stand-in for a top-level segment or token.  Matchable
+    # segments are compared by fingerprint and other segments by their
+    # tokens.
+    if not isinstance(segment_or_token, (Segment, SegmentView)):
+        return segment_or_token
+    elif _matchable(segment_or_token):
+        return segment_or_token
+    else:
+        return tuple(segment_or_token.tokens())
+
+
+def _with_affixes(operations, prefix, suffix, a_length, b_length):
+    # Adds Equal operations for the tokens set aside at the start and end
+    operations = list(operations)
+    if prefix > 0:
+        operations.insert(0, Equal(0, prefix, 0, prefix))
+    if suffix > 0:
+        a1, b1 = prefix + a_length, prefix + b_length
+        operations.append(Equal(a1, a1 + suffix, b1, b1 + suffix))
+
+    merged = []
+    for operation in operations:
+        if len(merged) > 0 and _follows(merged[-1], operation):
+            last = merged.pop()
+            operation = Equal(last.a1, operation.a2, last.b1, operation.b2)
+        merged.append(operation)
+    return merged
+
+
+def _encode_clusters(a_segment_tokens, b_segment_tokens, vocabulary):
+    """
+    Converts tokens to their vocabulary ids and matched segments to negative
+    ids that are shared between equal segments.
+    """
+    segment_ids = {}
+
+    def encode(segment_or_token):
+        if isinstance(segment_or_token, (Segment, SegmentView)):
+            segment_id = segment_ids.setdefault(segment_or_token,
+                                                len(segment_ids))
+            return -1 - segment_id
+        else:
+            return vocabulary[segment_or_token]
+
+    return ([encode(s_t) for s_t in a_segment_tokens],
+            [encode(s_t) for s_t in b_segment_tokens])
+
+
 def _build_segment_map(segments):
     d = defaultdict(list)
     for matchable_segment in _get_matchable_segments(segments):
@@ -265,6 +646,54 @@ def _get_matchable_segments(segments):
                 yield matchable_subsegment
 
 
+def _get_matchable_nodes(tree, items):
+    """
+    Performs an iterative depth-first search of a
+    :class:`~deltas.SegmentTree` to get all matchable nodes under a sequence
+    of top-level tokens and
+    :class:`~deltas.segmenters.segment_tree.SegmentView`.
+    """
+    kind = tree.kind
+    for item in items:
+        if not isinstance(item, SegmentView):
+            break  # No tokens allowed next to segments
+        if kind[item.node] == MATCHABLE:
+            yield item.node
+
+        yield from _get_matchable_descendants(tree, item.node)
+
+
+def _get_matchable_descendants(tree, node):
+    kind, start, end = tree.kind, tree.start, tree.end
+    first_child, next_sibling = tree.first_child, tree.next_sibling
+
+    stack = [(first_child[node], start[node])]
+    while len(stack) > 0:
+        node, pos = stack.pop()
+        if node == -1 or start[node] > pos:
+            continue  # No tokens allowed next to segments
+        if kind[node] == MATCHABLE:
+            yield node
+
+        stack.append((next_sibling[node], end[node]))
+        stack.append((first_child[node], start[node]))
+
+
+def _matchable(segment):
+    return isinstance(segment, MatchableSegment) or \
+        (isinstance(segment, SegmentView) and segment.matchable)
+
+
+def _follows(operation, equal):
+    return isinstance(operation, Equal) and isinstance(equal, Equal) and \
+        operation.a2 == equal.a1 and operation.b2 == equal.b1
+
+
+def _length(segments_or_tokens):
+    return sum(s_t.length if isinstance(s_t, (Segment, SegmentView)) else 1
+               for s_t in segments_or_tokens)
+
+
 def _match_segments(a_segment_map, b_segments):
     for subsegment in b_segments:
         if isinstance(subsegment, Segment):
@@ -312,15 +741,46 @@ def _clear_matches(segment):
 
 class SegmentOperationsExpander:
 
-    def __init__(self, operations, a_token_segments, b_token_segments):
+    def __init__(self, operations, a_token_segments, b_token_segments,
+                 prefix=0, suffix=0):
 
-        self.a_pos = 0
-        self.b_pos = 0
+        self.a_pos = prefix
+        self.b_pos = prefix
         self.a_token_segments = a_token_segments
         self.b_token_segments = b_token_segments
         self.operations = operations
+        self.prefix = prefix
+        self.suffix = suffix
 
     def expand(self):
+        # Tokens set aside at the start and end are merged into the
+        # operations next to them when they are equal too.
+        last = Equal(0, self.prefix, 0, self.prefix) \
+            if self.prefix > 0 else None
+        first = True
+        for operation in self._expand_operations():
+            if first and _follows(last, operation):
+                last = Equal(last.a1, operation.a2, last.b1, operation.b2)
+            else:
+                if last is not None:
+                    yield last
+                last = operation
+            first = False
+
+        if self.suffix > 0:
+            suffix = Equal(self.a_pos, self.a_pos + self.suffix,
+                           self.b_pos, self.b_pos + self.suffix)
+            if _follows(last, suffix):
+                last = Equal(last.a1, suffix.a2, last.b1, suffix.b2)
+            else:
+                if last is not None:
+                    yield last
+                last = suffix
+
+        if last is not None:
+            yield last
+
+    def _expand_operations(self):
         for operation in self.operations:
             if isinstance(operation, Equal):
                 # print(
@@ -343,8 +803,7 @@ class SegmentOperationsExpander:
     def _process_equal(self, op):
         a1 = self.a_pos
         b1 = self.b_pos
-        token_len = sum(1 for t_s in self.a_token_segments[op.a1:op.a2]
-                        for _ in t_s.tokens())
+        token_len = _length(self.a_token_segments[op.a1:op.a2])
         self.a_pos += token_len
         self.b_pos += token_len
 
@@ -368,7 +827,7 @@ class SegmentOperationsExpander:
 
                 # Now, emit an Equal for the matched segment
                 b1 = self.b_pos
-                self.b_pos += sum(1 for _ in segment.tokens())
+                self.b_pos += segment.length
                 yield Equal(segment.match.start, segment.match.end,
                             b1, self.b_pos)
 
@@ -395,7 +854,7 @@ class SegmentOperationsExpander:
                     removed_token_count = 0
 
                 # update & reset!
-                self.a_pos += sum(1 for _ in segment.tokens())
+                self.a_pos += segment.length
 
         # cleanup
         if removed_token_count > 0:
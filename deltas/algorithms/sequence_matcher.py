@@ -3,10 +3,15 @@ Sequence Matcher
 ----------------
 
 Performs a simple *longest-common-substring* diff.  This module implements a
-simple wrapper around :class:`difflib.SequenceMatcher`.
+simple wrapper around :class:`difflib.SequenceMatcher`.  Tokens that the
+two sequences share at their start and end are set aside before
+:class:`difflib.SequenceMatcher` is run, so only the region that changed is
+compared.
 
 .. autofunction:: deltas.algorithms.sequence_matcher.diff
 
+.. autofunction:: deltas.algorithms.sequence_matcher.replace
+
 .. autofunction:: deltas.algorithms.sequence_matcher.process
 
 .. autoclass:: deltas.SequenceMatcher
@@ -14,9 +19,12 @@ simple wrapper around :class:`difflib.SequenceMatcher`.
 """
 
 from difflib import SequenceMatcher as SM
+from itertools import accumulate, chain
 
 from ..operations import Delete, Equal, Insert
 from ..tokenizers import text_split
+from ..util import edit_span
+from .budget import REPLACE, BudgetExceeded, TieredOperations
 from .diff_engine import DiffEngine
 
 TOKENIZER = text_split
@@ -30,7 +38,7 @@ OP_PARSERS = {
 }
 
 
-def diff(a, b):
+def diff(a, b, budget=None):
     """
     Performs a longest common substring diff.
 
@@ -39,13 +47,50 @@ def diff(a, b):
             Initial sequence
         b : sequence of `comparable`
             Changed sequence
+        budget : :class:`~deltas.Budget`
+            If provided, :class:`~deltas.BudgetExceeded` is raised when the
+            diff makes more comparisons or takes longer than allowed.
 
     :Returns:
         An `iterable` of operations.
     """
-    a, b = list(a), list(b)
-    opcodes = SM(None, a, b).get_opcodes()
-    return parse_opcodes(opcodes)
+    a, b = _sequence(a), _sequence(b)
+    # Only the middle is copied.  difflib picks its matches (e.g. its
+    # "popular" items) from the middle alone, so where a token is repeated,
+    # the alignment can differ from a diff of the whole sequences.  Setting
+    # common affixes aside never makes a minimal edit any longer.
+    prefix, a_end, b_end = edit_span(a, b)
+    suffix = len(a) - a_end
+    a_middle, b_middle = list(a[prefix:a_end]), list(b[prefix:b_end])
+    if budget is not None:
+        opcodes = _BudgetedSM(budget, a_middle, b_middle).get_opcodes()
+    else:
+        opcodes = SM(None, a_middle, b_middle).get_opcodes()
+    return parse_opcodes(
+        offset_opcodes(opcodes, prefix, suffix, len(a), len(b)))
+
+
+def replace(a, b):
+    """
+    Deletes and re-inserts everything between the common prefix and suffix
+    of two sequences.  This costs no more than finding the affixes, so it is
+    used when a diff runs over its :class:`~deltas.Budget`.
+
+    :Parameters:
+        a : sequence of `comparable`
+            Initial sequence
+        b : sequence of `comparable`
+            Changed sequence
+
+    :Returns:
+        An `iterable` of operations.
+    """
+    a, b = _sequence(a), _sequence(b)
+    prefix, a_end, b_end = edit_span(a, b)
+    suffix = len(a) - a_end
+    opcodes = _replace_opcodes(a_end - prefix, b_end - prefix)
+    return parse_opcodes(
+        offset_opcodes(opcodes, prefix, suffix, len(a), len(b)))
 
 
 def process(texts, *args, **kwargs):
@@ -78,48 +123,103 @@ class SequenceMatcher(DiffEngine):
         >>> ops, a, b = processor.process("Switching it up here.  This is " +
         ...                               "a version.")
         >>> print(" ".join(repr(''.join(b[op.b1:op.b2])) for op in ops))
-        'Switching it up here.  ' 'This is a version.' ''
+        'Switching it up here.  ' 'This is a version' '' '.'
     """
 
     class Processor(DiffEngine.Processor):
         __slots__ = ('last_tokens')
         """
         A processor used by the SequenceMatcher difference engine to track the
-        history of a single text.
+        history of a single text.  If `compact` is set, tokens are held as a
+        :class:`~deltas.TokenStream` rather than a `list`.  If a
+        :class:`~deltas.Vocabulary` is provided, tokens are compared as
+        integer ids.  If `incremental` is set, only the region of a text that
+        changed since the last version is re-tokenized.  No index of the
+        last version's tokens is kept between calls: :func:`diff` only
+        indexes the changed middle of each new version, which costs less
+        than keeping an index of the whole text up to date.
         """
+        diff = staticmethod(diff)
+
         def __init__(self, tokenizer=None, last_text=None, last_tokens=None,
-                     token_class=None):
+                     token_class=None, compact=False, vocabulary=None,
+                     incremental=False):
             self.tokenizer = tokenizer or TOKENIZER
+            self.compact = compact
+            self.vocabulary = vocabulary
+            self.incremental = incremental
             self.update(last_text, last_tokens)
             self.token_class = token_class
 
         def update(self, last_text=None, last_tokens=None, **kwargs):
+            self.last_text = None
             if last_text is not None:
-                self.last_tokens = self.tokenizer.tokenize(last_text, **kwargs)
+                self.last_tokens = self._tokenize(last_text, **kwargs)
+                self.last_text = last_text
             else:
                 self.last_tokens = last_tokens or []
 
-        def process(self, text, token_class=None):
+            if self.vocabulary is not None:
+                self.last_ids = self.vocabulary.encode(self.last_tokens)
+
+        def _tokenize(self, text, span=None, **kwargs):
+            if (span is not None or self.incremental) and \
+               self.last_text is not None:
+                return self.tokenizer.retokenize(
+                    text, self.last_text, self.last_tokens, span=span,
+                    **kwargs)
+            elif self.compact:
+                return self.tokenizer.tokenize_compact(text, **kwargs)
+            else:
+                return self.tokenizer.tokenize(text, **kwargs)
+
+        def process(self, text, token_class=None, span=None, budget=None):
             """
             Processes a new version of a text and returns the delta.
 
             :Parameters:
                 text : `str`
                     The text to process
+                token_class : `class`
+                    A class to construct tokens with
+                span : ( `int`, `int`, `int` )
+                    A hint about the (`start`, `last_end`, `end`) character
+                    span of the edit such that ``text[start:end]`` replaced
+                    ``last_text[start:last_end]``.  If provided, only the
+                    tokens around the edit are re-tokenized.
+                budget : :class:`~deltas.Budget`
+                    If provided, limits the work done by the diff.  When it
+                    runs out, the changed region is deleted and re-inserted
+                    and the operations are returned as a
+                    :class:`~deltas.algorithms.budget.TieredOperations`.
 
             :Returns:
                 A tuple of `operations`, `a_tokens`, `b_tokens`
             """
             token_class = token_class or self.token_class
-            tokens = self.tokenizer.tokenize(text, token_class=token_class)
-            operations = diff(self.last_tokens, tokens)
+            tokens = self._tokenize(text, span=span, token_class=token_class)
+            if self.vocabulary is not None:
+                ids = self.vocabulary.encode(tokens)
+                operations = self._diff(self.last_ids, ids, budget)
+                self.last_ids = ids
+            else:
+                operations = self._diff(self.last_tokens, tokens, budget)
 
             a = self.last_tokens
             b = tokens
             self.last_tokens = tokens
+            self.last_text = text
 
             return operations, a, b
 
+        def _diff(self, a, b, budget):
+            if budget is None:
+                return self.diff(a, b)
+            try:
+                return TieredOperations(self.diff(a, b, budget=budget))
+            except BudgetExceeded:
+                return TieredOperations(replace(a, b), tier=REPLACE)
+
     def __init__(self, tokenizer=None):
         self.tokenizer = tokenizer or TOKENIZER
 
@@ -134,6 +234,19 @@ class SequenceMatcher(DiffEngine):
         return cls()
 
 
+def offset_opcodes(opcodes, prefix, suffix, a_len, b_len):
+    """
+    Shifts the opcodes of the middle of two sequences by `prefix` and adds
+    "equal" opcodes for a common `prefix` and `suffix`.
+    """
+    if prefix > 0:
+        yield ("equal", 0, prefix, 0, prefix)
+    for op, a1, a2, b1, b2 in opcodes:
+        yield op, a1 + prefix, a2 + prefix, b1 + prefix, b2 + prefix
+    if suffix > 0:
+        yield ("equal", a_len - suffix, a_len, b_len - suffix, b_len)
+
+
 def parse_opcodes(opcodes):
 
     for opcode in opcodes:
@@ -142,3 +255,43 @@ def parse_opcodes(opcodes):
         parse = OP_PARSERS[op]
         for operation in parse(a_start, a_end, b_start, b_end):
             yield operation
+
+
+class _BudgetedSM(SM):
+    """
+    A :class:`difflib.SequenceMatcher` that spends a budget as it searches.
+    Each search is charged for the items of `a` that it visits and the
+    positions in `b` that those items could match.
+    """
+
+    def __init__(self, budget, a, b):
+        super().__init__(None, a, b)
+        self.budget = budget
+        # costs[i] is the total for a[:i]
+        self.costs = list(chain([0], accumulate(
+            1 + len(self.b2j.get(item, ())) for item in a)))
+
+    def find_longest_match(self, alo=0, ahi=None, blo=0, bhi=None):
+        ahi = len(self.a) if ahi is None else ahi
+        self.budget.spend(self.costs[ahi] - self.costs[alo])
+        return super().find_longest_match(alo, ahi, blo, bhi)
+
+
+def _sequence(items):
+    # Indexable sequences (e.g. a TokenStream) are trimmed without a copy
+    if hasattr(items, "__getitem__") and hasattr(items, "__len__"):
+        return items
+    else:
+        return list(items)
+
+
+def _replace_opcodes(a_len, b_len):
+    # Opcodes that delete all of `a` and insert all of `b`
+    if a_len > 0 and b_len > 0:
+        return [("replace", 0, a_len, 0, b_len)]
+    elif a_len > 0:
+        return [("delete", 0, a_len, 0, 0)]
+    elif b_len > 0:
+        return [("insert", 0, 0, 0, b_len)]
+    else:
+        return []
@@ -0,0 +1,129 @@
+from nose.tools import eq_, raises
+
+from ...apply import apply
+from ...segmenters import SegmentTree
+from ...tests.diff_and_replay import diff_and_replay
+from ...tokenizers import text_split
+from .. import histogram_diff, myers_diff, sequence_matcher
+from ..budget import TIERS, Budget, BudgetExceeded
+from ..histogram_diff import HistogramDiff
+from ..myers_diff import MyersDiff
+from ..segment_matcher import SEGMENTER, SegmentMatcher, diff, diff_segments
+from ..sequence_matcher import SequenceMatcher
+
+
+class FailingBudget(Budget):
+    """
+    A budget that runs out immediately for the first `failures` tiers.
+    """
+    def __init__(self, failures):
+        self.failures = failures + 1  # Construction restarts the budget
+        super().__init__()
+
+    def restart(self):
+        self.failures -= 1
+        return super().restart()
+
+    def spend(self, comparisons=1):
+        if self.failures > 0:
+            raise BudgetExceeded()
+
+
+def test_spend():
+    budget = Budget(comparisons=10)
+    budget.spend(10)
+    eq_(budget.spent, 10)
+    try:
+        budget.spend()
+    except BudgetExceeded:
+        pass
+    else:
+        assert False, "Budget should have run out"
+    eq_(budget.restart().spent, 0)
+
+
+@raises(BudgetExceeded)
+def test_deadline():
+    Budget(seconds=-1).spend()
+
+
+def test_inner_diffs():
+    a = text_split.tokenize("This is a sentence.  This is another one.")
+    b = text_split.tokenize("This is another sentence.  This is one.")
+    for inner_diff in (sequence_matcher.diff, myers_diff.diff,
+                       histogram_diff.diff):
+        eq_(list(inner_diff(a, b, budget=Budget(comparisons=10 ** 6))),
+            list(inner_diff(a, b)))
+        try:
+            inner_diff(a, b, budget=Budget(comparisons=1))
+        except BudgetExceeded:
+            pass
+        else:
+            assert False, "Budget should have run out"
+
+
+def test_diff_tiers():
+    for failures, tier in enumerate(TIERS):
+        def bounded_diff(a, b):
+            operations = diff(a, b, budget=FailingBudget(failures))
+            eq_(operations.tier, tier)
+            return operations
+
+        def bounded_diff_flat(a, b):
+            operations = diff_segments(
+                SegmentTree.from_segments(SEGMENTER.segment(a), a),
+                SegmentTree.from_segments(SEGMENTER.segment(b), b),
+                budget=FailingBudget(failures))
+            eq_(operations.tier, tier)
+            return operations
+
+        diff_and_replay(bounded_diff)
+        diff_and_replay(bounded_diff_flat)
+
+
+def test_diff_budget():
+    a = text_split.tokenize("Foo bar.  Baz.\n\nHerp derp.\n\nLast one.")
+    b = text_split.tokenize("Foo bar.  Baz.\n\nHerp a derp.\n\nLast one.")
+
+    operations = diff(a, b, budget=Budget(comparisons=10 ** 6))
+    eq_(operations.tier, "full")
+    eq_(list(operations), list(diff(a, b)))
+
+    b = text_split.tokenize("Foo bar.  Baz.\n\nSomething else.\n\nLast one.")
+    operations = diff(a, b, budget=Budget(comparisons=0))
+    eq_(operations.tier, "replace")
+    eq_([op.name for op in operations], ["equal", "delete", "insert", "equal"])
+
+
+def test_process_budget():
+    processor = SegmentMatcher().processor()
+    processor.process("Foo bar.  Baz.\n\nHerp derp.")
+    operations, a, b = processor.process("Foo bar.  Baz.\n\nHerp a derp.",
+                                         budget=FailingBudget(1))
+    eq_(operations.tier, "segments")
+    eq_(''.join(apply(operations, a, b)), "Foo bar.  Baz.\n\nHerp a derp.")
+
+
+def test_sequence_process_budget():
+    for engine in (SequenceMatcher(), MyersDiff(), HistogramDiff()):
+        processor = engine.processor()
+        processor.process("Foo bar.  Baz.\n\nHerp derp.")
+        operations, a, b = processor.process(
+            "Foo bar.  Baz.\n\nHerp a derp.",
+            budget=Budget(comparisons=10 ** 6))
+        eq_(operations.tier, "full")
+        eq_([op.name for op in operations], ["equal", "insert", "equal"])
+
+        operations, a, b = processor.process(
+            "Foo bar.  Baz.\n\nHerp derp.", budget=FailingBudget(1))
+        eq_(operations.tier, "replace")
+        eq_([op.name for op in operations], ["equal", "delete", "equal"])
+        eq_(''.join(apply(operations, a, b)), "Foo bar.  Baz.\n\nHerp derp.")
+
+        operations, a, b = processor.process(
+            "Foo bar.  Baz.\n\nSomething else.", budget=FailingBudget(1))
+        eq_(operations.tier, "replace")
+        eq_([op.name for op in operations],
+            ["equal", "delete", "insert", "equal"])
+        eq_(''.join(apply(operations, a, b)),
+            "Foo bar.  Baz.\n\nSomething else.")
@@ -0,0 +1,49 @@
+from nose.tools import eq_
+
+from ...apply import apply
+from ...synthetic import page, revisions
+from ...tests.diff_and_replay import diff_and_replay
+from ...tests.diff_sequence import diff_sequence
+from ...tokenizers import Vocabulary, wikitext_split
+from .. import histogram_diff, myers_diff, segment_matcher
+
+ENGINES = [myers_diff, histogram_diff]
+
+
+def test_diff_and_replay():
+    for engine in ENGINES:
+        diff_and_replay(engine.diff)
+
+
+def test_engine():
+    for engine in ENGINES:
+        diff_sequence(engine.process)
+
+
+def test_engine_vocabulary():
+    for engine in ENGINES:
+        diff_sequence(
+            lambda texts: engine.process(texts, vocabulary=Vocabulary()))
+
+
+def test_empty():
+    a = list("abcabba")
+    b = list("cbabac")
+    for engine in ENGINES:
+        eq_(list(engine.diff([], [])), [])
+        eq_([op.name for op in engine.diff([], b)], ["insert"])
+        eq_([op.name for op in engine.diff(a, [])], ["delete"])
+
+
+def test_revisions():
+    texts = [r.text for r in revisions(page(paragraphs=20, seed=1),
+                                       revisions=20, seed=1)]
+    for a, b in zip(texts, texts[1:]):
+        a, b = wikitext_split.tokenize(a), wikitext_split.tokenize(b)
+        for engine in ENGINES:
+            operations = list(engine.diff(a, b))
+            eq_(''.join(apply(operations, a, b)), ''.join(b))
+
+            operations = list(segment_matcher.diff(a, b,
+                                                   inner_diff=engine.diff))
+            eq_(''.join(apply(operations, a, b)), ''.join(b))
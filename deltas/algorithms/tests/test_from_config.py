@@ -30,3 +30,18 @@ def test_from_config():
 
     ops, a, b = text_operations[1]
     eq_(len(list(ops)), 4)
+
+    doc['diff_engines']['histogram_diff'] = {
+        'class': "deltas.algorithms.HistogramDiff"
+    }
+    histogram_diff = DiffEngine.from_config(doc, "histogram_diff")
+    text_operations = list(histogram_diff.process(["Foo bar.", "Foo burp."]))
+    ops, a, b = text_operations[1]
+    eq_(len(list(ops)), 4)
+
+    doc['diff_engines']['segment_matcher']['inner_diff'] = \
+        "deltas.algorithms.myers_diff.diff"
+    segment_matcher = DiffEngine.from_config(doc, "segment_matcher")
+    text_operations = list(segment_matcher.process(["Foo bar.", "Foo burp."]))
+    ops, a, b = text_operations[1]
+    eq_(len(list(ops)), 4)
@@ -0,0 +1,28 @@
+from nose.tools import eq_
+
+from ...apply import apply
+from ...operations import Delete, Equal, Insert
+from .. import myers_diff
+from ..histogram_diff import _anchor, diff
+
+
+def test_anchors():
+    # The longest run through a rare token anchors the match.  The common
+    # "x"s on their own do not.
+    a = list("xxxxaxxcxxb")
+    b = list("cxxbxxxxa")
+    eq_(list(diff(a, b)),
+        [Insert(0, 0, 0, 4), Equal(0, 5, 4, 9), Delete(5, 11, 9, 9)])
+
+    # Nothing is rare enough to anchor on
+    operations = list(diff(a, b, max_occurrences=0))
+    eq_(list(apply(operations, a, b)), b)
+
+
+def test_max_occurrences():
+    # "x" occurs max_occurrences + 1 times, so it can't anchor and the region
+    # falls through to myers_diff.
+    a, b = list("xx"), list("x")
+    eq_(_anchor(a, b, 0, 2, 0, 1, 1), None)
+    eq_(list(diff(a, b, max_occurrences=1)), list(myers_diff.diff(a, b)))
+    eq_(_anchor(a, b, 0, 2, 0, 1, 2), (0, 0, 1))
@@ -0,0 +1,29 @@
+from nose.tools import eq_
+
+from ...apply import apply
+from ...synthetic import page, revisions
+from ...tokenizers import wikitext_split
+from .. import sequence_matcher
+from ..myers_diff import diff
+
+
+def test_shortest():
+    a = list("abcabba")
+    b = list("cbabac")
+    operations = list(diff(a, b))
+    eq_(list(apply(operations, a, b)), b)
+    eq_(_cost(operations), 5)
+
+
+def test_revisions_shortest():
+    # No diff of the same tokens is shorter than Myers'
+    texts = [r.text for r in revisions(page(paragraphs=20, seed=1),
+                                       revisions=20, seed=1)]
+    for a, b in zip(texts, texts[1:]):
+        a, b = wikitext_split.tokenize(a), wikitext_split.tokenize(b)
+        eq_(_cost(diff(a, b)) <= _cost(sequence_matcher.diff(a, b)), True)
+
+
+def _cost(operations):
+    return sum(op.a2 - op.a1 + op.b2 - op.b1
+               for op in operations if op.name != "equal")
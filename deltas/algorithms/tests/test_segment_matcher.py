@@ -1,10 +1,15 @@
 from nose.tools import eq_
 
+from ...apply import apply
 from ...operations import Delete, Equal, Insert
+from ...segmenters import ParagraphsSentencesAndWhitespace, SegmentTree
 from ...tests.diff_and_replay import diff_and_replay
 from ...tests.diff_sequence import diff_sequence
-from ...tokenizers import wikitext_split
-from ..segment_matcher import diff, process
+from ...tokenizers import Vocabulary, text_split, wikitext_split
+from ..segment_matcher import (SEGMENTER, SegmentMatcher,
+                               _cluster_matching_nodes,
+                               _cluster_matching_segments, diff, diff_segments,
+                               process)
 
 
 def test_diff_and_replay():
@@ -77,7 +82,6 @@ they are unable to for health reasons. The two main tours are:
 
 
 def test_revisions():
-    from ...segmenters import ParagraphsSentencesAndWhitespace
     ParagraphsSentencesAndWhitespace()
     a = """
     {| class=&quot;wikitable&quot; |}
@@ -95,3 +99,141 @@ def test_revisions():
     added_content = ", ".join("".join(bt[i] for i in range(op.b1, op.b2))
                               for op in operations if op.name == "insert")
     eq_(added_content, " (of Dan and Jordan)")
+
+
+def test_engine_compact():
+    return diff_sequence(lambda texts: process(texts, compact=True))
+
+
+def test_engine_vocabulary():
+    return diff_sequence(
+        lambda texts: process(texts, vocabulary=Vocabulary()))
+
+
+def test_diff_and_replay_vocabulary():
+    return diff_and_replay(
+        lambda a, b: diff(a, b, vocabulary=Vocabulary()))
+
+
+def test_engine_incremental():
+    diff_sequence(lambda texts: process(texts, incremental=True))
+    diff_sequence(lambda texts: process(texts, incremental=True,
+                                        compact=True))
+
+
+def test_process_span():
+    processor = SegmentMatcher.Processor(tokenizer=wikitext_split)
+    processor.process("Apples are red.")
+    operations, a, b = processor.process("Apples are tasty and red.",
+                                         span=(11, 11, 21))
+    eq_(b, wikitext_split.tokenize("Apples are tasty and red."))
+    eq_(list(operations),
+        [Equal(0, 4, 0, 4), Insert(4, 4, 4, 8), Equal(4, 6, 8, 10)])
+
+
+def test_process_segments_incremental():
+    text = "Apples are red.  " * 80
+    other = "Pears wore out.  " * 80
+    assert len(text) > 1024 and len(other) == len(text)
+    edited = text[:-3] + "!  "
+
+    # Tokens that are passed in are not reused without their text
+    processor = SegmentMatcher.Processor(incremental=True)
+    processor.process(text)
+    tokens = text_split.tokenize(other)
+    processor.process_segments(SEGMENTER.segment(tokens), tokens=tokens)
+    operations, a, b = processor.process(edited)
+    eq_(''.join(b), edited)
+    eq_(''.join(apply(operations, a, b)), edited)
+
+    # Tokens read from the segments are held as a list
+    processor = SegmentMatcher.Processor(incremental=True)
+    processor.process(text)
+    processor.process_segments(SEGMENTER.segment(tokens))
+    operations, a, b = processor.process(edited)
+    eq_(''.join(a), other)
+    eq_(''.join(b), edited)
+    eq_(''.join(apply(operations, a, b)), edited)
+
+    # The text of pre-segmented tokens may be provided for re-tokenizing
+    processor.process_segments(SEGMENTER.segment(tokens), text=other)
+    eq_(processor.last_text, other)
+    operations, a, b = processor.process(edited)
+    eq_(''.join(b), edited)
+
+
+def test_engine_cache():
+    diff_sequence(lambda texts: process(texts, cache_size=16))
+    diff_sequence(lambda texts: process(texts, cache_size=1,
+                                        incremental=True, compact=True))
+
+
+def test_engine_flat():
+    diff_sequence(lambda texts: process(texts, flat=True))
+    diff_sequence(lambda texts: process(texts, flat=True, cache_size=16,
+                                        vocabulary=Vocabulary()))
+
+
+def test_diff_and_replay_flat():
+    def diff_trees(a, b):
+        a_tree = SegmentTree.from_segments(SEGMENTER.segment(a), a)
+        b_tree = SegmentTree.from_segments(SEGMENTER.segment(b), b)
+        return diff_segments(a_tree, b_tree)
+
+    return diff_and_replay(diff_trees)
+
+
+def test_diff_segments_affixes():
+    a = wikitext_split.tokenize("Foo bar.  Baz.\n\nHerp derp.\n\nLast one.")
+    b = wikitext_split.tokenize("Foo bar.  Baz.\n\nHerp a derp.\n\nLast one.")
+    expected = [Equal(0, 10, 0, 10), Insert(10, 10, 10, 12),
+                Equal(10, 17, 12, 19)]
+
+    a_segments, b_segments = SEGMENTER.segment(a), SEGMENTER.segment(b)
+    eq_(list(diff_segments(a_segments, b_segments)), expected)
+    eq_(list(diff_segments(SegmentTree.from_segments(a_segments, a),
+                           SegmentTree.from_segments(b_segments, b))),
+        expected)
+
+
+def test_diff_segments_copied_affix():
+    # The copied sentence is matched in the prefix that was set aside
+    a = wikitext_split.tokenize("Foo bar is here.  Baz.\n\nHerp derp.\n\n" +
+                                "Last one.")
+    b = wikitext_split.tokenize("Foo bar is here.  Baz.\n\nHerp derp.  " +
+                                "Foo bar is here.\n\nLast one.")
+    expected = [Equal(0, 16, 0, 16), Insert(16, 16, 16, 17),
+                Equal(0, 8, 17, 25), Equal(16, 21, 25, 30)]
+
+    a_segments, b_segments = SEGMENTER.segment(a), SEGMENTER.segment(b)
+    eq_(list(diff_segments(a_segments, b_segments)), expected)
+    eq_(list(diff_segments(SegmentTree.from_segments(a_segments, a),
+                           SegmentTree.from_segments(b_segments, b))),
+        expected)
+
+
+def test_cluster_affixes_flat():
+    # The paragraph that a and b start with also appears in a's middle, so
+    # it is matched from b's prefix on both paths.
+    a = wikitext_split.tokenize("Foo bar.  Baz.\n\nFoo bar.  Baz.\n\nHerp." +
+                                "\n\nLast one.")
+    b = wikitext_split.tokenize("Foo bar.  Baz.\n\nDerp.\n\nLast one.")
+    a_segments, b_segments = SEGMENTER.segment(a), SEGMENTER.segment(b)
+    a_tree = SegmentTree.from_segments(a_segments, a)
+    b_tree = SegmentTree.from_segments(b_segments, b)
+
+    clusters = _cluster_matching_segments(list(a_segments), list(b_segments),
+                                          2, 2)
+    flat_clusters = _cluster_matching_nodes(
+        a_tree, list(a_tree.segment()), b_tree, list(b_tree.segment()), 2, 2)
+    for segment_tokens, flat_segment_tokens in zip(clusters, flat_clusters):
+        eq_([_cluster_tuple(s_t) for s_t in flat_segment_tokens],
+            [_cluster_tuple(s_t) for s_t in segment_tokens])
+    eq_(_cluster_tuple(clusters[0][0]), ("cluster", "Foo bar.  Baz."))
+
+
+def _cluster_tuple(segment_or_token):
+    if isinstance(segment_or_token, str):
+        return ("token", str(segment_or_token))
+    else:
+        return ("cluster", ''.join(segment_or_token.tokens()))
@@ -1,6 +1,13 @@
+from difflib import SequenceMatcher as SM
+
+from nose.tools import eq_
+
+from ...apply import apply
+from ...operations import Delete, Equal, Insert
 from ...tests.diff_and_replay import diff_and_replay
 from ...tests.diff_sequence import diff_sequence
-from ..sequence_matcher import diff, process
+from ...tokenizers import Vocabulary, text_split
+from ..sequence_matcher import diff, parse_opcodes, process
 
 
 def test_diff_and_replay():
@@ -9,3 +16,46 @@ def test_diff_and_replay():
 
 def test_engine():
     return diff_sequence(process)
+
+
+def test_engine_compact():
+    return diff_sequence(lambda texts: process(texts, compact=True))
+
+
+def test_engine_vocabulary():
+    return diff_sequence(
+        lambda texts: process(texts, vocabulary=Vocabulary()))
+
+
+def test_engine_incremental():
+    diff_sequence(lambda texts: process(texts, incremental=True))
+    diff_sequence(lambda texts: process(texts, incremental=True,
+                                        compact=True))
+
+
+def test_diff_trimmed():
+    # The common suffix is matched rather than difflib's first match.
+    eq_(list(diff(list("a"), list("baa"))),
+        [Insert(0, 0, 0, 2), Equal(0, 1, 2, 3)])
+    eq_(list(diff(list("abcbcd"), list("abcd"))),
+        [Equal(0, 3, 0, 3), Delete(3, 5, 3, 3), Equal(5, 6, 3, 4)])
+
+    # Where tokens repeat, the alignment can differ from difflib's diff of
+    # the whole sequences.  No more tokens are changed for these.
+    for a, b in [("a", "baa"), ("abab", "ab"), ("aaba", "abaa"),
+                 ("the cat the dog the", "the dog the cat the end")]:
+        a, b = list(a), list(b)
+        operations = list(diff(a, b))
+        eq_(list(apply(operations, a, b)), b)
+        eq_(_changed(operations),
+            _changed(parse_opcodes(SM(None, a, b).get_opcodes())))
+
+    # TokenStreams are trimmed without being copied
+    a = text_split.tokenize_compact("This is a version.  It has some text.")
+    b = text_split.tokenize_compact("This is a version.  It has text.")
+    eq_(list(diff(a, b)), list(diff(list(a), list(b))))
+
+
+def _changed(operations):
+    return sum(op.a2 - op.a1 + op.b2 - op.b1 for op in operations
+               if not isinstance(op, Equal))
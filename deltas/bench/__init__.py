@@ -0,0 +1,187 @@
+"""
+A self-contained benchmark suite.  Corpora are generated locally (see
+:mod:`deltas.synthetic`) so that benchmarks can be run without network
+access.  Results are reported as JSON and can be compared against a saved
+baseline to spot regressions.
+
+Usage::
+
+    python -m deltas.bench [--size=<size>] [--repeat=<n>] [--output=<path>]
+                           [--compare=<path>] [--threshold=<ratio>]
+                           [--only=<name>]...
+
+.. autoclass:: deltas.bench.Corpus
+    :members:
+
+.. autofunction:: deltas.bench.run
+
+.. autofunction:: deltas.bench.compare
+"""
+import platform
+import statistics
+import time
+
+from .. import synthetic
+from ..about import __version__
+from ..tokenizers import wikitext_split
+from .benchmarks import BENCHMARKS
+
+SIZES = {
+    "small": {"paragraphs": 10, "sections": 2, "revisions": 10},
+    "medium": {"paragraphs": 40, "sections": 6, "revisions": 20},
+    "large": {"paragraphs": 200, "sections": 20, "revisions": 50}
+}
+"""
+Corpus parameters for each of the named sizes.
+"""
+
+
+class Corpus:
+    """
+    Constructs a pair of related texts, a pair of unrelated texts with the
+    same markup and a history of revisions.
+
+    :Parameters:
+        paragraphs : `int`
+            The number of paragraphs in the generated page
+        sections : `int`
+            The number of sections in the generated page
+        revisions : `int`
+            The number of revisions in the generated history
+        seed : `int`
+            A seed for the random number generator
+    """
+    def __init__(self, paragraphs=40, sections=6, revisions=20, seed=0):
+        self.parameters = {"paragraphs": paragraphs, "sections": sections,
+                           "revisions": revisions, "seed": seed}
+        self.history = list(synthetic.history(
+            synthetic.page(paragraphs, sections, seed=seed), revisions,
+            seed=seed))
+        self.a = self.history[0]
+        self.b = self.history[-1]
+        self.a_tokens = wikitext_split.tokenize(self.a)
+        self.b_tokens = wikitext_split.tokenize(self.b)
+        self.random_a_tokens = wikitext_split.tokenize(
+            synthetic.scramble(self.a, seed=seed))
+        self.random_b_tokens = wikitext_split.tokenize(
+            synthetic.scramble(self.a, seed=seed + 1))
+
+    @classmethod
+    def from_size(cls, size, seed=0):
+        """
+        Constructs a corpus of one of the named :data:`SIZES`.
+        """
+        return cls(seed=seed, **SIZES[size])
+
+    def info(self):
+        """
+        Returns a `dict` describing the corpus.
+        """
+        return dict(self.parameters,
+                    characters=len(self.a),
+                    tokens=len(self.a_tokens))
+
+
+def run(corpus, benchmarks=None, repeat=5, min_time=0.05):
+    """
+    Runs benchmarks against a corpus.
+
+    :Parameters:
+        corpus : :class:`~deltas.bench.Corpus`
+            The corpus to run benchmarks against
+        benchmarks : `list` ( `callable` )
+            Benchmarks to run.  Defaults to
+            :data:`~deltas.bench.benchmarks.BENCHMARKS`.
+        repeat : `int`
+            The number of timing measurements to take for each benchmark
+        min_time : `float`
+            Each measurement calls the benchmark enough times to take at
+            least this many seconds
+
+    :Returns:
+        A JSON-serializable `dict` of results.  Times are in seconds per call.
+    """
+    benchmarks = benchmarks or BENCHMARKS
+    results = {}
+    for benchmark in benchmarks:
+        results[benchmark.__name__] = measure(benchmark(corpus), repeat,
+                                              min_time)
+
+    return {
+        "deltas": __version__,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "corpus": corpus.info(),
+        "benchmarks": results
+    }
+
+
+def measure(func, repeat=5, min_time=0.05):
+    """
+    Times `func`.  Returns summary statistics of the time per call.
+    """
+    number = _calibrate(func, min_time)
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for _ in range(number):
+            func()
+        times.append((time.perf_counter() - start) / number)
+
+    return {
+        "number": number,
+        "repeat": repeat,
+        "min": min(times),
+        "median": statistics.median(times),
+        "mean": statistics.mean(times),
+        "stdev": statistics.stdev(times) if len(times) > 1 else 0.0
+    }
+
+
+def compare(results, baseline, threshold=0.1):
+    """
+    Compares the median times of `results` to a `baseline` produced by
+    :func:`~deltas.bench.run`.
+
+    :Parameters:
+        results : `dict`
+            Results from :func:`~deltas.bench.run`
+        baseline : `dict`
+            Results to compare against
+        threshold : `float`
+            A relative change in the median larger than this is reported as
+            a regression (or improvement)
+
+    :Returns:
+        A `list` of (`name`, `baseline median`, `median`, `ratio`,
+        `status`) tuples where `status` is one of "regression",
+        "improvement", "unchanged" or "new".
+    """
+    comparisons = []
+    for name, stats in results['benchmarks'].items():
+        if name not in baseline['benchmarks']:
+            comparisons.append((name, None, stats['median'], None, "new"))
+            continue
+
+        base_median = baseline['benchmarks'][name]['median']
+        ratio = stats['median'] / base_median if base_median > 0 else 1.0
+        if ratio > 1 + threshold:
+            status = "regression"
+        elif ratio < 1 - threshold:
+            status = "improvement"
+        else:
+            status = "unchanged"
+        comparisons.append((name, base_median, stats['median'], ratio, status))
+
+    return comparisons
+
+
+def _calibrate(func, min_time):
+    number = 1
+    while True:
+        start = time.perf_counter()
+        for _ in range(number):
+            func()
+        if time.perf_counter() - start >= min_time:
+            return number
+        number *= 2
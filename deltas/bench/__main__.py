@@ -0,0 +1,63 @@
+import argparse
+import json
+import sys
+
+from . import SIZES, Corpus, compare, run
+from .benchmarks import BENCHMARKS
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog="python -m deltas.bench",
+        description="Runs the deltas benchmark suite against a generated " +
+                    "corpus and reports the results as JSON.")
+    parser.add_argument("--size", choices=sorted(SIZES), default="medium",
+                        help="The size of the corpus to generate")
+    parser.add_argument("--seed", type=int, default=0,
+                        help="A seed for generating the corpus")
+    parser.add_argument("--repeat", type=int, default=5,
+                        help="The number of measurements per benchmark")
+    parser.add_argument("--min-time", type=float, default=0.05,
+                        help="The minimum number of seconds per measurement")
+    parser.add_argument("--only", action="append", default=None,
+                        choices=[b.__name__ for b in BENCHMARKS],
+                        help="Only run the named benchmark (repeatable)")
+    parser.add_argument("--output", type=argparse.FileType("w"),
+                        default=sys.stdout,
+                        help="Where to write JSON results (default: stdout)")
+    parser.add_argument("--compare", type=argparse.FileType("r"),
+                        help="A JSON file of baseline results to compare to")
+    parser.add_argument("--threshold", type=float, default=0.1,
+                        help="The relative change that counts as a " +
+                             "regression when comparing")
+    args = parser.parse_args(argv)
+
+    benchmarks = [b for b in BENCHMARKS
+                  if args.only is None or b.__name__ in args.only]
+    corpus = Corpus.from_size(args.size, seed=args.seed)
+    results = run(corpus, benchmarks, repeat=args.repeat,
+                  min_time=args.min_time)
+    json.dump(results, args.output, indent=2)
+    args.output.write("\n")
+
+    if args.compare is not None:
+        comparisons = compare(results, json.load(args.compare),
+                              threshold=args.threshold)
+        regressions = 0
+        for name, base_median, median, ratio, status in comparisons:
+            if ratio is None:
+                sys.stderr.write("{0:32} {1:>10}          {2:.6f}\n"
+                                 .format(name, status, median))
+            else:
+                sys.stderr.write("{0:32} {1:>10} {2:.6f} -> {3:.6f} ({4:.2f}x)\n"
+                                 .format(name, status, base_median, median,
+                                         ratio))
+            regressions += status == "regression"
+
+        return 1 if regressions > 0 else 0
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,155 @@
+"""
+Each benchmark is a function that takes a :class:`~deltas.bench.Corpus` and
+returns a callable to be timed.  Any setup work happens before the callable
+is returned so that it is not included in the measurements.
+
+.. autodata:: deltas.bench.benchmarks.BENCHMARKS
+"""
+import pickle
+import subprocess
+import sys
+
+from .. import (histogram_diff, myers_diff, segment_matcher,
+                sequence_matcher)
+from ..algorithms import SegmentMatcher, SequenceMatcher
+from ..segmenters import ParagraphsSentencesAndWhitespace
+from ..tokenizers import RegexTokenizer, text_split, wikitext_split
+from ..tokenizers.wikitext_split import LEXICON as WIKITEXT_LEXICON
+
+SEGMENTER = ParagraphsSentencesAndWhitespace()
+
+
+def import_deltas(corpus):
+    return lambda: subprocess.run([sys.executable, "-c", "import deltas"],
+                                  check=True)
+
+
+def tokenize_text_split(corpus):
+    return lambda: text_split.tokenize(corpus.a)
+
+
+def tokenize_wikitext_split(corpus):
+    return lambda: wikitext_split.tokenize(corpus.a)
+
+
+def tokenize_wikitext_split_dispatch(corpus):
+    tokenizer = RegexTokenizer(WIKITEXT_LEXICON, dispatch=True)
+    return lambda: tokenizer.tokenize(corpus.a)
+
+
+def tokenize_wikitext_split_no_dispatch(corpus):
+    tokenizer = RegexTokenizer(WIKITEXT_LEXICON, dispatch=False)
+    return lambda: tokenizer.tokenize(corpus.a)
+
+
+def segment(corpus):
+    return lambda: SEGMENTER.segment(corpus.a_tokens)
+
+
+def pickle_segments(corpus):
+    segments = SEGMENTER.segment(corpus.a_tokens)
+    return lambda: pickle.dumps(segments)
+
+
+def unpickle_segments(corpus):
+    pickled = pickle.dumps(SEGMENTER.segment(corpus.a_tokens))
+    return lambda: pickle.loads(pickled)
+
+
+def sequence_matcher_diff(corpus):
+    return lambda: list(sequence_matcher.diff(corpus.a_tokens,
+                                              corpus.b_tokens))
+
+
+def sequence_matcher_diff_random(corpus):
+    return lambda: list(sequence_matcher.diff(corpus.random_a_tokens,
+                                              corpus.random_b_tokens))
+
+
+def myers_diff_diff(corpus):
+    return lambda: list(myers_diff.diff(corpus.a_tokens, corpus.b_tokens))
+
+
+def histogram_diff_diff(corpus):
+    return lambda: list(histogram_diff.diff(corpus.a_tokens,
+                                            corpus.b_tokens))
+
+
+def histogram_diff_diff_random(corpus):
+    return lambda: list(histogram_diff.diff(corpus.random_a_tokens,
+                                            corpus.random_b_tokens))
+
+
+def segment_matcher_diff(corpus):
+    return lambda: list(segment_matcher.diff(corpus.a_tokens,
+                                             corpus.b_tokens))
+
+
+def segment_matcher_diff_myers(corpus):
+    return lambda: list(segment_matcher.diff(corpus.a_tokens,
+                                             corpus.b_tokens,
+                                             inner_diff=myers_diff.diff))
+
+
+def segment_matcher_diff_histogram(corpus):
+    return lambda: list(segment_matcher.diff(corpus.a_tokens,
+                                             corpus.b_tokens,
+                                             inner_diff=histogram_diff.diff))
+
+
+def segment_matcher_diff_random(corpus):
+    return lambda: list(segment_matcher.diff(corpus.random_a_tokens,
+                                             corpus.random_b_tokens))
+
+
+def segment_matcher_diff_segments(corpus):
+    a_segments = SEGMENTER.segment(corpus.a_tokens)
+    b_segments = SEGMENTER.segment(corpus.b_tokens)
+    return lambda: list(segment_matcher.diff_segments(a_segments,
+                                                      b_segments))
+
+
+def sequence_matcher_process(corpus):
+    return _process_history(SequenceMatcher(wikitext_split), corpus.history)
+
+
+def segment_matcher_process(corpus):
+    return _process_history(SegmentMatcher(wikitext_split), corpus.history)
+
+
+def _process_history(engine, history):
+    def process():
+        processor = engine.processor()
+        for text in history:
+            operations, a, b = processor.process(text)
+            for operation in operations:  # Operations may be generated lazily
+                pass
+
+    return process
+
+
+BENCHMARKS = [
+    import_deltas,
+    tokenize_text_split,
+    tokenize_wikitext_split,
+    tokenize_wikitext_split_dispatch,
+    tokenize_wikitext_split_no_dispatch,
+    segment,
+    pickle_segments,
+    unpickle_segments,
+    sequence_matcher_diff,
+    sequence_matcher_diff_random,
+    myers_diff_diff,
+    histogram_diff_diff,
+    histogram_diff_diff_random,
+    segment_matcher_diff,
+    segment_matcher_diff_myers,
+    segment_matcher_diff_histogram,
+    segment_matcher_diff_random,
+    segment_matcher_diff_segments,
+    sequence_matcher_process,
+    segment_matcher_process
+]
+"""
+All of the available benchmarks in the order that they are run.
+"""
@@ -0,0 +1,47 @@
+import json
+
+from nose.tools import eq_
+
+from .. import Corpus, compare, run
+from ..benchmarks import (BENCHMARKS, _process_history, segment,
+                          tokenize_text_split)
+
+
+def test_run_and_compare():
+    corpus = Corpus(paragraphs=3, sections=1, revisions=3)
+    for benchmark in BENCHMARKS:
+        benchmark(corpus)()
+
+    results = run(corpus, [tokenize_text_split, segment], repeat=2,
+                  min_time=0)
+    results = json.loads(json.dumps(results))
+    eq_(set(results['benchmarks']), {"tokenize_text_split", "segment"})
+    eq_(results['benchmarks']['segment']['repeat'], 2)
+
+    baseline = json.loads(json.dumps(results))
+    baseline['benchmarks']['segment']['median'] *= 2
+    del baseline['benchmarks']['tokenize_text_split']
+    statuses = {name: status
+                for name, _, _, _, status in compare(results, baseline)}
+    eq_(statuses, {"segment": "improvement", "tokenize_text_split": "new"})
+
+    baseline['benchmarks']['segment']['median'] /= 4
+    statuses = {name: status
+                for name, _, _, _, status in compare(results, baseline)}
+    eq_(statuses['segment'], "regression")
+
+
+def test_process_history_consumes_operations():
+    consumed = []
+
+    class Engine:
+        class Processor:
+            def process(self, text):
+                operations = (consumed.append(c) for c in text)
+                return operations, [], list(text)
+
+        def processor(self):
+            return self.Processor()
+
+    _process_history(Engine(), ["ab", "cde"])()
+    eq_(consumed, list("abcde"))
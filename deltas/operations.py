@@ -17,6 +17,8 @@ Specifically, this library understands and produces three types of operations:
 .. autoclass:: deltas.Equal
 
 .. autoclass:: deltas.Operation
+
+.. autofunction:: deltas.operations.char_spans
 """
 from collections import namedtuple
 
@@ -106,6 +108,47 @@ class Equal(Operation):
         return a[self.a1:self.a2]
 
 
+def char_spans(operation, a_offsets, b_offsets):
+    """
+    Translates the token positions of an operation into character positions.
+    The characters that the operation refers to can then be sliced directly
+    out of the original texts rather than re-joining tokens.
+
+    :Example:
+        >>> from deltas import segment_matcher, text_split
+        >>> from deltas.operations import char_spans
+        >>> from deltas.tokenizers.token_stream import token_offsets
+        >>>
+        >>> a_text, b_text = "This is some text.", "This is new text."
+        >>> a = text_split.tokenize(a_text)
+        >>> b = text_split.tokenize(b_text)
+        >>> a_offsets, b_offsets = token_offsets(a), token_offsets(b)
+        >>> for op in segment_matcher.diff(a, b):
+        ...     (a1, a2), (b1, b2) = char_spans(op, a_offsets, b_offsets)
+        ...     print(op.name, repr(a_text[a1:a2]), repr(b_text[b1:b2]))
+        ...
+        equal 'This is ' 'This is '
+        delete 'some' ''
+        insert '' 'new'
+        equal ' text.' ' text.'
+
+    :Parameters:
+        operation : :class:`~deltas.Operation`
+            An operation
+        a_offsets : `sequence` ( `int` )
+            The character offset of each token in the first sequence followed
+            by the end of the last token (see
+            :func:`~deltas.tokenizers.token_stream.token_offsets`)
+        b_offsets : `sequence` ( `int` )
+            Character offsets for the second sequence
+
+    :Returns:
+        ((`a_start`, `a_end`), (`b_start`, `b_end`))
+    """
+    return ((a_offsets[operation.a1], a_offsets[operation.a2]),
+            (b_offsets[operation.b1], b_offsets[operation.b2]))
+
+
 def print_operations(operations, a, b):
     for operation in operations:
         print("{0}: '{1}'".format(operation.name,
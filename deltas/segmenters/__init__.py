@@ -12,19 +12,31 @@ understood by :class:`~deltas.algorithms.segment_matcher`.
     :class:`~deltas.Segment` and
     :class:`~deltas.MatchableSegment`
 
+:class:`~deltas.SegmentTree`
+    stores a tree of segments in flat arrays so that it can be traversed
+    without recursion.
+
 :class:`~deltas.ParagraphsSentencesAndWhitespace`
     implements a
     :func:`~deltas.ParagraphsSentencesAndWhitespace.segment`
     function that clusters tokens into segments of paragraph and
     sentence :class:`~deltas.MatchableSegment` with whitespace
     :class:`~deltas.Segment` inbetween.
+
+:class:`~deltas.SectionsParagraphsSentencesAndWhitespace`
+    clusters the paragraphs of wikitext into sections that start at
+    headings.
 """
 
 from .paragraphs_sentences_and_whitespace import ParagraphsSentencesAndWhitespace
+from .sections_paragraphs_sentences_and_whitespace import \
+    SectionsParagraphsSentencesAndWhitespace
 from .segmenter import Segmenter
 from .segments import Segment, MatchableSegment
+from .segment_tree import SegmentTree
 from .functions import print_tree
 
 
-__all__ = [ParagraphsSentencesAndWhitespace, Segmenter,
-           Segment, MatchableSegment, print_tree]
+__all__ = [ParagraphsSentencesAndWhitespace,
+           SectionsParagraphsSentencesAndWhitespace, Segmenter,
+           Segment, MatchableSegment, SegmentTree, print_tree]
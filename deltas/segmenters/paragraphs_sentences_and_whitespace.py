@@ -1,4 +1,5 @@
-from ..util import LookAhead
+from ..tokenizers.token import TYPE_NAMES, type_code, type_codes, type_mask
+from .segment_tree import MATCHABLE, SEGMENT, SegmentTree
 from .segmenter import Segmenter
 from .segments import MatchableSegment, Segment
 
@@ -10,6 +11,9 @@ SUB_OPEN = {"brack_open", "dbrack_open", "paren_open", "ref_open",
 SUB_CLOSE = {"brack_close", "dbrack_close", "paren_close", "ref_close",
              "comment_end", "dcurly_close"}
 MIN_SENTENCE = 3
+BLOCKS = [("tab_open", "tab_close")]
+MARKUP_BLOCKS = BLOCKS + [("dcurly_open", "dcurly_close"),
+                          ("ref_open", "ref_close")]
 
 
 class ParagraphsSentencesAndWhitespace(Segmenter):
@@ -22,7 +26,7 @@ class ParagraphsSentencesAndWhitespace(Segmenter):
 
     * whitespace : :class:`~deltas.Segment`
     * paragraph : :class:`~deltas.MatchableSegment`
-      * sentence : :class:`~deltas.MatchableSegment`
+      * sentence or block : :class:`~deltas.MatchableSegment`
       * whitespace : :class:`~deltas.Segment`
 
     :Example:
@@ -51,76 +55,255 @@ class ParagraphsSentencesAndWhitespace(Segmenter):
         min_sentence : `int`
             The minimum non-whitespace tokens that a sentence must contain
             before a sentence_end will be entertained.
+        blocks : `list` ( ( `str`, `str` ) )
+            Pairs of opening and closing token types.  Where a sentence
+            would start with an opening token, the tokens up to its balanced
+            closing token are a single matchable block instead.  Defaults to
+            tables.  Use `MARKUP_BLOCKS` to include templates and references
+            so that large infoboxes and citations are matched whole.
+        break_unclosed : `bool`
+            If set, a block that never closes ends at the next paragraph_end
+            rather than running on to the end of the tokens.  Defaults to
+            set for any `blocks` other than `BLOCKS` so that tables are
+            segmented as they always have been.
+        vectorized : `bool`
+            If set, segment boundaries are found with `numpy` array
+            operations over the token type codes rather than one token at a
+            time.  The segments produced are the same.  Requires `numpy`.
     """  # noqa
 
     def __init__(self, *, whitespace=None, paragraph_end=None,
-                 sentence_end=None, min_sentence=None):
+                 sentence_end=None, min_sentence=None, blocks=None,
+                 break_unclosed=None, vectorized=False):
 
         self.whitespace = set(whitespace or WHITESPACE)
         self.paragraph_end = set(paragraph_end or PARAGRAPH_END)
         self.sentence_end = set(sentence_end or SENTENCE_END)
         self.min_sentence = int(min_sentence or MIN_SENTENCE)
+        self.blocks = [tuple(pair) for pair in (blocks or BLOCKS)]
+        if break_unclosed is None:
+            break_unclosed = self.blocks != BLOCKS
+        self.break_unclosed = bool(break_unclosed)
+        self.vectorized = bool(vectorized)
 
-    def segment(self, tokens):
+    def segment(self, tokens, cache=None):
         """
         Segments a sequence of tokens into a sequence of segments.
 
         :Parameters:
             tokens : `list` ( :class:`~deltas.Token` )
+                Tokens or token-like objects with a `type`
+            cache : `dict`
+                If provided, paragraphs are stored in `cache` keyed by their
+                tokens.  When a paragraph with the same tokens appears in a
+                later call, a copy of the cached paragraph is re-used rather
+                than segmenting it again.  See :class:`deltas.util.LRUCache`.
         """
-        look_ahead = LookAhead(tokens)
+        if not isinstance(tokens, list):
+            tokens = list(tokens)
+        builder = _SegmentBuilder(tokens, cache)
+        self._build(tokens, builder)
+        return builder.segments
 
-        segments = Segment()
+    def segment_tree(self, tokens, cache=None):
+        """
+        Segments a sequence of tokens straight into the arrays of a
+        :class:`~deltas.SegmentTree`.  The tree is the same as
+        ``SegmentTree.from_segments(self.segment(tokens), tokens)``, but no
+        :class:`~deltas.Segment` is built along the way.
+
+        :Parameters:
+            tokens : `list` ( :class:`~deltas.Token` ) | :class:`~deltas.TokenStream`
+                Tokens or token-like objects with a `type`
+            cache : `dict`
+                If provided, the nodes of paragraphs are stored in `cache`
+                keyed by their tokens and re-used by later calls.
+        """  # noqa
+        builder = _TreeBuilder(tokens, cache)
+        self._build(tokens, builder)
+        return builder.tree
+
+    def _build(self, tokens, builder):
+        if self.vectorized:
+            self._build_vectorized(tokens, builder)
+        else:
+            self._build_scanning(tokens, builder)
+
+    def _build_scanning(self, tokens, builder):
+        n = len(tokens)
+
+        # Token types are tested as bits in a mask of type codes
+        codes = type_codes(tokens)
+        whitespace = type_mask(self.whitespace)
+        paragraph_end = type_mask(self.paragraph_end)
+        sentence_end = type_mask(self.sentence_end)
+        sub_open = type_mask(SUB_OPEN)
+        sub_close = type_mask(SUB_CLOSE)
+        block_close = {type_code(open_type): type_code(close_type)
+                       for open_type, close_type in self.blocks}
+        unclosed_end = paragraph_end if self.break_unclosed else 0
+
+        block_ends = None
+
+        i = 0
+        while i < n:
+
+            if (whitespace >> codes[i]) & 1:
+                builder.whitespace(i)
+                i += 1
+                continue
+
+            # Paragraph!
+            if builder.cache is not None:
+                end = i
+                while end < n and not (paragraph_end >> codes[end]) & 1:
+                    end += 1
+                if builder.cached(i, end):
+                    i = end
+                    continue
+
+            start = i
+            children = []
+            cut_short = False
+            while i < n and not (paragraph_end >> codes[i]) & 1:
+
+                if codes[i] in block_close:  # Table, etc.
+                    if block_ends is None:
+                        block_ends = _block_ends(codes, block_close)
+                    stop, cut = _block_end(codes, i, block_ends, unclosed_end)
+                    cut_short |= cut
+
+                elif not (whitespace >> codes[i]) & 1:  # Sentence!
+                    stop = i + 1
+                    sub_depth = (sub_open >> codes[i]) & 1
+                    non_whitespace = 1
+                    while stop < n and not (paragraph_end >> codes[stop]) & 1:
+
+                        code = codes[stop]
+                        sub_depth += (sub_open >> code) & 1
+                        sub_depth -= (sub_close >> code) & 1
+                        non_whitespace += not (whitespace >> code) & 1
+                        stop += 1
+
+                        if (sentence_end >> code) & 1 and \
+                                sub_depth <= 0 and \
+                                non_whitespace >= self.min_sentence:
+                            break
 
-        while not look_ahead.empty():
+                else:  # tokens[i] is whitespace
+                    children.append((SEGMENT, i, i + 1))
+                    i += 1
+                    continue
 
-            if look_ahead.peek().type not in self.whitespace:  # Paragraph!
-                paragraph = MatchableSegment(look_ahead.i)
+                children.append((MATCHABLE, i, stop))
+                i = stop
 
-                while not look_ahead.empty() and \
-                        look_ahead.peek().type not in self.paragraph_end:
+            builder.paragraph(start, i, children, cut_short)
 
-                    if look_ahead.peek().type == "tab_open":  # Table
-                        tab_depth = 1
-                        sentence = MatchableSegment(
-                            look_ahead.i, [next(look_ahead)])
-                        while not look_ahead.empty() and tab_depth > 0:
-                            tab_depth += look_ahead.peek().type == "tab_open"
-                            tab_depth -= look_ahead.peek().type == "tab_close"
-                            sentence.append(next(look_ahead))
+    def _build_vectorized(self, tokens, builder):
+        import numpy
 
-                        paragraph.append(sentence)
+        n = len(tokens)
 
-                    elif look_ahead.peek().type not in self.whitespace:  # Sentence!
-                        sentence = MatchableSegment(
-                            look_ahead.i, [next(look_ahead)])
-                        sub_depth = int(sentence[0].type in SUB_OPEN)
-                        while not look_ahead.empty() and look_ahead.peek().type not in self.paragraph_end:
+        # Masks must be built before the lookup tables are sized so that
+        # the codes of all of the named types exist.
+        masks = [type_mask(self.whitespace), type_mask(self.paragraph_end),
+                 type_mask(self.sentence_end), type_mask(SUB_OPEN),
+                 type_mask(SUB_CLOSE)]
+        block_masks = [(type_mask([open_type]), type_mask([close_type]))
+                       for open_type, close_type in self.blocks]
+        codes = numpy.array(type_codes(tokens), dtype=numpy.intp)
 
-                            sub_depth += look_ahead.peek().type in SUB_OPEN
-                            sub_depth -= look_ahead.peek().type in SUB_CLOSE
-                            sentence.append(next(look_ahead))
+        def lookup(mask):
+            return numpy.array([(mask >> code) & 1
+                                for code in range(len(TYPE_NAMES))],
+                               dtype=numpy.int8)[codes]
 
-                            if sentence[-1].type in \
-                                    self.sentence_end and sub_depth <= 0:
-                                non_whitespace = sum(
-                                    s.type not in self.whitespace
-                                    for s in sentence)
-                                if non_whitespace >= self.min_sentence:
-                                    break
+        (whitespace, paragraph_end, sentence_end, sub_open,
+         sub_close) = (lookup(mask) for mask in masks)
 
-                        paragraph.append(sentence)
+        # Prefix sums: x[i] is the total for tokens[:i]
+        non_whitespace = _prefix_sum(numpy, 1 - whitespace)
+        sub_depth = _prefix_sum(numpy, sub_open - sub_close)
+        # block[i] is the number of the block that tokens[i] opens (from 1)
+        block = numpy.zeros(n, dtype=numpy.intp)
+        block_depths = [None]
+        # block_lows[number][k] is the lowest depth in block_depths[number][k:]
+        block_lows = [None]
+        for number, (open_mask, close_mask) in enumerate(block_masks, 1):
+            block_open = lookup(open_mask)
+            block[block_open == 1] = number
+            depth = _prefix_sum(numpy, block_open - lookup(close_mask))
+            block_depths.append(depth)
+            block_lows.append(numpy.minimum.accumulate(depth[::-1])[::-1])
+        breaks = numpy.flatnonzero(paragraph_end)
 
-                    else:  # look_ahead.peek().type in self.whitespace
-                        whitespace = Segment(look_ahead.i, [next(look_ahead)])
-                        paragraph.append(whitespace)
+        def paragraph_end_at(i):
+            b = numpy.searchsorted(breaks, i)
+            return int(breaks[b]) if b < len(breaks) else n
 
-                segments.append(paragraph)
-            else:  # look_ahead.peek().type in self.whitespace
-                whitespace = Segment(look_ahead.i, [next(look_ahead)])
-                segments.append(whitespace)
+        def block_end(start):
+            # The block closes at the first token that returns its depth to
+            # where it was before it was opened.  The lowest depth that
+            # follows tells whether it closes without scanning for it.
+            depth = block_depths[block[start]]
+            level = depth[start]
+            lows = block_lows[block[start]]
+            if start + 2 <= n and lows[start + 2] <= level:
+                last = _first(lambda a, b: depth[a + 1:b + 1] <= level,
+                              start + 1, n)
+                return last + 1, False
+            elif self.break_unclosed:
+                stop = paragraph_end_at(start)
+                return stop, stop < n
+            else:
+                return n, False
 
-        return segments
+        def sentence_end_at(start, end):
+            # Like the scanning segmenter, the first token only ever opens a
+            # sub-segment.
+            depth = sub_depth[start] - sub_close[start]
+            count = non_whitespace[start] + self.min_sentence
+            lo = max(start + 1,
+                     int(numpy.searchsorted(non_whitespace, count)) - 1)
+            last = _first(lambda a, b: sentence_end[a:b].astype(bool) &
+                          (sub_depth[a + 1:b + 1] <= depth) &
+                          (non_whitespace[a + 1:b + 1] >= count),
+                          lo, end)
+            return min(last + 1, end)
+
+        i = 0
+        while i < n:
+            if whitespace[i]:
+                builder.whitespace(i)
+                i += 1
+                continue
+
+            # Paragraph!
+            if builder.cache is not None:
+                end = paragraph_end_at(i)
+                if builder.cached(i, end):
+                    i = end
+                    continue
+
+            start = i
+            children = []
+            cut_short = False
+            while i < n and not paragraph_end[i]:
+                if block[i]:  # Table, etc.
+                    stop, cut = block_end(i)
+                    cut_short |= cut
+                    children.append((MATCHABLE, i, stop))
+                    i = stop
+                elif not whitespace[i]:  # Sentence!
+                    stop = sentence_end_at(i, paragraph_end_at(i + 1))
+                    children.append((MATCHABLE, i, stop))
+                    i = stop
+                else:
+                    children.append((SEGMENT, i, i + 1))
+                    i += 1
+
+            builder.paragraph(start, i, children, cut_short)
 
     @classmethod
     def from_config(cls, config, name, section_key="segmenters"):
@@ -129,5 +312,181 @@ class ParagraphsSentencesAndWhitespace(Segmenter):
             whitespace=section.get('whitespace'),
             paragraph_end=section.get('paragraph_end'),
             sentence_end=section.get('sentence_end'),
-            min_sentence=section.get('min_sentence')
+            min_sentence=section.get('min_sentence'),
+            blocks=section.get('blocks'),
+            break_unclosed=section.get('break_unclosed'),
+            vectorized=section.get('vectorized', False)
         )
+
+
+def _prefix_sum(numpy, values):
+    sums = numpy.zeros(len(values) + 1, dtype=numpy.intp)
+    numpy.cumsum(values, out=sums[1:])
+    return sums
+
+
+def _block_ends(codes, block_close):
+    """
+    Returns a `dict` that maps the index of each opening token that is
+    balanced by a closing token to the end of its block.  Blocks are matched
+    in one pass so that finding the end of every block stays linear, even on
+    pages where none of them close.
+    """
+    open_indexes = {block_open: [] for block_open in block_close}
+    closes = {}
+    for block_open, close in block_close.items():
+        closes.setdefault(close, []).append(block_open)
+
+    ends = {}
+    for i, code in enumerate(codes):
+        if code in open_indexes:
+            open_indexes[code].append(i)
+        elif code in closes:
+            for block_open in closes[code]:
+                if open_indexes[block_open]:
+                    ends[open_indexes[block_open].pop()] = i + 1
+
+    return ends
+
+
+def _block_end(codes, start, block_ends, paragraph_end):
+    """
+    Returns the end of the block that the token at codes[start] opens and
+    whether it was cut short.  A block that never closes ends at the first
+    of the `paragraph_end` types so that an unbalanced opening token doesn't
+    swallow the rest of the page.  If the mask is empty, it runs on to the
+    end of the codes.
+    """
+    if start in block_ends:
+        return block_ends[start], False
+
+    if paragraph_end:
+        for i in range(start, len(codes)):
+            if (paragraph_end >> codes[i]) & 1:
+                return i, True
+
+    return len(codes), False
+
+
+def _first(test, lo, hi, size=64):
+    """
+    Returns the first index in [lo, hi) where `test(a, b)`, a boolean array
+    for the indexes in [a, b), is set or `hi` if there is none.  Windows
+    double in size so that the work done is proportional to the distance
+    scanned.
+    """
+    while lo < hi:
+        stop = min(hi, lo + size)
+        found = test(lo, stop)
+        i = int(found.argmax())
+        if found[i]:
+            return lo + i
+        lo = stop
+        size *= 2
+    return hi
+
+
+class _SegmentBuilder:
+    """
+    Collects paragraphs as a :class:`~deltas.Segment` tree.
+    """
+
+    def __init__(self, tokens, cache):
+        self.tokens = tokens
+        self.cache = cache
+        self.segments = Segment()
+        self.key = None
+
+    def whitespace(self, i):
+        self.segments.append(Segment(i, [self.tokens[i]]))
+
+    def cached(self, start, end):
+        # A table can continue past the end of a paragraph, so note whether
+        # there was a paragraph_end.
+        self.key = (end < len(self.tokens), tuple(self.tokens[start:end]))
+        self.end = end
+        cached = self.cache.get(self.key)
+        if cached is not None:
+            self.segments.append(cached.rebase(start))
+        return cached is not None
+
+    def paragraph(self, start, end, children, cut_short):
+        paragraph = MatchableSegment(start)
+        for kind, child_start, child_end in children:
+            paragraph.append(_segment(
+                MatchableSegment if kind == MATCHABLE else Segment,
+                self.tokens, child_start, child_end))
+        self.segments.append(paragraph)
+
+        # Whether a block is cut short depends on the tokens after the
+        # paragraph, so such paragraphs are not cached.
+        if self.key is not None and not cut_short and self.end == end:
+            self.cache[self.key] = paragraph
+        self.key = None
+
+
+class _TreeBuilder:
+    """
+    Writes paragraphs straight into the arrays of a
+    :class:`~deltas.SegmentTree`.  Cached paragraphs are stored as rows of
+    (`kind`, `start`, `end`, `fingerprint`) relative to their start.
+    """
+
+    def __init__(self, tokens, cache):
+        self.tree = SegmentTree(tokens)
+        self.cache = cache
+        self.last_child = [-1]
+        self.tree._add(SEGMENT, -1, 0, self.last_child)
+        self.tree.end[0] = len(tokens)
+        self.key = None
+
+    def whitespace(self, i):
+        self._node(SEGMENT, 0, i, i + 1)
+
+    def cached(self, start, end):
+        tokens = self.tree.tokens
+        self.key = ("tree", end < len(tokens), tuple(tokens[start:end]))
+        self.end = end
+        cached = self.cache.get(self.key)
+        if cached is not None:
+            rows = iter(cached)
+            kind, _, length, fingerprint = next(rows)
+            paragraph = self._node(kind, 0, start, start + length,
+                                   fingerprint)
+            for kind, child_start, child_end, fingerprint in rows:
+                self._node(kind, paragraph, start + child_start,
+                           start + child_end, fingerprint)
+        return cached is not None
+
+    def paragraph(self, start, end, children, cut_short):
+        tree = self.tree
+        paragraph = self._node(MATCHABLE, 0, start, end)
+        for kind, child_start, child_end in children:
+            child = self._node(kind, paragraph, child_start, child_end)
+            if kind == MATCHABLE:
+                tree.fingerprint[child] = tree._digest(
+                    child, MatchableSegment.digest)
+        tree.fingerprint[paragraph] = tree._digest(
+            paragraph, MatchableSegment.digest)
+
+        if self.key is not None and not cut_short and self.end == end:
+            self.cache[self.key] = tuple(
+                (tree.kind[node], tree.start[node] - start,
+                 tree.end[node] - start, tree.fingerprint[node])
+                for node in range(paragraph, len(tree)))
+        self.key = None
+
+    def _node(self, kind, parent, start, end, fingerprint=0):
+        node = self.tree._add(kind, parent, start, self.last_child)
+        self.tree.end[node] = end
+        self.tree.fingerprint[node] = fingerprint
+        return node
+
+
+def _segment(cls, tokens, start, end):
+    # Constructs a segment of tokens[start:end] without appending tokens one
+    # at a time.
+    segment = cls(start)
+    list.extend(segment, tokens[start:end])
+    segment.length = end - start
+    return segment
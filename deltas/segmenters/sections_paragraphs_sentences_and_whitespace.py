@@ -0,0 +1,145 @@
+from ..tokenizers.token import type_codes, type_mask
+from .paragraphs_sentences_and_whitespace import \
+    ParagraphsSentencesAndWhitespace
+from .segmenter import Segmenter
+from .segments import MatchableSegment, Segment
+
+HEADING = {"equals"}
+
+
+class SectionsParagraphsSentencesAndWhitespace(
+        ParagraphsSentencesAndWhitespace):
+    """
+    Constructs a sections, paragraphs, sentences and whitespace segmenter.
+    This segmenter is intended to be used with wikitext (see
+    :data:`~deltas.wikitext_split`) where long articles are divided into
+    sections by headings.  A section starts at a heading token (``==``) at
+    the beginning of a line and runs until the next heading.  Text before
+    the first heading is a section too.  When a section is unchanged between
+    two versions, it is matched as a whole, so its paragraphs and sentences
+    are never visited.
+
+    Tree structure:
+
+    * whitespace : :class:`~deltas.Segment`
+    * section : :class:`~deltas.MatchableSegment`
+      * paragraph : :class:`~deltas.MatchableSegment`
+        * sentence : :class:`~deltas.MatchableSegment`
+        * whitespace : :class:`~deltas.Segment`
+      * whitespace : :class:`~deltas.Segment`
+
+    :Example:
+        >>> from deltas import SectionsParagraphsSentencesAndWhitespace
+        >>> from deltas import wikitext_split
+        >>>
+        >>> a = wikitext_split.tokenize("Lead.\\n== Heading ==\\nBody.")
+        >>>
+        >>> segmenter = SectionsParagraphsSentencesAndWhitespace()
+        >>> segments = segmenter.segment(a)
+        >>>
+        >>> [(type(segment).__name__, str(segment)) for segment in segments]
+        [('MatchableSegment', 'Lead.'), ('Segment', '\\n'), ('MatchableSegment', '== Heading ==\\nBody.')]
+
+    :Parameters:
+        heading : `set` ( `str` )
+            A set of token types that start a section when they appear at
+            the beginning of a line.
+        kwargs : `dict`
+            Passed to :class:`~deltas.ParagraphsSentencesAndWhitespace`
+    """  # noqa
+
+    def __init__(self, *, heading=None, **kwargs):
+        super().__init__(**kwargs)
+        self.heading = set(heading or HEADING)
+
+    def segment(self, tokens, cache=None):
+        """
+        Segments a sequence of tokens into a sequence of segments.
+
+        :Parameters:
+            tokens : `list` ( :class:`~deltas.Token` )
+                Tokens or token-like objects with a `type`
+            cache : `dict`
+                If provided, sections and paragraphs are stored in `cache`
+                keyed by their tokens and re-used by later calls.  See
+                :class:`deltas.util.LRUCache`.
+        """
+        if not isinstance(tokens, list):
+            tokens = list(tokens)
+
+        whitespace = type_mask(self.whitespace)
+        heading = type_mask(self.heading)
+        codes = type_codes(tokens)
+
+        starts = [i for i, code in enumerate(codes)
+                  if (heading >> code) & 1 and
+                  (i == 0 or tokens[i - 1].endswith(("\n", "\r")))]
+        if len(starts) == 0 or starts[0] != 0:
+            starts.insert(0, 0)
+        ends = starts[1:] + [len(tokens)]
+
+        segments = Segment()
+        for start, end in zip(starts, ends):
+            # Leading and trailing whitespace is left out of the section
+            while start < end and (whitespace >> codes[start]) & 1:
+                segments.append(Segment(start, [tokens[start]]))
+                start += 1
+            content_end = end
+            while content_end > start and \
+                    (whitespace >> codes[content_end - 1]) & 1:
+                content_end -= 1
+
+            if start < content_end:
+                segments.append(
+                    self._section(tokens, start, content_end, cache))
+
+            for i in range(content_end, end):
+                segments.append(Segment(i, [tokens[i]]))
+
+        return segments
+
+    def segment_tree(self, tokens, cache=None):
+        """
+        Segments a sequence of tokens into a :class:`~deltas.SegmentTree`.
+        Sections are built as :class:`~deltas.Segment` and then copied into
+        the tree.
+        """
+        return Segmenter.segment_tree(self, tokens, cache=cache)
+
+    def _section(self, tokens, start, end, cache):
+        if cache is not None:
+            key = ("section", tuple(tokens[start:end]))
+            cached = cache.get(key)
+            if cached is not None:
+                return cached.rebase(start)
+
+        section = MatchableSegment(start)
+        for subsegment in super().segment(tokens[start:end], cache=cache):
+            _shift(subsegment, start)
+            section.append(subsegment)
+
+        if cache is not None:
+            cache[key] = section
+        return section
+
+    @classmethod
+    def from_config(cls, config, name, section_key="segmenters"):
+        section = config[section_key][name]
+        return cls(
+            heading=section.get('heading'),
+            whitespace=section.get('whitespace'),
+            paragraph_end=section.get('paragraph_end'),
+            sentence_end=section.get('sentence_end'),
+            min_sentence=section.get('min_sentence'),
+            blocks=section.get('blocks'),
+            break_unclosed=section.get('break_unclosed'),
+            vectorized=section.get('vectorized', False)
+        )
+
+
+def _shift(segment, delta):
+    # Moves a segment tree that was built over a slice of tokens in place
+    segment.start += delta
+    for subsegment in segment:
+        if isinstance(subsegment, Segment):
+            _shift(subsegment, delta)
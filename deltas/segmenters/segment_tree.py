@@ -0,0 +1,331 @@
+"""
+A flat representation of a tree of segments.
+
+A :class:`~deltas.SegmentTree` stores the nodes of a
+:class:`~deltas.Segment` tree in parallel :class:`array.array` columns rather
+than as nested lists.  Nodes are numbered in depth-first order with the root
+at 0.  Each node only records the range of tokens that it covers, so the
+tokens that sit directly inside of a node are the ones that aren't covered by
+any of its children.  Every traversal is iterative, so deeply nested trees
+can't exhaust the stack.
+
+:class:`~deltas.segmenters.segment_tree.SegmentView` provides a read-only,
+:class:`~deltas.Segment`-like view of a single node.
+
+.. autoclass:: deltas.SegmentTree
+    :members:
+
+.. autoclass:: deltas.segmenters.segment_tree.SegmentView
+    :members:
+"""
+from array import array
+
+from .segments import FINGERPRINT_MARKER, MatchableSegment, Segment
+
+SEGMENT = 0
+MATCHABLE = 1
+
+
+class SegmentTree:
+    """
+    Constructs an empty tree over a sequence of tokens.  Use
+    :func:`~deltas.SegmentTree.from_segments` to build a tree.
+
+    :Parameters:
+        tokens : `list` ( :class:`~deltas.Token` ) | :class:`~deltas.TokenStream`
+            The tokens that the tree was built over
+
+    :Attributes:
+        kind : `array` ( `int` )
+            `SEGMENT` (0) or `MATCHABLE` (1) for each node
+        start : `array` ( `int` )
+            The index of the first token in each node
+        end : `array` ( `int` )
+            The index after the last token in each node
+        parent : `array` ( `int` )
+            The parent of each node (-1 for the root)
+        first_child : `array` ( `int` )
+            The first child of each node (-1 for none)
+        next_sibling : `array` ( `int` )
+            The next child of the same parent (-1 for none)
+        fingerprint : `array` ( `int` )
+            :attr:`~deltas.MatchableSegment.fingerprint` of each matchable
+            node (0 for plain segments)
+    """  # noqa
+    __slots__ = ("tokens", "kind", "start", "end", "parent", "first_child",
+                 "next_sibling", "fingerprint")
+
+    def __init__(self, tokens):
+        self.tokens = tokens
+        self.kind = array('B')
+        self.start = array('q')
+        self.end = array('q')
+        self.parent = array('q')
+        self.first_child = array('q')
+        self.next_sibling = array('q')
+        self.fingerprint = array('Q')
+
+    @classmethod
+    def from_segments(cls, segments, tokens=None):
+        """
+        Builds a tree from a :class:`~deltas.Segment` tree.  Token positions
+        are counted from the start of `segments`.  Fingerprints that have
+        not been computed yet are computed on the tree and stored back on
+        the segments.
+
+        :Parameters:
+            segments : :class:`~deltas.Segment`
+                The root of a tree of segments
+            tokens : `list` ( :class:`~deltas.Token` )
+                The tokens of `segments` if they are already available
+
+        :Returns:
+            A :class:`~deltas.SegmentTree`
+        """
+        collect = tokens is None
+        tree = cls([] if collect else tokens)
+        last_child = [-1]
+        tree._add(_kind(segments), -1, 0, last_child)
+
+        pos = 0
+        stack = [(0, segments, iter(segments))]
+        while len(stack) > 0:
+            node, segment, subsegments = stack[-1]
+            for subsegment in subsegments:
+                if isinstance(subsegment, Segment):
+                    child = tree._add(_kind(subsegment), node, pos,
+                                      last_child)
+                    stack.append((child, subsegment, iter(subsegment)))
+                    break
+                else:
+                    if collect:
+                        tree.tokens.append(subsegment)
+                    pos += 1
+            else:
+                stack.pop()
+                tree.end[node] = pos
+                if tree.kind[node] == MATCHABLE:
+                    if segment._fingerprint is None:
+                        segment._fingerprint = tree._digest(
+                            node, segment.digest)
+                    tree.fingerprint[node] = segment._fingerprint
+
+        return tree
+
+    def _add(self, kind, parent, pos, last_child):
+        # `last_child` holds the last child added to each node so far
+        node = len(self.kind)
+        self.kind.append(kind)
+        self.start.append(pos)
+        self.end.append(pos)
+        self.parent.append(parent)
+        self.first_child.append(-1)
+        self.next_sibling.append(-1)
+        self.fingerprint.append(0)
+        last_child.append(-1)
+
+        if parent >= 0:
+            if last_child[parent] == -1:
+                self.first_child[parent] = node
+            else:
+                self.next_sibling[last_child[parent]] = node
+            last_child[parent] = node
+
+        return node
+
+    def _digest(self, node, digest):
+        # Produces the same bytes as MatchableSegment._fingerprint_parts()
+        tokens, start, end = self.tokens, self.start, self.end
+        parts = []
+        run_start = start[node]
+        child = self.first_child[node]
+        while child != -1:
+            if self.kind[child] == MATCHABLE:
+                if start[child] > run_start:
+                    parts.append(''.join(tokens[run_start:start[child]])
+                                 .encode('utf-8'))
+                parts.append(FINGERPRINT_MARKER +
+                             self.fingerprint[child].to_bytes(8, 'big'))
+                run_start = end[child]
+            child = self.next_sibling[child]
+        if end[node] > run_start:
+            parts.append(''.join(tokens[run_start:end[node]]).encode('utf-8'))
+
+        return digest(b''.join(parts))
+
+    def children(self, node=0):
+        """
+        `generator` : the child nodes of `node`
+        """
+        child = self.first_child[node]
+        while child != -1:
+            yield child
+            child = self.next_sibling[child]
+
+    def descendants(self, node=0):
+        """
+        `range` : the nodes below `node` in depth-first order
+        """
+        # Nodes are numbered depth-first, so a subtree is a contiguous range
+        # that ends at the next sibling of the node or of its ancestors.
+        ancestor = node
+        while ancestor != -1 and self.next_sibling[ancestor] == -1:
+            ancestor = self.parent[ancestor]
+        stop = self.next_sibling[ancestor] if ancestor != -1 else len(self)
+        return range(node + 1, stop)
+
+    def flatten(self, is_cluster, node=0):
+        """
+        Returns the tokens under `node` in order, except that any descendant
+        for which `is_cluster(node)` returns `True` appears as a single
+        :class:`~deltas.segmenters.segment_tree.SegmentView` in place of its
+        tokens.
+
+        :Parameters:
+            is_cluster : `callable` ( `int` ) -> `bool`
+                Decides whether a node should be kept whole
+            node : `int`
+                The node to start from
+
+        :Returns:
+            A `list` of tokens and
+            :class:`~deltas.segmenters.segment_tree.SegmentView`
+        """
+        tokens, start, end = self.tokens, self.start, self.end
+        first_child, next_sibling = self.first_child, self.next_sibling
+        flattened = []
+
+        stack = []
+        child, pos, stop = first_child[node], start[node], end[node]
+        while True:
+            if child != -1:
+                if start[child] > pos:
+                    flattened.extend(tokens[pos:start[child]])
+                if is_cluster(child):
+                    flattened.append(SegmentView(self, child))
+                    pos, child = end[child], next_sibling[child]
+                else:
+                    stack.append((next_sibling[child], end[child], stop))
+                    child, pos, stop = \
+                        first_child[child], start[child], end[child]
+            else:
+                if stop > pos:
+                    flattened.extend(tokens[pos:stop])
+                if len(stack) == 0:
+                    break
+                child, pos, stop = stack.pop()
+
+        return flattened
+
+    def segment(self, node=0):
+        """
+        Returns a :class:`~deltas.segmenters.segment_tree.SegmentView` of
+        `node`.
+        """
+        return SegmentView(self, node)
+
+    def to_segments(self):
+        """
+        Rebuilds a :class:`~deltas.Segment` tree.
+        """
+        root = self._new_segment(0)
+        stack = [(root, 0, self.first_child[0], self.start[0])]
+        while len(stack) > 0:
+            segment, node, child, pos = stack.pop()
+            if child != -1:
+                list.extend(segment, self.tokens[pos:self.start[child]])
+                subsegment = self._new_segment(child)
+                list.append(segment, subsegment)
+                stack.append((segment, node, self.next_sibling[child],
+                              self.end[child]))
+                stack.append((subsegment, child, self.first_child[child],
+                              self.start[child]))
+            else:
+                list.extend(segment, self.tokens[pos:self.end[node]])
+
+        return root
+
+    def _new_segment(self, node):
+        if self.kind[node] == MATCHABLE:
+            segment = MatchableSegment(self.start[node])
+            segment._fingerprint = self.fingerprint[node]
+        else:
+            segment = Segment(self.start[node])
+        segment.length = self.end[node] - self.start[node]
+        return segment
+
+    def __len__(self):
+        return len(self.kind)
+
+
+def _kind(segment):
+    return MATCHABLE if isinstance(segment, MatchableSegment) else SEGMENT
+
+
+class SegmentView:
+    """
+    A read-only :class:`~deltas.Segment`-like view of a node in a
+    :class:`~deltas.SegmentTree`.  Views of matchable nodes are
+    equal when their fingerprints are equal.  `match` is set by
+    :mod:`~deltas.algorithms.segment_matcher` while diffing.
+    """
+    __slots__ = ("tree", "node", "match")
+
+    def __init__(self, tree, node):
+        self.tree = tree
+        self.node = node
+        self.match = None
+
+    @property
+    def start(self):
+        return self.tree.start[self.node]
+
+    @property
+    def end(self):
+        return self.tree.end[self.node]
+
+    @property
+    def length(self):
+        return self.tree.end[self.node] - self.tree.start[self.node]
+
+    @property
+    def matchable(self):
+        return self.tree.kind[self.node] == MATCHABLE
+
+    @property
+    def fingerprint(self):
+        return self.tree.fingerprint[self.node] if self.matchable else None
+
+    def tokens(self):
+        """
+        The tokens in this segment
+        """
+        return self.tree.tokens[self.start:self.end]
+
+    def __iter__(self):
+        tree = self.tree
+        pos = self.start
+        for child in tree.children(self.node):
+            yield from tree.tokens[pos:tree.start[child]]
+            yield SegmentView(tree, child)
+            pos = tree.end[child]
+        yield from tree.tokens[pos:self.end]
+
+    def __str__(self):
+        return ''.join(self.tokens())
+
+    def __repr__(self):
+        return "{0}({1}, {2})".format(self.__class__.__name__,
+                                      self.node, repr(str(self)))
+
+    def __eq__(self, other):
+        try:
+            return self.matchable and self.fingerprint == other.fingerprint
+        except AttributeError:
+            return False
+
+    def __ne__(self, other):
+        return not self.__eq__(other)
+
+    def __hash__(self):
+        return self.fingerprint or 0
@@ -1,4 +1,4 @@
-import yamlconf
+from .segment_tree import SegmentTree
 
 
 class Segmenter:
@@ -8,18 +8,34 @@ class Segmenter:
     def __init__(self):
         pass
 
-    def segment(self, tokens):
+    def segment(self, tokens, cache=None):
         """
         Segments a sequence of :class:`~deltas.Token` into a
-        `iterable` of :class:`~deltas.Segment`
+        `iterable` of :class:`~deltas.Segment`.  Segmenters may use `cache`
+        (a `dict`-like object) to re-use segments from a previous call.
         """
         raise NotImplementedError()
 
+    def segment_tree(self, tokens, cache=None):
+        """
+        Segments a sequence of :class:`~deltas.Token` into a
+        :class:`~deltas.SegmentTree`.  By default, the segments are built by
+        :func:`~deltas.Segmenter.segment` and then copied into the tree.
+        Segmenters may override this to write the tree directly.
+        """
+        if cache is not None:
+            segments = self.segment(tokens, cache=cache)
+        else:
+            segments = self.segment(tokens)
+        return SegmentTree.from_segments(segments, tokens)
+
     @classmethod
     def from_config(cls, config, name, section_key="segmenters"):
         """
         Constructs a segmenter from a configuration doc.
         """
+        import yamlconf
+
         section = config[section_key][name]
         segmenter_class_path = section['class']
         Segmenter = yamlconf.import_module(segmenter_class_path)
@@ -21,9 +21,11 @@ Segment Types
 """
 import hashlib
 
+FINGERPRINT_MARKER = b'\xff'
+
 
 class Segment(list):
-    __slots__ = ("start", )
+    __slots__ = ("start", "length")
     """
     Represents a sequence of of tokens.  Note that plain Segments are not
     matchable.  Plain segments are generally reserved for whitespace.  For
@@ -31,7 +33,9 @@ class Segment(list):
 
     Note that :class:`~deltas.Segment` behaves like a list, but it
     will expect that everything added will be of type
-    :class:`~deltas.Segment` or :class:`~deltas.Token`.
+    :class:`~deltas.Segment` or :class:`~deltas.Token`.  The number of
+    tokens in the segment (`length`) is kept up to date by `append()` and
+    `extend()`.  Other list methods should not be used to modify a segment.
     """
     def __new__(cls, *args, **kwargs):
         if len(args) == 1 and len(kwargs) == 0 and isinstance(args[0], cls):
@@ -47,6 +51,24 @@ class Segment(list):
         subsegments = subsegments or []
         super().__init__(subsegments)
         self.start = int(start)
+        self.length = self._count()
+
+    def _count(self):
+        # The number of tokens in the subsegments
+        length = 0
+        for subsegment in self:
+            length += subsegment.length \
+                if isinstance(subsegment, Segment) else 1
+        return length
+
+    def append(self, subsegment):
+        list.append(self, subsegment)
+        self.length += subsegment.length \
+            if isinstance(subsegment, Segment) else 1
+
+    def extend(self, subsegments):
+        for subsegment in subsegments:
+            self.append(subsegment)
 
     def tokens(self):
         """
@@ -61,12 +83,36 @@ class Segment(list):
                 token = subsegment_or_token
                 yield token
 
+    def rebase(self, start):
+        """
+        Returns a copy of the segment tree that starts at `start` rather than
+        `self.start`.  Tokens are shared with the original.
+        """
+        delta = start - self.start
+        segment = self.__class__(start)
+        list.extend(segment,
+                    (ss.rebase(ss.start + delta)
+                     if isinstance(ss, Segment) else ss
+                     for ss in self))
+        segment.length = self.length
+        return segment
+
     @property
     def end(self):
         """
-        The index of the last :class:`deltas.Token` in the segment.
+        The index after the last :class:`deltas.Token` in the segment.
         """
-        return self.start + sum(1 for _ in self.tokens())
+        return self.start + self.length
+
+    def __reduce__(self):
+        return _restore, (self.__class__, self.start, list(self), self.length)
+
+    def __setstate__(self, state):
+        # Segments pickled by older versions only carry `start`, so `length`
+        # is counted from the subsegments that were appended.
+        _, slots = state
+        self.start = slots['start']
+        self.length = self._count()
 
     def __repr__(self):
         return "{0}({1})".format(self.__class__.__name__, super().__repr__())
@@ -89,37 +135,109 @@ class MatchableSegment(Segment):
     Constructs a segment that can be matched.  Segments of this type general
     contain important content that might have been copied between different
     versions of text.
+
+    Matchable segments are compared by their
+    :attr:`~deltas.MatchableSegment.fingerprint`.  If `verify` is set on the
+    class (or a subclass), segments with equal fingerprints are also compared
+    by their text to rule out collisions.
     """
-    __slots__ = ("sha1", "match")
+    __slots__ = ("match", "_fingerprint")
+
+    verify = False
 
     def initialize(self, *args, **kwargs):
         super().initialize(*args, **kwargs)
-        self.sha1 = hashlib.sha1(bytes(str(self), 'utf-8'))
         self.match = None
+        self._fingerprint = None
+
+    @staticmethod
+    def digest(data):
+        """
+        Returns an `int` digest of `bytes`: the first 64 bits of a SHA-1.
+        Override to use a different hash function.
+        """
+        return int.from_bytes(hashlib.sha1(data).digest()[:8], 'big')
+
+    @property
+    def fingerprint(self):
+        """
+        A 64-bit `int` that is stable across processes.  It is computed the
+        first time that it is needed from the text of the tokens in the
+        segment and the fingerprints of matchable subsegments.
+        """
+        if self._fingerprint is None:
+            self._fingerprint = self.digest(b''.join(self._fingerprint_parts()))
+        return self._fingerprint
+
+    def _fingerprint_parts(self):
+        run = []
+        for subsegment in self:
+            if isinstance(subsegment, MatchableSegment):
+                if len(run) > 0:
+                    yield ''.join(run).encode('utf-8')
+                    run = []
+                # 0xFF never appears in UTF-8 so it can't be confused with
+                # the text of tokens.
+                yield FINGERPRINT_MARKER + \
+                    subsegment.fingerprint.to_bytes(8, 'big')
+            else:
+                run.append(str(subsegment))
+        if len(run) > 0:
+            yield ''.join(run).encode('utf-8')
+
+    @property
+    def sha1(self):
+        """
+        A SHA-1 of the text of the segment.  Deprecated.  Use
+        :attr:`~deltas.MatchableSegment.fingerprint`.
+        """
+        return hashlib.sha1(bytes(str(self), 'utf-8'))
 
     def __eq__(self, other):
         try:
-            return hash(self) == hash(other)
+            if self.fingerprint != other.fingerprint:
+                return False
         except AttributeError:
             return False
+        return not self.verify or str(self) == str(other)
 
     def __neq__(self, other):
-        try:
-            return hash(self) != hash(other)
-        except AttributeError:
-            return False
+        return not self.__eq__(other)
 
     def __hash__(self):
-        return hash(self.sha1.digest())
+        return self.fingerprint
+
+    def rebase(self, start):
+        segment = super().rebase(start)
+        segment._fingerprint = self._fingerprint
+        return segment
 
-    def __getstate__(self): return self.start, list(self)
+    def __reduce__(self):
+        return _restore, (self.__class__, self.start, list(self), self.length,
+                          self._fingerprint)
 
-    def __setstate__(self, args): self.initialize(*args)
+    def __setstate__(self, args):
+        # Segments pickled by older versions
+        self.initialize(*args)
 
     def append(self, subsegment):
-        super().append(subsegment)
-        self.sha1.update(bytes(str(subsegment), 'utf-8'))
+        list.append(self, subsegment)
+        self.length += subsegment.length \
+            if isinstance(subsegment, Segment) else 1
+        self._fingerprint = None
 
     def extend(self, subsegments):
-        for subsegment in subsegments:
-            self.append(subsegment)
+        super().extend(subsegments)
+        self._fingerprint = None
+
+
+def _restore(cls, start, subsegments, length, fingerprint=None):
+    # Rebuilds a pickled segment without re-counting or re-hashing
+    segment = list.__new__(cls)
+    list.__init__(segment, subsegments)
+    segment.start = start
+    segment.length = length
+    if issubclass(cls, MatchableSegment):
+        segment.match = None
+        segment._fingerprint = fingerprint
+    return segment
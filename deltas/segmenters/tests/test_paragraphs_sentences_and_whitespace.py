@@ -1,8 +1,12 @@
 from nose.tools import eq_
 
+from ...tests.segment_checks import (segment_cache, segment_tree,
+                                     segment_typed_tokens)
+from ...tests.segment_tuples import segment_tuples
 from ...tokenizers import wikitext_split
+from ...util import LRUCache
 from ..paragraphs_sentences_and_whitespace import \
-    ParagraphsSentencesAndWhitespace
+    MARKUP_BLOCKS, ParagraphsSentencesAndWhitespace
 from ..segments import MatchableSegment, Segment
 
 
@@ -39,3 +43,127 @@ was vijf toen haar vader overleed. Ze werd opgevoed in de harem waarin haar moed
     tokens = wikitext_split.tokenize(text)
     segments = list(segmenter.segment(tokens))
     assert len(segments) == 4
+
+
+def test_segment_typed_tokens():
+    segment_typed_tokens(ParagraphsSentencesAndWhitespace)
+
+
+def test_segment_cache():
+    texts = ["Foo bar baz.  Derp herp.\n\nSecond paragraph is here.\n\n" +
+             "{| table\n\nwith a break\n|}\n\nLast one",
+             "Hello.\n\nSecond paragraph is here.\n\nFoo bar baz.  " +
+             "Derp herp.\n\nLast one\n\n{| table\n\nwith a break\n|}"]
+    segment_cache(ParagraphsSentencesAndWhitespace(), texts)
+
+
+def test_segment_tree():
+    texts = ["Foo bar baz.  Derp herp.\n\nSecond paragraph is here.\n\n" +
+             "{| table\n\nwith a break\n|}\n\nLast one",
+             "Hello.\n\nFoo bar baz.  Derp herp.\n\n{{Infobox | a.\n\n" +
+             "<ref>Unclosed. Ref.\n\nLast one\n\n{| table", "", "\n\n"]
+    for kwargs in ({}, {'vectorized': True}, {'blocks': MARKUP_BLOCKS},
+                   {'blocks': MARKUP_BLOCKS, 'vectorized': True}):
+        segment_tree(ParagraphsSentencesAndWhitespace(**kwargs), texts)
+
+
+def test_segment_blocks():
+    segmenter = ParagraphsSentencesAndWhitespace(blocks=MARKUP_BLOCKS)
+
+    text = "{{Infobox person\n| name = Foo. Bar.\n| born = {{date|1900}}" + \
+           "\n\n| died = 1990\n}}'''Foo Bar''' was a person.<ref>{{cite " + \
+           "|title=A. B. C.}}</ref> Another sentence."
+    tokens = wikitext_split.tokenize(text)
+    segments = segmenter.segment(tokens)
+
+    eq_(len(segments), 1)
+    eq_([str(s) for s in segments[0]],
+        ["{{Infobox person\n| name = Foo. Bar.\n| born = {{date|1900}}" +
+         "\n\n| died = 1990\n}}",
+         "'''Foo Bar''' was a person.",
+         "<ref>{{cite |title=A. B. C.}}</ref>", " ",
+         "Another sentence."])
+    eq_(type(segments[0][0]), MatchableSegment)
+    eq_(len(segments[0][0]), segments[0][0].length)  # No subsegments
+
+    vectorized = ParagraphsSentencesAndWhitespace(blocks=MARKUP_BLOCKS,
+                                                  vectorized=True)
+    eq_(segment_tuples(vectorized.segment(tokens)), segment_tuples(segments))
+
+    # Only tables are blocks by default
+    segments = ParagraphsSentencesAndWhitespace().segment(tokens)
+    eq_(str(segments[0][0]),
+        "{{Infobox person\n| name = Foo. Bar.\n| born = {{date|1900}}")
+
+
+def test_segment_unclosed_blocks():
+    segmenter = ParagraphsSentencesAndWhitespace(blocks=MARKUP_BLOCKS)
+    vectorized = ParagraphsSentencesAndWhitespace(blocks=MARKUP_BLOCKS,
+                                                  vectorized=True)
+
+    # An unbalanced block ends at the paragraph break
+    text = "{{Infobox | name = Foo.\n\nFoo was a person.  {{a}} Bar.\n\n" + \
+           "<ref>Unclosed. Ref.\n\nLast one."
+    tokens = wikitext_split.tokenize(text)
+    segments = segmenter.segment(tokens)
+    eq_([str(s) for s in segments],
+        ["{{Infobox | name = Foo.", "\n\n", "Foo was a person.  {{a}} Bar.",
+         "\n\n", "<ref>Unclosed. Ref.", "\n\n", "Last one."])
+    eq_([str(s) for s in segments[2]],
+        ["Foo was a person.", "  ", "{{a}}", " ", "Bar."])
+    eq_(segment_tuples(vectorized.segment(tokens)), segment_tuples(segments))
+
+    # ...unless it closes later on, even with a cached paragraph
+    cache = LRUCache(16)
+    closed = wikitext_split.tokenize("{{Infobox | name = Foo.\n\n}}")
+    for tokens in (tokens, closed):
+        for s in (segmenter, vectorized):
+            eq_(segment_tuples(s.segment(tokens, cache=cache)),
+                segment_tuples(segmenter.segment(tokens)))
+    eq_(str(segmenter.segment(closed)[0][0]), "{{Infobox | name = Foo.\n\n}}")
+
+
+def test_segment_unclosed_tables():
+    segmenter = ParagraphsSentencesAndWhitespace()
+    vectorized = ParagraphsSentencesAndWhitespace(vectorized=True)
+
+    # wikitext_split lexes "|}" as a bar, so the table never closes and runs
+    # on to the end of the tokens.
+    text = "Intro.\n\n{| class=wikitable\n| a. b. c.\n|}\n\n" + \
+           "Foo bar baz.  More text here.\n\nEnd."
+    tokens = wikitext_split.tokenize(text)
+    segments = segmenter.segment(tokens)
+    eq_([str(s) for s in segments],
+        ["Intro.", "\n\n", "{| class=wikitable\n| a. b. c.\n|}\n\n" +
+         "Foo bar baz.  More text here.\n\nEnd."])
+    eq_(segment_tuples(vectorized.segment(tokens)), segment_tuples(segments))
+
+    # ...unless blocks are asked to end at the paragraph break
+    for vectorize in (False, True):
+        broken = ParagraphsSentencesAndWhitespace(break_unclosed=True,
+                                                  vectorized=vectorize)
+        eq_([str(s) for s in broken.segment(tokens)],
+            ["Intro.", "\n\n", "{| class=wikitable\n| a. b. c.\n|}",
+             "\n\n", "Foo bar baz.  More text here.", "\n\n", "End."])
+
+
+def test_segment_vectorized():
+    segmenter = ParagraphsSentencesAndWhitespace()
+    vectorized = ParagraphsSentencesAndWhitespace(vectorized=True)
+
+    texts = ["This is some text.  This is some other text.\n " +
+             "A. Peterson is a name that <!-- This is derp. --> I made up." +
+             "\n\n== OMG HEADER ==\nThis is a new paragraph! Isn't this?",
+             "Foo bar baz.  Derp herp.\n\n{| table\n\nwith a break\n|}" +
+             "\n\nLast one [[unclosed. link. here.\n\n{| a. b. c.",
+             "(" + "Run on. " * 500, "", "\n\n"]
+    for text in texts:
+        tokens = wikitext_split.tokenize(text)
+        eq_(segment_tuples(vectorized.segment(tokens)),
+            segment_tuples(segmenter.segment(tokens)))
+
+    cache = LRUCache(16)
+    for text in texts + texts:
+        tokens = wikitext_split.tokenize_compact(text)
+        eq_(segment_tuples(vectorized.segment(tokens, cache=cache)),
+            segment_tuples(segmenter.segment(tokens)))
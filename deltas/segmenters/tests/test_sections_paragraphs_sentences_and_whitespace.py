@@ -0,0 +1,49 @@
+from nose.tools import eq_
+
+from ...tests.segment_checks import (segment_cache, segment_tree,
+                                     segment_typed_tokens)
+from ...tokenizers import wikitext_split
+from ..sections_paragraphs_sentences_and_whitespace import \
+    SectionsParagraphsSentencesAndWhitespace
+from ..segments import MatchableSegment, Segment
+
+
+def test_segment():
+    segmenter = SectionsParagraphsSentencesAndWhitespace()
+
+    text = "\nThis is the lead.  It has two sentences.\n\n" + \
+           "== First ==\nSome text.  x == y\n" + \
+           "=== Sub ===\nMore text.\n\n" + \
+           "== Second ==\n{| table\n|}\n\n"
+    tokens = wikitext_split.tokenize(text)
+    segments = segmenter.segment(tokens)
+
+    eq_(''.join(str(s) for s in segments), text)
+    eq_([str(s) for s in segments
+         if isinstance(s, MatchableSegment)],
+        ["This is the lead.  It has two sentences.",
+         "== First ==\nSome text.  x == y",
+         "=== Sub ===\nMore text.",
+         "== Second ==\n{| table\n|}"])
+    eq_([type(s) for s in segments[:3]],
+        [Segment, MatchableSegment, Segment])
+    for section in segments:
+        eq_(tokens[section.start:section.end], list(section.tokens()))
+        for paragraph in section:
+            if not isinstance(paragraph, Segment):
+                continue
+            eq_(tokens[paragraph.start:paragraph.end],
+                list(paragraph.tokens()))
+
+    eq_(list(segmenter.segment([])), [])
+
+
+def test_segment_typed_tokens():
+    segment_typed_tokens(SectionsParagraphsSentencesAndWhitespace)
+
+
+def test_segment_cache():
+    texts = ["Lead.\n== A ==\nFoo bar baz.  Derp herp.\n\n== B ==\nLast.",
+             "Lead!\n== B ==\nLast.\n== A ==\nFoo bar baz.  Derp herp.\n"]
+    segment_cache(SectionsParagraphsSentencesAndWhitespace(), texts)
+    segment_tree(SectionsParagraphsSentencesAndWhitespace(), texts)
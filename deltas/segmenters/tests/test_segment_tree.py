@@ -0,0 +1,46 @@
+from nose.tools import eq_
+
+from ...tests.segment_tuples import segment_tuples
+from ...tokenizers import wikitext_split
+from ..paragraphs_sentences_and_whitespace import \
+    ParagraphsSentencesAndWhitespace
+from ..segment_tree import SegmentTree
+from ..segments import Segment
+
+
+def test_from_segments():
+    segmenter = ParagraphsSentencesAndWhitespace()
+    tokens = wikitext_split.tokenize(
+        "Foo bar baz.  Derp herp.\n\nSecond paragraph is here.\n\n" +
+        "{| table\n\nwith a break\n|}\n\nLast one")
+    segments = segmenter.segment(tokens)
+
+    tree = SegmentTree.from_segments(segments)
+    eq_(tree.tokens, tokens)
+    eq_(segment_tuples(tree.to_segments()), segment_tuples(segments))
+    eq_(str(tree.segment()), str(segments))
+    eq_([str(view) for view in tree.segment()],
+        [str(subsegment) for subsegment in segments])
+    eq_(list(tree.descendants()), list(range(1, len(tree))))
+
+    # Fingerprints computed on the tree match the segments'
+    fresh = SegmentTree.from_segments(segmenter.segment(tokens), tokens)
+    eq_(list(fresh.fingerprint), list(tree.fingerprint))
+    first = next(tree.children())
+    eq_(tree.segment(first), segments[0])
+    eq_(hash(tree.segment(first)), segments[0].fingerprint)
+
+    # Flatten to paragraphs
+    paragraphs = tree.flatten(lambda node: tree.parent[node] == 0)
+    eq_([str(view) for view in paragraphs],
+        [str(subsegment) for subsegment in segments])
+
+
+def test_deep():
+    segment = Segment(0)
+    for _ in range(5000):
+        segment = Segment(0, [segment])
+    tree = SegmentTree.from_segments(segment)
+    eq_(len(tree), 5001)
+    eq_(list(tree.descendants(4999)), [5000])
+    eq_(tree.flatten(lambda node: False), [])
@@ -1,5 +1,7 @@
 from nose.tools import eq_
 import pickle
+import subprocess
+import sys
 
 from ...tokenizers import Token
 from ..segments import MatchableSegment, Segment
@@ -58,3 +60,81 @@ def test_pickling():
     unpickled_segment = pickle.loads(pickle.dumps(segment))
     eq_(list(segment.tokens()),
         list(unpickled_segment.tokens()))
+
+
+def test_fingerprint():
+    segment = MatchableSegment(0, [
+        MatchableSegment(0, [Token("zero"), Token("one")]),
+        Segment(2, [Token(" ")]),
+        Token("two")
+    ])
+    fingerprint = segment.fingerprint
+    assert 0 <= fingerprint < 2 ** 64
+    eq_(hash(segment), hash(fingerprint))
+
+    # Stable across processes
+    script = "from deltas.segmenters.segments import MatchableSegment\n" + \
+             "print(MatchableSegment(0, ['zero', 'one']).fingerprint)"
+    output = subprocess.run([sys.executable, "-c", script],
+                            stdout=subprocess.PIPE, check=True).stdout
+    eq_(int(output), segment[0].fingerprint)
+
+    # Changes are picked up
+    segment.append(Token("three"))
+    assert segment.fingerprint != fingerprint
+
+    unpickled_segment = pickle.loads(pickle.dumps(segment))
+    eq_(unpickled_segment._fingerprint, segment.fingerprint)
+    eq_(unpickled_segment, segment)
+
+
+def test_verify():
+    class VerifiedSegment(MatchableSegment):
+        verify = True
+
+    for cls, equal in ((MatchableSegment, True), (VerifiedSegment, False)):
+        a = cls(0, [Token("zero")])
+        b = cls(0, [Token("one")])
+        a._fingerprint = b._fingerprint = 1  # A collision
+        eq_(a == b, equal)
+
+
+def test_length():
+    segment = MatchableSegment(3, [
+        MatchableSegment(3, [Token("zero"), Token("one")]),
+        Segment(5, [Token(" ")])
+    ])
+    eq_(segment.length, 3)
+    eq_(segment.end, 6)
+
+    segment.append(Token("two"))
+    segment.extend([Segment(7, [Token(" "), Token(" ")]), Token("three")])
+    eq_(segment.length, 7)
+    eq_(segment.end, 10)
+    eq_(segment.length, len(list(segment.tokens())))
+
+    eq_(segment.rebase(0).end, 7)
+    eq_(pickle.loads(pickle.dumps(segment)).end, 10)
+    eq_(pickle.loads(pickle.dumps(segment[1])).end, 6)
+
+
+def test_unpickle_baseline():
+    # Segment(0, [MatchableSegment(0, ["Foo", " "]), Segment(2, ["bar"])])
+    # pickled before segments kept a `length`
+    pickled = (
+        b'\x80\x02cdeltas.segmenters.segments\nSegment\nq\x00)\x81q\x01(cdel'
+        b'tas.segmenters.segments\nMatchableSegment\nq\x02)\x81q\x03(cdeltas.'
+        b'tokenizers.token\nToken\nq\x04X\x03\x00\x00\x00Fooq\x05\x85q\x06\x81q'
+        b'\x07N}q\x08X\x04\x00\x00\x00typeq\tX\x04\x00\x00\x00wordq\ns\x86q\x0b'
+        b'bh\x04X\x01\x00\x00\x00 q\x0c\x85q\r\x81q\x0eN}q\x0fh\tX\n\x00\x00\x00'
+        b'whitespaceq\x10s\x86q\x11beK\x00]q\x12(h\x07h\x0ee\x86q\x13bh\x00)'
+        b'\x81q\x14h\x04X\x03\x00\x00\x00barq\x15\x85q\x16\x81q\x17N}q\x18h\t'
+        b'h\ns\x86q\x19baN}q\x1aX\x05\x00\x00\x00startq\x1bK\x02s\x86q\x1cbeN}'
+        b'q\x1dh\x1bK\x00s\x86q\x1eb.')
+    segment = pickle.loads(pickled)
+    eq_(str(segment), "Foo bar")
+    eq_((segment.start, segment.length, segment.end), (0, 3, 3))
+    eq_((segment[0].start, segment[0].length), (0, 2))
+    eq_((segment[1].start, segment[1].length), (2, 1))
+    eq_(segment[0].fingerprint,
+        MatchableSegment(0, [Token("Foo"), Token(" ")]).fingerprint)
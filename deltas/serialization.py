@@ -0,0 +1,187 @@
+"""
+Serialization
+=============
+A compact, versioned binary format for a :class:`~deltas.TokenStream` and an
+optional :class:`~deltas.SegmentTree` built over it.  The text is stored once
+as UTF-8 and is followed by the token offsets and type codes and the tree's
+columns, including fingerprints.  Loading wraps the stored columns in
+`memoryview` without copying them (the text is decoded into a `str`), so
+nothing is re-tokenized, re-segmented or re-hashed.  :func:`load` maps files
+into memory.
+
+The state of a :class:`~deltas.SegmentMatcher` processor can be saved and
+restored between jobs.
+
+:Example:
+    >>> from deltas import SegmentMatcher, serialization, text_split
+    >>>
+    >>> processor = SegmentMatcher(text_split).processor(flat=True)
+    >>> operations, a, b = processor.process("This is a version.")
+    >>> state = serialization.dumps(processor.last_tokens,
+    ...                             processor.last_segments)
+    >>>
+    >>> processor = SegmentMatcher(text_split).processor(last_segments=state)
+    >>> operations, a, b = processor.process("This is a version.  Again.")
+    >>> [op.name for op in operations]
+    ['equal', 'insert']
+
+.. autofunction:: deltas.serialization.dumps
+
+.. autofunction:: deltas.serialization.loads
+
+.. autofunction:: deltas.serialization.dump
+
+.. autofunction:: deltas.serialization.load
+"""
+import mmap
+import struct
+import sys
+from array import array
+
+from .segmenters import SegmentTree
+from .tokenizers import TokenStream
+from .tokenizers.token_stream import translate_codes
+
+MAGIC = b'DELTAS'
+VERSION = 1
+HEADER = struct.Struct('<6sHBBcc4xQQQQ')  # 48 bytes, so columns align
+"""
+magic, version, big-endian, has tree, offset typecode, code typecode,
+number of tokens, number of nodes, size of types and size of text
+"""
+TREE_COLUMNS = [("kind", 'B'), ("start", 'q'), ("end", 'q'), ("parent", 'q'),
+                ("first_child", 'q'), ("next_sibling", 'q'),
+                ("fingerprint", 'Q')]
+BIG_ENDIAN = sys.byteorder == "big"
+
+BUFFER_TYPES = (bytes, bytearray, memoryview, mmap.mmap)
+
+
+def dumps(tokens, segments=None):
+    """
+    Serializes tokens and (optionally) their segments.
+
+    :Parameters:
+        tokens : :class:`~deltas.TokenStream` | `list` ( :class:`~deltas.Token` )
+            The tokens to store
+        segments : :class:`~deltas.SegmentTree` | :class:`~deltas.Segment`
+            Segments of `tokens`
+
+    :Returns:
+        `bytes`
+    """  # noqa
+    if not isinstance(tokens, TokenStream) or \
+       tokens._start != 0 or tokens._stop != len(tokens.codes):
+        tokens = TokenStream.from_tokens(tokens)
+    if segments is not None and not isinstance(segments, SegmentTree):
+        segments = SegmentTree.from_segments(segments, tokens)
+
+    types = "\n".join(name or "" for name in tokens.types).encode('utf-8')
+    text = tokens.text.encode('utf-8')
+    n_nodes = len(segments) if segments is not None else 0
+
+    parts = [HEADER.pack(MAGIC, VERSION, BIG_ENDIAN, segments is not None,
+                         _typecode(tokens.offsets).encode(),
+                         _typecode(tokens.codes).encode(),
+                         len(tokens), n_nodes, len(types), len(text)),
+             types, text, tokens.offsets, tokens.codes]
+    if segments is not None:
+        parts.extend(getattr(segments, name) for name, _ in TREE_COLUMNS)
+
+    data = bytearray()
+    for part in parts:
+        data += part
+        data += bytes(-len(data) % 8)  # Keep columns aligned
+
+    return bytes(data)
+
+
+def loads(data):
+    """
+    Loads tokens and segments serialized by :func:`dumps`.
+
+    :Parameters:
+        data : `bytes` | `memoryview` | `mmap`
+            Serialized data.  Columns refer to `data` so it must not be
+            modified while they are in use.
+
+    :Returns:
+        A tuple of a :class:`~deltas.TokenStream` and a
+        :class:`~deltas.SegmentTree` (or `None` if no segments were stored)
+    """
+    view = memoryview(data).cast('B')
+    if len(view) < HEADER.size:
+        raise ValueError("Not enough data for a header")
+    (magic, version, big_endian, has_tree, offset_typecode, code_typecode,
+     n_tokens, n_nodes, types_size, text_size) = HEADER.unpack_from(view)
+    if magic != MAGIC:
+        raise ValueError("Not serialized by deltas: {0}".format(magic))
+    if version > VERSION:
+        raise ValueError("Unsupported version {0}".format(version))
+
+    reader = _Reader(view, HEADER.size, big_endian != BIG_ENDIAN)
+    types = [name or None
+             for name in str(reader.read(types_size), 'utf-8').split("\n")]
+    text = str(reader.read(text_size), 'utf-8')
+    offsets = reader.column(offset_typecode.decode(), n_tokens + 1)
+    codes = reader.column(code_typecode.decode(), n_tokens)
+
+    tokens = TokenStream(text, offsets, translate_codes(codes, types))
+
+    if has_tree:
+        segments = SegmentTree(tokens)
+        for name, typecode in TREE_COLUMNS:
+            setattr(segments, name, reader.column(typecode, n_nodes))
+    else:
+        segments = None
+
+    return tokens, segments
+
+
+def dump(tokens, segments, f):
+    """
+    Writes serialized tokens and segments to a binary file.
+    """
+    f.write(dumps(tokens, segments))
+
+
+def load(f):
+    """
+    Loads tokens and segments from a binary file.  The file is mapped into
+    memory if possible.
+    """
+    try:
+        data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    except (AttributeError, OSError, ValueError):
+        data = f.read()
+    return loads(data)
+
+
+class _Reader:
+
+    def __init__(self, view, pos, swap):
+        self.view = view
+        self.pos = pos
+        self.swap = swap
+
+    def read(self, size):
+        if self.pos + size > len(self.view):
+            raise ValueError("Unexpected end of data")
+        data = self.view[self.pos:self.pos + size]
+        self.pos += size + (-(self.pos + size) % 8)
+        return data
+
+    def column(self, typecode, n):
+        data = self.read(n * array(typecode).itemsize)
+        if self.swap:  # Written on a machine with a different byte order
+            column = array(typecode)
+            column.frombytes(data)
+            column.byteswap()
+            return column
+        else:
+            return data.cast(typecode)
+
+
+def _typecode(column):
+    # Columns are `array`s unless they were loaded as `memoryview`s
+    return column.typecode if isinstance(column, array) else column.format
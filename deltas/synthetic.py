@@ -0,0 +1,355 @@
+"""
+Synthetic page histories
+========================
+Generates wikitext pages and histories of revisions without network access
+so that diff engines can be load tested.  A history starts from a seed text
+and applies randomly chosen edit models.  Each edit model mimics a common
+kind of edit (a typo fix, vandalism that is reverted, a growing talk page,
+etc.).  All generation is deterministic given a `seed`.
+
+:Example:
+    >>> from deltas import SegmentMatcher, synthetic, wikitext_split
+    >>>
+    >>> processor = SegmentMatcher(wikitext_split).processor()
+    >>> texts = synthetic.history(synthetic.page(paragraphs=20),
+    ...                           revisions=10)
+    >>> for text in texts:
+    ...     operations, a, b = processor.process(text)
+
+.. autofunction:: deltas.synthetic.page
+
+.. autofunction:: deltas.synthetic.history
+
+.. autofunction:: deltas.synthetic.revisions
+
+.. autofunction:: deltas.synthetic.scramble
+
+.. autodata:: deltas.synthetic.EDITS
+
+Edit models
+-----------
+Each edit model is a function that takes a :class:`random.Random`, a
+lexicon of words and the text of the current revision and returns a `list`
+of texts for new revisions.
+
+.. autofunction:: deltas.synthetic.typo_fix
+.. autofunction:: deltas.synthetic.insert_sentence
+.. autofunction:: deltas.synthetic.move_paragraph
+.. autofunction:: deltas.synthetic.blank_section
+.. autofunction:: deltas.synthetic.template_churn
+.. autofunction:: deltas.synthetic.talk_append
+"""
+import random
+import re
+from bisect import bisect
+from collections import OrderedDict, namedtuple
+from itertools import accumulate
+
+SYLLABLES = ["ba", "co", "de", "fi", "gu", "ha", "jo", "ki", "lu", "ma",
+             "ne", "po", "qui", "ra", "so", "ti", "vu", "wa", "xe", "zo",
+             "an", "er", "in", "on", "ur", "st", "th", "ch", "ly", "ing"]
+TEMPLATES = ["cite web", "cite book", "citation needed", "main", "see also",
+             "infobox settlement", "convert", "lang"]
+VANDALISM = ["lol", "poop", "JOHN WAS HERE", "hi mom!!!!!",
+             "this page sucks"]
+LEXICON_SIZE = 2000
+
+WORD_RE = re.compile(r"[^\W\d_]+")
+HEADING_RE = re.compile(r"^==[^=\n].*==[ \t]*$", re.MULTILINE)
+SENTENCE_END_RE = re.compile(r"[.!?](?= )")
+TEMPLATE_RE = re.compile(r"\{\{[^{}]*\}\}")
+PARAMETER_RE = re.compile(r"\|\s*([^|={}]+?)\s*=\s*([^|{}]*)")
+
+Revision = namedtuple("Revision", ["edit", "text"])
+"""
+A generated revision.  `edit` is the name of the edit model that produced
+`text`.
+"""
+
+
+def page(paragraphs=40, sections=6, seed=0):
+    """
+    Generates the text of a wikitext page with headings, paragraphs of
+    sentences, links, templates, references and a table.  The length of the
+    page grows linearly with `paragraphs`.
+
+    :Parameters:
+        paragraphs : `int`
+            The number of paragraphs to generate
+        sections : `int`
+            The number of sections to divide the paragraphs into
+        seed : `int`
+            A seed for the random number generator
+
+    :Returns:
+        A `str` of wikitext
+    """
+    rand = random.Random(seed)
+    lexicon = _lexicon(rand)
+    parts = ["{{" + rand.choice(TEMPLATES) + "\n| name = " +
+             _words(rand, lexicon, 3) + "\n| population = " +
+             str(rand.randint(100, 100000)) + "\n}}\n"]
+
+    per_section = max(1, paragraphs // max(1, sections))
+    for i in range(paragraphs):
+        if i > 0 and i % per_section == 0:
+            parts.append("== " + _words(rand, lexicon, 2).title() +
+                         " ==\n")
+        parts.append(_paragraph(rand, lexicon) + "\n\n")
+        if i == paragraphs // 2:
+            parts.append(_table(rand, lexicon) + "\n\n")
+
+    parts.append("== References ==\n<references />\n\n" +
+                 "[[Category:" + _words(rand, lexicon, 2).title() + "]]\n")
+    return "".join(parts)
+
+
+def history(text, revisions=None, edits=None, seed=0):
+    """
+    Generates the texts of a history of revisions starting with `text`.  The
+    texts can be passed directly to the `process()` method of a diff engine's
+    processor.
+
+    :Parameters:
+        text : `str`
+            The text of the first revision
+        revisions : `int` | `None`
+            The number of revisions to generate (including `text`).  If
+            `None`, revisions are generated forever.
+        edits : `dict` ( `callable` : `float` ) | `list` ( `callable` )
+            Edit models to apply and their relative weights.  Defaults to
+            :data:`~deltas.synthetic.EDITS`.
+        seed : `int`
+            A seed for the random number generator
+
+    :Returns:
+        An `iterator` of `str`
+    """
+    return (revision.text
+            for revision in _revisions(text, revisions, edits, seed))
+
+
+def revisions(text, revisions=None, edits=None, seed=0):
+    """
+    Like :func:`~deltas.synthetic.history` but generates
+    :class:`~deltas.synthetic.Revision` so that the edit model that produced
+    each text is known.  The first revision's `edit` is `None`.
+    """
+    return _revisions(text, revisions, edits, seed)
+
+
+def scramble(text, seed=0):
+    """
+    Replaces every word in `text` with a random word while leaving markup,
+    punctuation and whitespace in place.  Diffing two scrambles of the same
+    text approximates a worst case for matching algorithms.
+    """
+    rand = random.Random(seed)
+    lexicon = _lexicon(rand)
+    return WORD_RE.sub(lambda match: rand.choice(lexicon), text)
+
+
+def _revisions(text, n, edits, seed):
+    if edits is None:
+        edits = EDITS
+    if isinstance(edits, dict):
+        models, weights = list(edits.keys()), list(edits.values())
+    else:
+        models = list(edits)
+        weights = [1] * len(models)
+    # The same draw as random.choices(), which needs Python 3.6
+    cum_weights = list(accumulate(weights))
+
+    rand = random.Random(seed)
+    lexicon = _lexicon(rand)
+
+    yield Revision(None, text)
+    count = 1
+    while n is None or count < n:
+        edit = models[bisect(cum_weights, rand.random() * cum_weights[-1],
+                             0, len(models) - 1)]
+        for text in edit(rand, lexicon, text):
+            yield Revision(edit.__name__, text)
+            count += 1
+            if n is not None and count >= n:
+                break
+
+
+def typo_fix(rand, lexicon, text):
+    """
+    Adds, removes, replaces or transposes a single character in a word.
+    """
+    match = _search(rand, WORD_RE, text)
+    if match is None:
+        return [text]
+    word = match.group(0)
+    i = rand.randrange(len(word))
+    letter = rand.choice("abcdefghijklmnopqrstuvwxyz")
+    kind = rand.randrange(4)
+    if kind == 0:
+        word = word[:i] + letter + word[i:]
+    elif kind == 1 and len(word) > 1:
+        word = word[:i] + word[i + 1:]
+    elif kind == 2 or len(word) < 2:
+        word = word[:i] + letter + word[i + 1:]
+    else:
+        i = min(i, len(word) - 2)
+        word = word[:i] + word[i + 1] + word[i] + word[i + 2:]
+
+    return [text[:match.start()] + word + text[match.end():]]
+
+
+def insert_sentence(rand, lexicon, text):
+    """
+    Inserts a new sentence at the end of an existing sentence or paragraph.
+    """
+    i = _sentence_end(rand, text)
+    return [text[:i] + " " + _sentence(rand, lexicon) + text[i:]]
+
+
+def move_paragraph(rand, lexicon, text):
+    """
+    Moves a paragraph to a new position in the text.
+    """
+    paragraphs = text.split("\n\n")
+    if len(paragraphs) < 2:
+        return [text]
+    paragraph = paragraphs.pop(rand.randrange(len(paragraphs)))
+    paragraphs.insert(rand.randrange(len(paragraphs) + 1), paragraph)
+    return ["\n\n".join(paragraphs)]
+
+
+def blank_section(rand, lexicon, text):
+    """
+    Replaces a section (or the whole page) with a short bit of vandalism
+    and then reverts back to the original text.
+    """
+    starts = [match.start() for match in HEADING_RE.finditer(text)]
+    vandalism = rand.choice(VANDALISM)
+    if len(starts) == 0 or rand.random() < 0.25:
+        return [vandalism, text]
+
+    i = rand.randrange(len(starts))
+    start = starts[i]
+    end = starts[i + 1] if i + 1 < len(starts) else len(text)
+    return [text[:start] + vandalism + "\n\n" + text[end:], text]
+
+
+def template_churn(rand, lexicon, text):
+    """
+    Changes, adds or removes a template parameter or adds a new template.
+    """
+    match = _search(rand, TEMPLATE_RE, text)
+    if match is None or rand.random() < 0.2:
+        return insert_template(rand, lexicon, text)
+
+    template = match.group(0)
+    parameters = list(PARAMETER_RE.finditer(template))
+    kind = rand.randrange(3)
+    if kind == 0 and len(parameters) > 0:  # Change a value
+        parameter = rand.choice(parameters)
+        value = rand.choice([str(rand.randint(0, 100000)),
+                             _words(rand, lexicon, rand.randint(1, 3))])
+        template = template[:parameter.start(2)] + value + \
+            template[parameter.end(2):]
+    elif kind == 1 and len(parameters) > 1:  # Remove a parameter
+        parameter = rand.choice(parameters)
+        template = template[:parameter.start()] + \
+            template[parameter.end():]
+    else:  # Add a parameter
+        template = template[:-2] + " |" + rand.choice(lexicon) + "=" + \
+            _words(rand, lexicon, 2) + "}}"
+
+    return [text[:match.start()] + template + text[match.end():]]
+
+
+def insert_template(rand, lexicon, text):
+    i = _sentence_end(rand, text)
+    template = "{{" + rand.choice(TEMPLATES) + " |date=" + \
+        rand.choice(lexicon) + "}}"
+    return [text[:i] + template + text[i:]]
+
+
+def talk_append(rand, lexicon, text):
+    """
+    Appends a signed comment to the end of the text as on a talk page.
+    Replies are indented below the previous comment.  New threads get a
+    heading.
+    """
+    if rand.random() < 0.2:
+        comment = "\n\n== " + _words(rand, lexicon, 3).title() + " ==\n"
+        depth = 0
+    else:
+        last_line = text.rstrip().rsplit("\n", 1)[-1]
+        depth = min(len(last_line) - len(last_line.lstrip(":")) + 1, 8)
+        comment = "\n"
+
+    comment += ":" * depth + _paragraph(rand, lexicon) + \
+        " [[User:" + rand.choice(lexicon).title() + "]] ~~~~"
+    return [text.rstrip() + comment + "\n"]
+
+
+EDITS = OrderedDict([
+    (typo_fix, 4),
+    (insert_sentence, 3),
+    (move_paragraph, 1),
+    (blank_section, 1),
+    (template_churn, 2)
+])
+"""
+The default edit models and their relative weights.  :func:`talk_append`
+is not included since it only makes sense for talk pages.
+"""
+
+
+def _search(rand, regex, text):
+    # Picking from all matches would be slow for very large texts, so look
+    # for the first match after a random position instead.
+    pos = rand.randrange(len(text) + 1)
+    return regex.search(text, pos) or regex.search(text)
+
+
+def _sentence_end(rand, text):
+    match = _search(rand, SENTENCE_END_RE, text)
+    return match.end() if match is not None else len(text.rstrip())
+
+
+def _lexicon(rand, n=LEXICON_SIZE):
+    return [''.join(rand.choice(SYLLABLES)
+                    for _ in range(rand.randint(1, 4)))
+            for _ in range(n)]
+
+
+def _words(rand, lexicon, n):
+    return " ".join(rand.choice(lexicon) for _ in range(n))
+
+
+def _sentence(rand, lexicon):
+    words = _words(rand, lexicon, rand.randint(4, 20))
+    sentence = words[0].upper() + words[1:]
+    roll = rand.random()
+    if roll < 0.2:
+        sentence += " [[" + _words(rand, lexicon, 2) + "]]"
+    elif roll < 0.3:
+        sentence += " ''" + rand.choice(lexicon) + "''"
+    sentence += rand.choice(".....!?")
+    if rand.random() < 0.2:
+        sentence += "<ref>{{" + rand.choice(TEMPLATES) + " |title=" + \
+                    _words(rand, lexicon, 3) + "}}</ref>"
+    return sentence
+
+
+def _paragraph(rand, lexicon):
+    return " ".join(_sentence(rand, lexicon)
+                    for _ in range(rand.randint(2, 8)))
+
+
+def _table(rand, lexicon):
+    rows = ["{| class=\"wikitable\"", "! " + _words(rand, lexicon, 1) +
+            " !! " + _words(rand, lexicon, 1)]
+    for _ in range(rand.randint(3, 8)):
+        rows.append("|-")
+        rows.append("| " + rand.choice(lexicon) + " || " +
+                    str(rand.randint(0, 1000)))
+    rows.append("|}")
+    return "\n".join(rows)
@@ -0,0 +1,57 @@
+from nose.tools import eq_
+
+from ..segmenters import SegmentTree
+from ..tokenizers import wikitext_split
+from ..util import LRUCache
+from .segment_tuples import segment_tuples
+
+
+class TypedStr(str):
+    """
+    A token-like object that only has a type.
+    """
+    def __new__(cls, token):
+        typed = super().__new__(cls, token)
+        typed.type = token.type
+        return typed
+
+
+def segment_typed_tokens(Segmenter):
+    segmenter = Segmenter()
+    vectorized = Segmenter(vectorized=True)
+    tokens = wikitext_split.tokenize(
+        "== Foo ==\nFoo bar.  {| table |}\n\nBaz. <ref>Herp</ref> derp.")
+    typed = [TypedStr(token) for token in tokens]
+    for s in (segmenter, vectorized):
+        eq_(segment_tuples(s.segment(typed)),
+            segment_tuples(segmenter.segment(tokens)))
+
+
+def segment_cache(segmenter, texts):
+    cache = LRUCache(16)
+    for text in texts + texts:
+        tokens = wikitext_split.tokenize(text)
+        expected = segmenter.segment(tokens)
+        segments = segmenter.segment(tokens, cache=cache)
+        eq_(segment_tuples(segments), segment_tuples(expected))
+
+    assert len(cache) > 0
+
+
+def segment_tree(segmenter, texts):
+    cache = LRUCache(16)
+    for text in texts + texts:
+        for tokens in (wikitext_split.tokenize(text),
+                       wikitext_split.tokenize_compact(text)):
+            expected = SegmentTree.from_segments(segmenter.segment(tokens),
+                                                 list(tokens))
+            for tree in (segmenter.segment_tree(tokens),
+                         segmenter.segment_tree(tokens, cache=cache)):
+                eq_(list(tree.tokens), expected.tokens)
+                eq_(_columns(tree), _columns(expected))
+
+
+def _columns(tree):
+    return [list(column) for column in
+            (tree.kind, tree.start, tree.end, tree.parent, tree.first_child,
+             tree.next_sibling, tree.fingerprint)]
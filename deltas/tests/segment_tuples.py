@@ -0,0 +1,10 @@
+from ..segmenters import Segment
+
+
+def segment_tuples(segment):
+    if isinstance(segment, Segment):
+        return (type(segment), segment.start, segment.length,
+                getattr(segment, "fingerprint", None),
+                [segment_tuples(subsegment) for subsegment in segment])
+    else:
+        return (str(segment), getattr(segment, "type", None))
@@ -0,0 +1,28 @@
+import subprocess
+import sys
+
+from nose.tools import eq_
+
+import deltas
+
+CHECK_LAZY = """
+import sys
+import deltas
+print(sorted(name for name in ("yamlconf", "deltas.tokenizers",
+                               "deltas.algorithms", "deltas.segmenters")
+             if name in sys.modules))
+print(deltas.wikitext_split.regex is not None)
+"""
+
+
+def test_lazy_import():
+    output = subprocess.run([sys.executable, "-c", CHECK_LAZY],
+                            stdout=subprocess.PIPE, check=True,
+                            universal_newlines=True).stdout
+    eq_(output.split("\n")[:2], ["[]", "True"])
+
+
+def test_all():
+    for name in deltas.__all__:
+        assert getattr(deltas, name) is not None, name
+    assert "wikitext_split" in dir(deltas)
@@ -0,0 +1,19 @@
+from nose.tools import eq_
+
+from ..algorithms import segment_matcher
+from ..operations import char_spans
+from ..tokenizers import text_split
+from ..tokenizers.token_stream import token_offsets
+
+
+def test_char_spans():
+    a_text = "This is some text.  This is some other text."
+    b_text = "This is some other text.  This is some new text."
+    for tokenize in (text_split.tokenize, text_split.tokenize_compact):
+        a, b = tokenize(a_text), tokenize(b_text)
+        a_offsets, b_offsets = token_offsets(a), token_offsets(b)
+
+        for op in segment_matcher.diff(a, b):
+            (a1, a2), (b1, b2) = char_spans(op, a_offsets, b_offsets)
+            eq_(a_text[a1:a2], ''.join(a[op.a1:op.a2]))
+            eq_(b_text[b1:b2], ''.join(b[op.b1:op.b2]))
@@ -0,0 +1,74 @@
+import io
+import tempfile
+
+from nose.tools import eq_, raises
+
+from .. import serialization
+from ..algorithms import SegmentMatcher
+from ..segmenters import ParagraphsSentencesAndWhitespace, SegmentTree
+from ..tokenizers import wikitext_split
+
+TEXT = "Foo bar baz.  Derp herp.\n\nSecond paragraph is héré.\n\n" + \
+       "{| table\n\nwith a break\n|}\n\nLast one"
+
+
+def test_dumps_loads():
+    tokens = wikitext_split.tokenize_compact(TEXT)
+    segments = ParagraphsSentencesAndWhitespace().segment(tokens)
+    tree = SegmentTree.from_segments(segments, tokens)
+
+    loaded_tokens, loaded_tree = serialization.loads(
+        serialization.dumps(tokens, tree))
+    eq_(list(loaded_tokens), list(tokens))
+    eq_([token.type for token in loaded_tokens],
+        [token.type for token in tokens])
+    for name, _ in serialization.TREE_COLUMNS:
+        eq_(list(getattr(loaded_tree, name)), list(getattr(tree, name)))
+    eq_(str(loaded_tree.segment()), str(segments))
+
+    # Token lists and nested segments are converted
+    loaded_tokens, loaded_tree = serialization.loads(serialization.dumps(
+        wikitext_split.tokenize(TEXT), segments))
+    eq_(list(loaded_tokens), list(tokens))
+    eq_(list(loaded_tree.fingerprint), list(tree.fingerprint))
+
+    # Tokens alone
+    loaded_tokens, loaded_tree = serialization.loads(
+        serialization.dumps(tokens))
+    eq_(list(loaded_tokens), list(tokens))
+    eq_(loaded_tree, None)
+
+
+def test_dump_load():
+    tokens = wikitext_split.tokenize_compact(TEXT)
+    with tempfile.TemporaryFile() as f:
+        serialization.dump(tokens, None, f)
+        f.seek(0)
+        loaded_tokens, _ = serialization.load(f)
+        eq_(list(loaded_tokens), list(tokens))
+
+    f = io.BytesIO()
+    serialization.dump(tokens, None, f)
+    f.seek(0)
+    loaded_tokens, _ = serialization.load(f)
+    eq_(list(loaded_tokens), list(tokens))
+
+
+@raises(ValueError)
+def test_bad_magic():
+    serialization.loads(b"NOTDELTAS" + bytes(64))
+
+
+def test_processor():
+    engine = SegmentMatcher(wikitext_split)
+    processor = engine.processor(last_text=TEXT, flat=True)
+    state = serialization.dumps(processor.last_tokens,
+                                processor.last_segments)
+
+    new_text = TEXT.replace("Derp herp.", "Derp herp derp.")
+    expected, _, _ = processor.process(new_text)
+
+    processor = engine.processor(last_segments=state)
+    operations, a, b = processor.process(new_text)
+    eq_(list(operations), list(expected))
+    eq_(list(a), wikitext_split.tokenize(TEXT))
@@ -0,0 +1,70 @@
+from nose.tools import eq_
+
+from .. import synthetic
+from ..algorithms import SegmentMatcher, SequenceMatcher
+from ..apply import apply
+from ..segmenters import ParagraphsSentencesAndWhitespace
+from ..tokenizers import wikitext_split
+
+
+def test_page():
+    text = synthetic.page(paragraphs=5, sections=2, seed=3)
+    eq_(text, synthetic.page(paragraphs=5, sections=2, seed=3))
+    assert "== " in text
+    assert "{|" in text
+    assert len(synthetic.page(paragraphs=50)) > 5 * len(text)
+
+    scrambled = synthetic.scramble(text, seed=3)
+    eq_(len(scrambled.split("\n")), len(text.split("\n")))
+
+
+def test_page_segments():
+    tokens = wikitext_split.tokenize(synthetic.page(paragraphs=40))
+    segmenter = ParagraphsSentencesAndWhitespace(break_unclosed=True)
+    segments = list(segmenter.segment(tokens))
+    # wikitext_split lexes "|}" as a bar, so tables must end at a paragraph
+    # break for no segment to swallow the rest of the page
+    assert len(segments) > 40
+    assert max(segment.end - segment.start for segment in segments) < \
+        len(tokens) / 10
+
+
+def test_history():
+    text = synthetic.page(paragraphs=5, sections=2, seed=3)
+    texts = list(synthetic.history(text, revisions=20, seed=3))
+    eq_(len(texts), 20)
+    eq_(texts[0], text)
+    eq_(texts, list(synthetic.history(text, revisions=20, seed=3)))
+
+
+def test_edits():
+    text = synthetic.page(paragraphs=5, sections=2, seed=3)
+    edits = [synthetic.typo_fix, synthetic.insert_sentence,
+             synthetic.move_paragraph, synthetic.blank_section,
+             synthetic.template_churn, synthetic.talk_append]
+    for edit in edits:
+        revisions = list(synthetic.revisions(text, revisions=6,
+                                             edits=[edit]))
+        eq_(revisions[0].edit, None)
+        eq_({r.edit for r in revisions[1:]}, {edit.__name__})
+        assert revisions[1].text != text, edit.__name__
+
+    vandalized, reverted = synthetic.blank_section(
+        synthetic.random.Random(0), ["foo"], text)
+    eq_(reverted, text)
+    assert len(vandalized) < len(text)
+
+    grown = list(synthetic.history(text, revisions=5,
+                                   edits=[synthetic.talk_append]))
+    for last_text, text in zip(grown, grown[1:]):
+        assert text.startswith(last_text.rstrip())
+
+
+def test_process():
+    texts = list(synthetic.history(synthetic.page(paragraphs=5), 10))
+    for engine in (SegmentMatcher(wikitext_split),
+                   SequenceMatcher(wikitext_split)):
+        processor = engine.processor()
+        for text in texts:
+            operations, a, b = processor.process(text)
+            eq_(''.join(apply(operations, a, b)), text)
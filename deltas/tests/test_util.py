@@ -1,6 +1,7 @@
 from nose.tools import eq_
 
-from ..util import LookAhead
+from ..util import (LookAhead, LRUCache, common_prefix_length,
+                    common_suffix_length, edit_span)
 
 
 def test_lookahead_list():
@@ -36,3 +37,45 @@ def test_lookahead_identity():
 
     eq_(l1, l2)
     eq_(id(l1), id(l2))  # Confirms same memory location
+
+
+def test_common_prefix_and_suffix():
+    eq_(common_prefix_length("foobar", "foobaz"), 5)
+    eq_(common_prefix_length("", "foo"), 0)
+    eq_(common_prefix_length([1, 2, 3], [1, 2, 3, 4]), 3)
+    eq_(common_suffix_length("foobar", "bazbar"), 3)
+    eq_(common_suffix_length("foobar", "bazbar", limit=2), 2)
+    eq_(common_suffix_length([1, 2, 3], [0, 3]), 1)
+
+
+def test_edit_span():
+    eq_(edit_span("This is a sentence.", "This is not a sentence."),
+        (8, 8, 12))
+    eq_(edit_span("aaaa", "aaaaaa"), (4, 4, 6))
+    eq_(edit_span("abcabc", "abc"), (3, 6, 3))
+    eq_(edit_span("foo", "foo"), (3, 3, 3))
+    # Sequences whose slices don't compare by value are compared by item
+    eq_(edit_span(range(5), [0, 1, 9, 3, 4]), (2, 3, 3))
+    eq_(edit_span([1, 2], (1, 2, 3)), (2, 2, 3))
+
+
+def test_lookahead_skip():
+    look_ahead = LookAhead(iter(range(10)))
+    look_ahead.skip(3)
+    eq_(look_ahead.i, 3)
+    eq_(look_ahead.pop(), 3)
+    look_ahead.skip(0)
+    eq_(look_ahead.peek(), 4)
+    look_ahead.skip(6)
+    assert look_ahead.empty()
+
+
+def test_lru_cache():
+    cache = LRUCache(2)
+    cache["a"] = 1
+    cache["b"] = 2
+    eq_(cache.get("a"), 1)
+    cache["c"] = 3
+    eq_(cache.get("b"), None)
+    eq_(cache.get("a"), 1)
+    eq_(list(cache), ["c", "a"])
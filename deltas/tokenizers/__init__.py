@@ -12,10 +12,18 @@ based on a lexicon.
     a :class:`~deltas.RegexTokenizer` that splits text into words,
     punctuation, symbols and whitespace as well as wikitext markup elements
     (e.g. ('dcurly_open', "{{") and ('bold', "'''"))
+
+:class:`~deltas.TokenStream` is a compact alternative to a `list` of
+:class:`~deltas.Token` that can be produced with
+:meth:`~deltas.Tokenizer.tokenize_compact`.  A :class:`~deltas.Vocabulary`
+maps tokens to integer ids that are cheap to hash and compare.
 """
 from .tokenizer import Tokenizer, RegexTokenizer
 from .token import Token
+from .token_stream import TokenStream
+from .vocabulary import Vocabulary
 from .text_split import text_split
 from .wikitext_split import wikitext_split
 
-__all__ = [Tokenizer, RegexTokenizer, Token, text_split, wikitext_split]
+__all__ = [Tokenizer, RegexTokenizer, Token, TokenStream, Vocabulary,
+           text_split, wikitext_split]
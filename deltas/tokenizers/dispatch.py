@@ -0,0 +1,195 @@
+"""
+A first-character dispatch scanner for :class:`~deltas.RegexTokenizer`.
+
+A lexicon is normally compiled into a single alternation of named groups and
+the regex engine tries every alternative in order at each position in the
+text.  :class:`DispatchScanner` works out which lexicon entries could possibly
+start with a given character and compiles a smaller alternation for each
+distinct set of candidates.  Since the candidates keep their lexicon order,
+the first alternative to match is the same one that the full alternation
+would have chosen.
+
+.. autoclass:: deltas.tokenizers.dispatch.DispatchScanner
+    :members:
+"""
+import re
+
+try:
+    from re import _constants as sre_constants
+    from re import _parser as sre_parse
+except ImportError:  # Python < 3.11
+    import sre_constants
+    import sre_parse
+
+ANY = object()
+"""
+Stands in for a set of first characters that can't be described.
+"""
+
+CATEGORIES = {
+    sre_constants.CATEGORY_DIGIT: r'\d',
+    sre_constants.CATEGORY_NOT_DIGIT: r'\D',
+    sre_constants.CATEGORY_SPACE: r'\s',
+    sre_constants.CATEGORY_NOT_SPACE: r'\S',
+    sre_constants.CATEGORY_WORD: r'\w',
+    sre_constants.CATEGORY_NOT_WORD: r'\W'
+}
+REPEATS = {sre_constants.MAX_REPEAT, sre_constants.MIN_REPEAT,
+           getattr(sre_constants, "POSSESSIVE_REPEAT", None)}
+ZERO_WIDTH = {sre_constants.AT, sre_constants.ASSERT,
+              sre_constants.ASSERT_NOT}
+
+
+class DispatchScanner:
+    """
+    Constructs a scanner that matches a lexicon by dispatching on the first
+    character at each position.  Sub-patterns are compiled lazily as new
+    characters are encountered.
+
+    :Parameters:
+        lexicon : `list` ( ( `str`, `str` ) )
+            A list of (name, pattern) pairs
+    """
+    def __init__(self, lexicon):
+        self.lexicon = lexicon
+        self.first_chars = [first_chars(pattern) for _, pattern in lexicon]
+        self.char_regexes = {}
+        self.candidate_regexes = {}
+
+    def finditer(self, text, pos=0):
+        """
+        Returns an iterator over all of the non-overlapping matches in `text`
+        starting at `pos`.  This mirrors :meth:`re.Pattern.finditer`.
+        """
+        char_regexes = self.char_regexes
+        length = len(text)
+
+        while pos < length:
+            char = text[pos]
+            regex = char_regexes.get(char, ANY)
+            if regex is ANY:
+                regex = self._build(char)
+
+            match = regex.match(text, pos) if regex is not None else None
+            if match is None:
+                pos += 1
+            else:
+                yield match
+                pos = match.end() if match.end() > pos else pos + 1
+
+    def _build(self, char):
+        candidates = tuple(
+            i for i, first_regex in enumerate(self.first_chars)
+            if first_regex is None or first_regex.match(char))
+
+        if candidates not in self.candidate_regexes:
+            if len(candidates) > 0:
+                self.candidate_regexes[candidates] = compile_lexicon(
+                    [self.lexicon[i] for i in candidates])
+            else:
+                self.candidate_regexes[candidates] = None
+
+        regex = self.candidate_regexes[candidates]
+        self.char_regexes[char] = regex
+        return regex
+
+    def __getstate__(self):
+        return self.lexicon
+
+    def __setstate__(self, lexicon):
+        self.__init__(lexicon)
+
+
+def compile_lexicon(lexicon):
+    """
+    Compiles a lexicon into a single alternation of named groups.
+    """
+    return re.compile('|'.join('(?P<{0}>{1})'.format(name, pattern)
+                               for name, pattern in lexicon))
+
+
+def first_chars(pattern):
+    """
+    Returns a compiled regex that matches any single character that
+    `pattern` could start with, or `None` if that can't be determined.  The
+    regex may match characters that can't actually start a match, but it
+    never fails to match one that can.
+    """
+    parsed = sre_parse.parse(pattern)
+    # SubPattern.pattern was renamed to SubPattern.state in Python 3.8
+    state = getattr(parsed, "state", None) or parsed.pattern
+    if state.flags & re.IGNORECASE:
+        return None
+
+    pieces, nullable = _first(parsed)
+    if pieces is ANY or nullable or len(pieces) == 0:
+        return None
+    else:
+        return re.compile('|'.join(pieces))
+
+
+def _first(subpattern):
+    pieces = []
+    for op, av in subpattern:
+        item_pieces, nullable = _first_item(op, av)
+        if item_pieces is ANY:
+            return ANY, False
+        pieces.extend(item_pieces)
+        if not nullable:
+            return pieces, False
+
+    return pieces, True
+
+
+def _first_item(op, av):
+    if op is sre_constants.LITERAL:
+        return [re.escape(chr(av))], False
+    elif op is sre_constants.IN:
+        piece = _first_in(av)
+        return (ANY if piece is ANY else [piece]), False
+    elif op is sre_constants.SUBPATTERN:
+        if len(av) == 2:  # ( group, subpattern ) before Python 3.6
+            group, subpattern = av
+        else:
+            group, add_flags, del_flags, subpattern = av
+            if add_flags & re.IGNORECASE:
+                return ANY, False
+        return _first(subpattern)
+    elif op is sre_constants.BRANCH:
+        pieces = []
+        nullable = False
+        for branch in av[1]:
+            branch_pieces, branch_nullable = _first(branch)
+            if branch_pieces is ANY:
+                return ANY, False
+            pieces.extend(branch_pieces)
+            nullable = nullable or branch_nullable
+        return pieces, nullable
+    elif op in REPEATS:
+        min_repeat, max_repeat, subpattern = av
+        pieces, nullable = _first(subpattern)
+        return pieces, nullable or min_repeat == 0
+    elif op in ZERO_WIDTH:
+        return [], True
+    elif op is getattr(sre_constants, "ATOMIC_GROUP", None):
+        return _first(av)
+    else:
+        return ANY, False
+
+
+def _first_in(items):
+    negate = False
+    parts = []
+    for op, av in items:
+        if op is sre_constants.NEGATE:
+            negate = True
+        elif op is sre_constants.LITERAL:
+            parts.append(re.escape(chr(av)))
+        elif op is sre_constants.RANGE:
+            parts.append(re.escape(chr(av[0])) + "-" + re.escape(chr(av[1])))
+        elif op is sre_constants.CATEGORY and av in CATEGORIES:
+            parts.append(CATEGORIES[av])
+        else:
+            return ANY
+
+    return "[" + ("^" if negate else "") + "".join(parts) + "]"
@@ -0,0 +1,54 @@
+import pickle
+
+from nose.tools import eq_
+
+from ..dispatch import (DispatchScanner, _first_item, compile_lexicon,
+                        first_chars, sre_constants, sre_parse)
+from ..text_split import LEXICON as TEXT_LEXICON
+from ..wikitext_split import LEXICON as WIKITEXT_LEXICON
+from .test_tokenizer import TEXT
+
+
+def test_first_chars():
+    eq_(first_chars(r"\{\{").pattern, r"\{")
+    assert first_chars(r"'''|\[\[").match("[")
+    assert not first_chars(r"'''|\[\[").match("{")
+    assert first_chars(r"(?:\n\r?|[^\S\n\r]+)").match(" ")
+    assert not first_chars(r"(?:\n\r?|[^\S\n\r]+)").match("\r")
+    assert first_chars(r"a?b").match("b")
+    eq_(first_chars(r"."), None)
+    eq_(first_chars(r"a*"), None)
+    eq_(first_chars(r"(?i)foo"), None)
+
+
+def test_first_item_subpattern():
+    # Before Python 3.6, a group was parsed as ( group, subpattern )
+    subpattern = sre_parse.parse(r"ab|c")
+    for av in ((1, subpattern), (1, 0, 0, subpattern)):
+        eq_(_first_item(sre_constants.SUBPATTERN, av), (["a", "c"], False))
+
+
+def test_finditer():
+    for lexicon in (TEXT_LEXICON, WIKITEXT_LEXICON):
+        regex = compile_lexicon(lexicon)
+        scanner = DispatchScanner(lexicon)
+
+        expected = [(m.start(), m.group(0), m.lastgroup)
+                    for m in regex.finditer(TEXT)]
+        eq_([(m.start(), m.group(0), m.lastgroup)
+             for m in scanner.finditer(TEXT)], expected)
+        eq_([(m.start(), m.group(0), m.lastgroup)
+             for m in scanner.finditer(TEXT, 20)],
+            [(m.start(), m.group(0), m.lastgroup)
+             for m in regex.finditer(TEXT, 20)])
+
+        scanner = pickle.loads(pickle.dumps(scanner))
+        eq_([(m.start(), m.group(0), m.lastgroup)
+             for m in scanner.finditer(TEXT)], expected)
+
+
+def test_unmatched():
+    lexicon = [('word', r'\w+'), ('open', r'<ref\b[^>]*>')]
+    text = "foo <ref> !! <re bar"
+    eq_([m.group(0) for m in DispatchScanner(lexicon).finditer(text)],
+        [m.group(0) for m in compile_lexicon(lexicon).finditer(text)])
@@ -0,0 +1,39 @@
+import pickle
+
+from nose.tools import eq_
+
+from ..token import TYPE_NAMES, Token, type_code, type_codes, type_mask
+
+
+def test_type_code():
+    token = Token("foo", type="word")
+    eq_(token.type, "word")
+    eq_(TYPE_NAMES[token.code], "word")
+    eq_(token.code, type_code("word"))
+    eq_(Token("foo").code, 0)
+
+    token.type = "other_word"
+    eq_(token.type, "other_word")
+
+
+def test_type_codes():
+    class TypedStr(str):
+        type = "word"
+
+    eq_(type_codes([Token("foo", type="word"), Token("bar")]),
+        [type_code("word"), 0])
+    eq_(type_codes([Token(" ", type="whitespace"), TypedStr("foo")]),
+        [type_code("whitespace"), type_code("word")])
+
+
+def test_type_mask():
+    mask = type_mask(["word", "period"])
+    assert (mask >> Token("foo", type="word").code) & 1
+    assert (mask >> Token(".", type="period").code) & 1
+    assert not (mask >> Token(" ", type="whitespace").code) & 1
+    assert not (mask >> Token("bar").code) & 1
+
+
+def test_pickle():
+    token = Token("foo", type="word")
+    eq_(pickle.loads(pickle.dumps(token)).type, "word")
@@ -0,0 +1,80 @@
+import pickle
+
+from nose.tools import eq_
+
+from ..text_split import text_split
+from ..token import Token
+from ..token_stream import TokenStream, token_offsets
+from ..tokenizer import RegexTokenizer
+from ..wikitext_split import wikitext_split
+
+TEXT = "As a sentence, this includes [[punctuation]]. \n" + \
+       "\n" + \
+       "And then we have {{another}} sentence here!"
+
+
+def test_tokenize_compact():
+    for tokenizer in (text_split, wikitext_split):
+        expected = tokenizer.tokenize(TEXT)
+        stream = tokenizer.tokenize_compact(TEXT)
+
+        eq_(len(stream), len(expected))
+        eq_(list(stream), expected)
+        eq_([t.type for t in stream], [t.type for t in expected])
+        eq_(str(stream), TEXT)
+        eq_(stream[3], expected[3])
+        eq_(stream[-1], expected[-1])
+        eq_(stream[-1].type, expected[-1].type)
+
+
+def test_slicing():
+    expected = wikitext_split.tokenize(TEXT)
+    stream = wikitext_split.tokenize_compact(TEXT)
+
+    sub_stream = stream[4:12]
+    assert sub_stream.text is stream.text
+    assert sub_stream.offsets is stream.offsets
+    eq_(list(sub_stream), expected[4:12])
+    eq_(str(sub_stream), ''.join(expected[4:12]))
+    eq_(list(sub_stream[2:4]), expected[6:8])
+    eq_(sub_stream[-1], expected[11])
+    eq_(list(stream[10:4]), [])
+    eq_(stream[::2], expected[::2])
+
+
+def test_from_tokens():
+    tokens = [Token("foo", type="word"), Token(" ", type="whitespace"),
+              Token("bar", type="word"), Token("!")]
+    stream = TokenStream.from_tokens(tokens)
+
+    eq_(list(stream), tokens)
+    eq_([t.type for t in stream], ["word", "whitespace", "word", None])
+
+
+def test_pickling():
+    stream = wikitext_split.tokenize_compact(TEXT)[2:10]
+    eq_(list(pickle.loads(pickle.dumps(stream))), list(stream))
+
+
+def test_gap():
+    # Characters that the lexicon skips are left out as tokenize() would
+    tokenizer = RegexTokenizer([('word', r'\w+')])
+    stream = tokenizer.tokenize_compact("foo bar")
+    eq_(list(stream), tokenizer.tokenize("foo bar"))
+    eq_(str(stream), "foobar")
+
+
+def test_offsets():
+    tokens = wikitext_split.tokenize(TEXT)
+    stream = wikitext_split.tokenize_compact(TEXT)
+    offsets = token_offsets(tokens)
+    eq_(list(token_offsets(stream)), list(offsets))
+    eq_(offsets[-1], len(TEXT))
+    for i, token in enumerate(tokens):
+        eq_(TEXT[offsets[i]:offsets[i + 1]], token)
+        eq_(stream.offset(i), offsets[i])
+
+    view = stream[5:9]
+    eq_(list(view.char_offsets()), list(offsets[5:10]))
+    eq_(view.offset(4), offsets[9])
+    eq_(TEXT[view.offset(0):view.offset(len(view))], str(view))
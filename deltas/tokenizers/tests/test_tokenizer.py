@@ -0,0 +1,114 @@
+import io
+import pickle
+
+from nose.tools import eq_
+
+from ..dispatch import DispatchScanner
+from ..text_split import text_split
+from ..tokenizer import RegexTokenizer, Tokenizer
+from ..wikitext_split import wikitext_split
+
+TEXT = "As a sentence, this 34 includes punctuation. \n" + \
+       "\n" + \
+       "==Header!==\n" + \
+       "[//google.com foo] https://website.gov?param=value\n" + \
+       "peoples' ain't d’encyclopédie\n" + \
+       "<ref name=\"doi10.1093/qjmam/1.1.287\">" + \
+       "https://web.archive.org/web/20150905180420/" \
+       "http://www.turing.org.uk/sources/biblio3.html|archive-date=5" + \
+       "</ref> {{cite|foo=bar}} '''some bold''' text m80\r\n\r\n"
+
+
+def test_tokenize_chunks():
+    for tokenizer in (text_split, wikitext_split):
+        expected = tokenizer.tokenize(TEXT)
+
+        for size in (1, 2, 7, 64, len(TEXT)):
+            chunks = [TEXT[i:i + size] for i in range(0, len(TEXT), size)]
+            tokens = list(tokenizer.tokenize_chunks(chunks))
+            eq_(tokens, expected)
+            eq_([t.type for t in tokens], [t.type for t in expected])
+
+
+def test_tokenize_chunks_small_lookahead():
+    chunks = [TEXT[i:i + 5] for i in range(0, len(TEXT), 5)]
+    tokens = list(wikitext_split.tokenize_chunks(chunks, lookahead=200))
+    eq_(tokens, wikitext_split.tokenize(TEXT))
+
+
+def test_tokenize_chunks_file():
+    tokens = list(wikitext_split.tokenize_chunks(io.StringIO(TEXT)))
+    eq_(tokens, wikitext_split.tokenize(TEXT))
+
+    eq_(list(wikitext_split.tokenize_chunks([])), [])
+    eq_(list(wikitext_split.tokenize_chunks(io.StringIO(""))), [])
+
+
+def test_retokenize():
+    edits = [(0, 0, "Foo "), (10, 20, ""), (45, 46, "!!"),
+             (len(TEXT) - 1, len(TEXT), ""), (len(TEXT), len(TEXT), " foo"),
+             (60, 60, "https://en.wikipedia.org/wiki/Foo "),
+             (0, len(TEXT), "Totally different.")]
+    for tokenizer in (text_split, wikitext_split):
+        for start, last_end, replacement in edits:
+            text = TEXT[:start] + replacement + TEXT[last_end:]
+            expected = tokenizer.tokenize(text)
+
+            tokens = tokenizer.retokenize(
+                text, TEXT, tokenizer.tokenize(TEXT))
+            eq_(tokens, expected)
+            eq_([t.type for t in tokens], [t.type for t in expected])
+
+            stream = tokenizer.retokenize(
+                text, TEXT, tokenizer.tokenize_compact(TEXT),
+                span=(start, last_end, start + len(replacement)))
+            eq_(str(stream), text)
+            eq_(list(stream), expected)
+            eq_([t.type for t in stream], [t.type for t in expected])
+
+
+def test_tokenize_many():
+    texts = [TEXT[i:] for i in range(0, 200, 7)]
+    expected = [wikitext_split.tokenize(text) for text in texts]
+
+    for workers in (1, 2):
+        streams = list(wikitext_split.tokenize_many(
+            iter(texts), workers=workers, chunksize=3))
+        eq_(len(streams), len(texts))
+        for stream, tokens in zip(streams, expected):
+            eq_(list(stream), tokens)
+            eq_([t.type for t in stream], [t.type for t in tokens])
+
+
+def test_tokenize_many_gaps():
+    # The lexicon skips whitespace
+    tokenizer = RegexTokenizer([('word', r'\w+'), ('period', r'\.')])
+    texts = ["Foo bar.", "", "Baz."] * 3
+    for workers in (1, 2):
+        streams = list(tokenizer.tokenize_many(texts, workers=workers,
+                                               chunksize=2))
+        eq_([list(stream) for stream in streams],
+            [tokenizer.tokenize(text) for text in texts])
+        eq_(str(streams[0]), "Foobar.")
+
+
+def test_pickle():
+    tokenizer = pickle.loads(pickle.dumps(wikitext_split))
+    eq_(tokenizer.tokenize(TEXT), wikitext_split.tokenize(TEXT))
+    assert isinstance(tokenizer.scanner, DispatchScanner)
+
+
+def test_tokenize_bytes():
+    buffer = (TEXT * 3).encode("utf-8")
+    expected = [(token, token.type)
+                for token in wikitext_split.tokenize(TEXT * 3)]
+
+    for chunk_size, lookahead in ((7, 64), (64, 128), (2 ** 16, 1024)):
+        triples = list(wikitext_split.tokenize_bytes(
+            memoryview(buffer), chunk_size=chunk_size, lookahead=lookahead))
+        eq_([(buffer[o:o + n].decode("utf-8"), type)
+             for o, n, type in triples], expected)
+
+    triples = list(Tokenizer.tokenize_bytes(wikitext_split, buffer))
+    eq_([(buffer[o:o + n].decode("utf-8"), type)
+         for o, n, type in triples], expected)
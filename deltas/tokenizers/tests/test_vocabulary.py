@@ -0,0 +1,40 @@
+import pickle
+
+from nose.tools import eq_
+
+from ..text_split import text_split
+from ..vocabulary import Vocabulary
+from ..wikitext_split import wikitext_split
+
+
+def test_vocabulary():
+    vocabulary = Vocabulary(["foo", "bar"])
+    eq_(len(vocabulary), 2)
+    eq_(vocabulary["bar"], 1)
+    eq_(vocabulary["baz"], 2)
+    assert "baz" in vocabulary
+    assert "herp" not in vocabulary
+
+    eq_(list(vocabulary.encode(["baz", "foo", "derp"])), [2, 0, 3])
+    eq_(vocabulary.decode([3, 1]), ["derp", "bar"])
+    eq_(vocabulary.token(0), "foo")
+
+    unpickled = pickle.loads(pickle.dumps(vocabulary))
+    eq_(unpickled.tokens, vocabulary.tokens)
+    eq_(unpickled["derp"], 3)
+
+
+def test_tokenize_ids():
+    text = "Foo bar.  {{Foo}} [[bar]]!\n\nFoo."
+    for tokenizer in (text_split, wikitext_split):
+        vocabulary = Vocabulary()
+        tokens = tokenizer.tokenize(text)
+
+        ids = tokenizer.tokenize_ids(text, vocabulary)
+        eq_(vocabulary.decode(ids), tokens)
+        eq_([t.type for t in vocabulary.decode(ids)],
+            [t.type for t in tokens])
+
+        # Ids are stable across calls
+        eq_(list(tokenizer.tokenize_ids(text, vocabulary)), list(ids))
+        eq_(len(vocabulary), len(set(tokens)))
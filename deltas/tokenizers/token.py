@@ -2,8 +2,28 @@
 Tokens represent chuncks of text that have semantic meaning.  A Token class that
 extends :class:`str` is provided.
 
+Every token type name is assigned a small integer code the first time it is
+seen.  Tokens store the code rather than the name so that segmenters can test
+types with bit masks (see :func:`~deltas.tokenizers.token.type_mask`).
+
 .. autoclass:: deltas.Token
     :members:
+
+.. autofunction:: deltas.tokenizers.token.type_code
+
+.. autofunction:: deltas.tokenizers.token.type_codes
+
+.. autofunction:: deltas.tokenizers.token.type_mask
+"""
+
+TYPE_NAMES = [None]
+"""
+Token type names indexed by their code.
+"""
+
+TYPE_CODES = {None: 0}
+"""
+Token type codes indexed by their name.
 """
 
 
@@ -11,7 +31,7 @@ class Token(str):
     """
     Constructs a typed sub-string extracted from a text.
     """
-    __slots__ = ("type")
+    __slots__ = ("code", )
 
     def __new__(cls, content, *args, **kwargs):
         if isinstance(content, cls):
@@ -27,13 +47,64 @@ class Token(str):
         yield self
 
     def __init__(self, content, type=None):
-        self.type = str(type) if type is not None else None
+        self.type = type
+
+    @property
+    def type(self):
         """
         An optional value describing the type of token.
         """
+        return TYPE_NAMES[self.code]
+
+    @type.setter
+    def type(self, type):
+        self.code = type_code(str(type) if type is not None else None)
+
+    def __reduce__(self):
+        # Codes are assigned per-process, so pickle the type name instead.
+        return (self.__class__, (str(self), self.type))
 
     def __repr__(self):
         return "{0}({1}, type={2})" \
                .format(self.__class__.__name__,
                        super().__repr__(),
                        repr(self.type))
+
+
+def type_code(name):
+    """
+    Returns the small integer code for a token type name.  A new code is
+    assigned if `name` has not been seen before.
+    """
+    try:
+        return TYPE_CODES[name]
+    except KeyError:
+        code = len(TYPE_NAMES)
+        TYPE_NAMES.append(name)
+        TYPE_CODES[name] = code
+        return code
+
+
+def type_codes(tokens):
+    """
+    Returns a `list` of the type code of each of the `tokens`.  Token-like
+    objects that have a `type` but no `code` are coded by their type.
+    """
+    try:
+        return [token.code for token in tokens]
+    except AttributeError:
+        return [token.code if hasattr(token, "code") else type_code(token.type)
+                for token in tokens]
+
+
+def type_mask(names):
+    """
+    Returns an `int` with a bit set for the code of each of the type `names`.
+    Use ``(mask >> token.code) & 1`` to test whether a token is of one of the
+    types.
+    """
+    mask = 0
+    for name in names:
+        mask |= 1 << type_code(name)
+
+    return mask
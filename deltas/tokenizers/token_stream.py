@@ -0,0 +1,198 @@
+"""
+A :class:`~deltas.TokenStream` is a compact, read-only sequence of tokens.
+Rather than holding a :class:`~deltas.Token` object per token, it stores the
+source text once along with `array`-backed token offsets and type codes.
+:class:`~deltas.Token` objects are constructed lazily when the stream is
+indexed or iterated and slicing a stream does not copy anything.
+
+.. autoclass:: deltas.TokenStream
+    :members:
+
+.. autofunction:: deltas.tokenizers.token_stream.token_offsets
+"""
+from array import array
+from itertools import accumulate
+
+from .token import TYPE_NAMES, Token, type_code
+
+
+class TokenStream:
+    """
+    Constructs a sequence of tokens backed by a single text.
+
+    :Parameters:
+        text : `str`
+            The text that was tokenized
+        offsets : `array` ( `int` )
+            The character offset of the start of each token followed by the
+            offset of the end of the last token.
+        codes : `array` ( `int` )
+            An index into `types` for each token
+        types : `list` ( `str` )
+            Token type names indexed by code.  Defaults to the codes shared by
+            :class:`~deltas.Token`.
+        token_class : `class`
+            The class to construct tokens with
+    """
+    __slots__ = ("text", "offsets", "codes", "types", "token_class",
+                 "_start", "_stop")
+
+    def __init__(self, text, offsets, codes, types=None, token_class=None,
+                 start=0, stop=None):
+        self.text = text
+        self.offsets = offsets
+        self.codes = codes
+        self.types = types if types is not None else TYPE_NAMES
+        self.token_class = token_class or Token
+        self._start = start
+        self._stop = stop if stop is not None else len(codes)
+
+    @classmethod
+    def from_tokens(cls, tokens, token_class=None):
+        """
+        Constructs a :class:`~deltas.TokenStream` from a sequence of tokens.
+        """
+        tokens = list(tokens)
+        codes = [getattr(token, "code", 0) for token in tokens]
+
+        text = ''.join(tokens)
+        offsets = token_offsets(tokens)
+
+        return cls(text, offsets, code_array(len(TYPE_NAMES), codes),
+                   TYPE_NAMES, token_class=token_class)
+
+    def __len__(self):
+        return self._stop - self._start
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            start, stop, step = index.indices(len(self))
+            if step != 1:
+                return [self[i] for i in range(start, stop, step)]
+            stop = max(start, stop)
+            return self.__class__(self.text, self.offsets, self.codes,
+                                  self.types, token_class=self.token_class,
+                                  start=self._start + start,
+                                  stop=self._start + stop)
+        else:
+            if index < 0:
+                index += len(self)
+            if index < 0 or index >= len(self):
+                raise IndexError("TokenStream index out of range")
+            return self._token(self._start + index)
+
+    def __iter__(self):
+        for i in range(self._start, self._stop):
+            yield self._token(i)
+
+    def _token(self, i):
+        return self.token_class(
+            self.text[self.offsets[i]:self.offsets[i + 1]],
+            type=self.types[self.codes[i]])
+
+    def offset(self, index):
+        """
+        Returns the character offset in `text` of the start of the token at
+        `index`.  ``offset(len(self))`` is the end of the last token.
+        """
+        if index < 0 or index > len(self):
+            raise IndexError("TokenStream offset index out of range")
+        return self.offsets[self._start + index]
+
+    def char_offsets(self):
+        """
+        Returns the character offsets in `text` of the start of each token
+        followed by the end of the last token without copying.
+
+        :Returns:
+            A `memoryview` of `int`
+        """
+        return memoryview(self.offsets)[self._start:self._stop + 1]
+
+    def tokens(self):
+        """
+        Returns an iterator over the tokens in the stream.  This method
+        reflects the behavior of :meth:`deltas.Segment.tokens`
+        """
+        return iter(self)
+
+    def __str__(self):
+        return self.text[self.offsets[self._start]:self.offsets[self._stop]]
+
+    def __repr__(self):
+        return "{0}({1})".format(self.__class__.__name__, repr(str(self)))
+
+    def __getstate__(self):
+        return (self.text, _array(self.offsets), _array(self.codes),
+                list(self.types), self.token_class, self._start, self._stop)
+
+    def __setstate__(self, state):
+        (self.text, self.offsets, codes, types,
+         self.token_class, self._start, self._stop) = state
+
+        self.codes = translate_codes(codes, types)
+        self.types = TYPE_NAMES
+
+
+def token_offsets(tokens):
+    """
+    Returns the character offset of the start of each token followed by the
+    end of the last token.  If `tokens` is a :class:`~deltas.TokenStream`,
+    its offsets are returned without copying.  Otherwise, offsets are
+    computed from the lengths of the tokens.
+
+    :Parameters:
+        tokens : `list` ( `str` ) | :class:`~deltas.TokenStream`
+            A sequence of tokens
+
+    :Returns:
+        A sequence of `len(tokens) + 1` `int`
+    """
+    if isinstance(tokens, TokenStream):
+        return tokens.char_offsets()
+
+    lengths = [len(token) for token in tokens]
+    offsets = offset_array(sum(lengths))
+    offsets.append(0)
+    offsets.extend(accumulate(lengths))
+    return offsets
+
+
+def offset_array(text_length):
+    """
+    Returns an empty `array` with an item size large enough to hold offsets
+    into a text of `text_length` characters.
+    """
+    return array('I' if text_length < 2 ** 32 else 'Q')
+
+
+def code_array(n_types, codes=()):
+    """
+    Returns an `array` with an item size large enough to hold codes for
+    `n_types` token types.
+    """
+    return array('B' if n_types <= 256 else 'H', codes)
+
+
+def _array(column):
+    # Columns loaded by deltas.serialization are `memoryview`s
+    if isinstance(column, memoryview):
+        copy = array(column.format)
+        copy.frombytes(column)
+        return copy
+    else:
+        return column
+
+
+def translate_codes(codes, types):
+    """
+    Translates `codes` that index into `types` into the codes assigned to
+    the same type names in this process.  Type codes are assigned
+    per-process so codes that were produced elsewhere (e.g. unpickled or
+    returned from a worker process) must be translated.
+    """
+    translation = [type_code(name) for name in types]
+    if translation != list(range(len(translation))):
+        codes = code_array(len(TYPE_NAMES),
+                           (translation[code] for code in codes))
+    return codes
@@ -1,8 +1,29 @@
-import re
+import codecs
+import os
+from array import array
+from bisect import bisect_left
+from collections import deque
+from itertools import accumulate, islice
 
-import yamlconf
+from ..util import edit_span
+from .dispatch import DispatchScanner, compile_lexicon
+from .token import TYPE_NAMES, Token, type_code
+from .token_stream import (TokenStream, code_array, offset_array,
+                           translate_codes)
 
-from .token import Token
+CHUNK_SIZE = 2 ** 16
+"""
+The number of characters to read at a time from a file-like object.
+"""
+
+LOOKAHEAD = 1024
+"""
+The number of characters to buffer past a match before it is considered
+safe to emit while streaming.  Tokens longer than this are rare (long URLs,
+``<ref>`` tags with many attributes) but a match that is ambiguous for more
+than ``LOOKAHEAD`` characters could be split differently than
+:meth:`RegexTokenizer.tokenize` would split it.
+"""
 
 
 class Tokenizer:
@@ -15,8 +36,173 @@ class Tokenizer:
         """
         raise NotImplementedError()
 
+    def tokenize_chunks(self, chunks, token_class=None):
+        """
+        Tokenizes a text that arrives in pieces.  This default implementation
+        simply joins the chunks together and tokenizes the whole text.
+
+        :Parameters:
+            chunks : `iterable` ( `str` ) | `file`
+                Pieces of a text or a file-like object to `read()` from
+            token_class : `class`
+                A class to construct tokens with
+
+        :Returns:
+            An `iterator` of tokens
+        """
+        text = ''.join(iter_chunks(chunks))
+        return iter(self.tokenize(text, token_class=token_class))
+
+    def tokenize_bytes(self, buffer):
+        """
+        Tokenizes UTF-8 encoded text.  This default implementation decodes
+        the whole buffer and tokenizes the text.
+
+        :Parameters:
+            buffer : `bytes` | `memoryview` | `mmap`
+                UTF-8 encoded text
+
+        :Returns:
+            An `iterator` of (`offset`, `length`, `type`) triples that locate
+            each token in `buffer` by byte offset and length
+        """
+        offset = 0
+        for token in self.tokenize(codecs.decode(buffer, "utf-8")):
+            length = utf8_length(token)
+            yield offset, length, getattr(token, "type", None)
+            offset += length
+
+    def tokenize_compact(self, text, token_class=None):
+        """
+        Tokenizes a text into a compact :class:`~deltas.TokenStream`.
+
+        :Parameters:
+            text : `str`
+                The text to tokenize
+            token_class : `class`
+                A class to construct tokens with
+
+        :Returns:
+            A :class:`~deltas.TokenStream`
+        """
+        return TokenStream.from_tokens(
+            self.tokenize(text, token_class=token_class),
+            token_class=token_class)
+
+    def tokenize_many(self, texts, workers=None, chunksize=64,
+                      token_class=None):
+        """
+        Tokenizes many independent texts using a pool of worker processes.
+        The tokenizer is pickled once and each worker unpickles it the first
+        time that it is seen.  Texts are sent to the workers in batches of
+        `chunksize` and only the offsets and type codes of the tokens are sent
+        back.  Like :meth:`~deltas.Tokenizer.tokenize_compact`, a text with
+        characters that no token matches is tokenized into a stream of the
+        tokens joined together.
+
+        :Parameters:
+            texts : `iterable` ( `str` )
+                Texts to tokenize
+            workers : `int`
+                The number of worker processes to start.  Defaults to the
+                number of CPUs.  If 1, the texts are tokenized in this
+                process.
+            chunksize : `int`
+                The number of texts to send to a worker at a time
+            token_class : `class`
+                A class to construct tokens with
+
+        :Returns:
+            An `iterator` of :class:`~deltas.TokenStream` in the same order
+            as `texts`
+        """
+        if workers == 1:
+            for text in texts:
+                yield self.tokenize_compact(text, token_class=token_class)
+            return
+
+        import pickle
+        from concurrent.futures import ProcessPoolExecutor
+
+        workers = workers or os.cpu_count() or 1
+        texts = iter(texts)
+        # ProcessPoolExecutor only accepts an initializer in Python 3.7+
+        tokenizer = pickle.dumps(self)
+        with ProcessPoolExecutor(workers) as executor:
+            # Keep a few batches queued per worker without reading all of
+            # `texts` into memory
+            pending = deque()
+            backlog = workers * 2
+            while True:
+                while len(pending) < backlog:
+                    batch = list(islice(texts, chunksize))
+                    if len(batch) == 0:
+                        break
+                    pending.append(
+                        (batch, executor.submit(_tokenize_batch, tokenizer,
+                                                batch)))
+
+                if len(pending) == 0:
+                    break
+
+                batch, future = pending.popleft()
+                types, results = future.result()
+                for text, (joined, offsets, codes) in zip(batch, results):
+                    yield TokenStream(text if joined is None else joined,
+                                      offsets, translate_codes(codes, types),
+                                      token_class=token_class)
+
+    def tokenize_ids(self, text, vocabulary, token_class=None):
+        """
+        Tokenizes a text into a sequence of ids.
+
+        :Parameters:
+            text : `str`
+                The text to tokenize
+            vocabulary : :class:`~deltas.Vocabulary`
+                A vocabulary to look up and assign token ids with
+            token_class : `class`
+                A class to construct tokens with
+
+        :Returns:
+            An `array` of `int`
+        """
+        return vocabulary.encode(
+            self.tokenize(text, token_class=token_class))
+
+    def retokenize(self, text, last_text, last_tokens, span=None,
+                   token_class=None):
+        """
+        Tokenizes a new version of a text given the tokens of its previous
+        version.  This default implementation simply tokenizes `text`.
+
+        :Parameters:
+            text : `str`
+                The text to tokenize
+            last_text : `str`
+                The previous version of the text
+            last_tokens : `list` ( :class:`~deltas.Token` ) | :class:`~deltas.TokenStream`
+                The tokens of `last_text`
+            span : ( `int`, `int`, `int` )
+                The (`start`, `last_end`, `end`) character span of the edit
+                such that ``text[start:end]`` replaced
+                ``last_text[start:last_end]``.  If not provided, the span
+                will be inferred.
+            token_class : `class`
+                A class to construct tokens with
+
+        :Returns:
+            Tokens of the same type as `last_tokens`
+        """  # noqa
+        if isinstance(last_tokens, TokenStream):
+            return self.tokenize_compact(text, token_class=token_class)
+        else:
+            return self.tokenize(text, token_class=token_class)
+
     @classmethod
     def from_config(cls, config, name, section_key="tokenizers"):
+        import yamlconf
+
         section = config[section_key][name]
         if 'module' in section:
             return yamlconf.import_module(section['module'])
@@ -28,15 +214,315 @@ class Tokenizer:
 class RegexTokenizer(Tokenizer):
     """
     Uses a lexicon of regular expressions and names to tokenize a text string.
+
+    :Parameters:
+        lexicon : `list` ( ( `str`, `str` ) )
+            A list of (name, pattern) pairs.  When more than one pattern
+            matches, the first one in the lexicon wins.
+        dispatch : `bool`
+            If set, use a :class:`~deltas.tokenizers.dispatch.DispatchScanner`
+            that only tries the patterns that can start with the next
+            character in the text.  Tokens are the same either way.
+
+    The lexicon is not compiled until the tokenizer is first used.
     """
-    def __init__(self, lexicon):
+    def __init__(self, lexicon, dispatch=False):
         self.lexicon = lexicon
-        self.regex = re.compile('|'.join('(?P<{0}>{1})'.format(name, pattern)
-                                         for name, pattern in lexicon))
+        self.dispatch = dispatch
+        self.types = [name for name, pattern in lexicon]
+        self.type_codes = {name: type_code(name) for name in self.types}
+        self._regex = None
+        self._scanner = None
+
+    @property
+    def regex(self):
+        """
+        The lexicon compiled into a single regular expression.
+        """
+        if self._regex is None:
+            self._regex = compile_lexicon(self.lexicon)
+        return self._regex
+
+    @property
+    def scanner(self):
+        """
+        The object whose `finditer()` is used to match the lexicon.
+        """
+        if self._scanner is None:
+            if self.dispatch:
+                self._scanner = DispatchScanner(self.lexicon)
+            else:
+                self._scanner = self.regex
+        return self._scanner
 
     def tokenize(self, text, token_class=None):
         return [t for t in self._tokenize(text, token_class=token_class)]
 
+    def tokenize_chunks(self, chunks, token_class=None, lookahead=LOOKAHEAD):
+        """
+        Tokenizes a text that arrives in pieces without ever holding the
+        whole text in memory.  Tokens are yielded as soon as enough of the
+        text has been read to be sure that they will not change.  A match is
+        held back until at least `lookahead` characters follow it or until the
+        end of the text is reached.
+
+        :Parameters:
+            chunks : `iterable` ( `str` ) | `file`
+                Pieces of a text or a file-like object to `read()` from
+            token_class : `class`
+                A class to construct tokens with
+            lookahead : `int`
+                The number of characters that must follow a match before it
+                is emitted
+
+        :Returns:
+            An `iterator` of tokens
+        """
+        token_class = token_class or Token
+        tokens = {}
+        buffer = ""
+
+        for chunk in iter_chunks(chunks):
+            buffer += chunk
+            safe_end = len(buffer) - lookahead
+            keep_from = 0
+
+            for match in self.scanner.finditer(buffer):
+                if match.end() >= safe_end:
+                    # This match might change once more text arrives
+                    keep_from = match.start()
+                    break
+
+                yield self._token(match, tokens, token_class)
+                keep_from = match.end()
+            else:
+                keep_from = max(keep_from, safe_end)
+
+            buffer = buffer[keep_from:]
+
+        for match in self.scanner.finditer(buffer):
+            yield self._token(match, tokens, token_class)
+
+    def tokenize_bytes(self, buffer, chunk_size=CHUNK_SIZE,
+                       lookahead=LOOKAHEAD):
+        """
+        Tokenizes UTF-8 encoded text without decoding all of it at once or
+        copying the bytes of any token.  `buffer` is decoded `chunk_size`
+        bytes at a time and matched as in
+        :meth:`~deltas.RegexTokenizer.tokenize_chunks`.  Byte offsets are
+        tracked from the lengths of the matches.
+
+        :Parameters:
+            buffer : `bytes` | `memoryview` | `mmap`
+                UTF-8 encoded text
+            chunk_size : `int`
+                The number of bytes to decode at a time
+            lookahead : `int`
+                The number of characters that must follow a match before it
+                is emitted
+
+        :Returns:
+            An `iterator` of (`offset`, `length`, `type`) triples that locate
+            each token in `buffer` by byte offset and length
+        """
+        view = memoryview(buffer)
+        decoder = codecs.getincrementaldecoder("utf-8")()
+        chunks = (decoder.decode(view[i:i + chunk_size],
+                                 final=i + chunk_size >= len(view))
+                  for i in range(0, len(view), chunk_size))
+
+        offset = 0  # Byte offset of text[0]
+        text = ""
+        end = 0  # End of the last emitted match in text
+        for chunk in iter_chunks(chunks):
+            text += chunk
+            safe_end = len(text) - lookahead
+            keep_from = end
+
+            for match in self.scanner.finditer(text, end):
+                if match.end() >= safe_end:
+                    # This match might change once more text arrives
+                    break
+
+                offset += utf8_length(text[end:match.start()])
+                length = utf8_length(match.group(0))
+                yield offset, length, match.lastgroup
+                offset += length
+                end = keep_from = match.end()
+            else:
+                keep_from = max(end, safe_end)
+
+            offset += utf8_length(text[end:keep_from])
+            text = text[keep_from:]
+            end = 0
+
+        for match in self.scanner.finditer(text):
+            offset += utf8_length(text[end:match.start()])
+            length = utf8_length(match.group(0))
+            yield offset, length, match.lastgroup
+            offset += length
+            end = match.end()
+
+    def tokenize_compact(self, text, token_class=None):
+        """
+        Tokenizes a text into a compact :class:`~deltas.TokenStream` without
+        constructing a :class:`~deltas.Token` for each match.  If the lexicon
+        does not match every character of `text`, the stream is built from
+        the tokens of :meth:`~deltas.RegexTokenizer.tokenize` instead, so
+        its `text` is those tokens joined together.
+
+        :Parameters:
+            text : `str`
+                The text to tokenize
+            token_class : `class`
+                A class to construct tokens with
+
+        :Returns:
+            A :class:`~deltas.TokenStream`
+        """
+        offsets = offset_array(len(text))
+        codes = code_array(len(TYPE_NAMES))
+        type_codes = self.type_codes
+        end = 0
+
+        for match in self.scanner.finditer(text):
+            if match.start() != end:
+                break
+            offsets.append(end)
+            codes.append(type_codes[match.lastgroup])
+            end = match.end()
+
+        if end != len(text):
+            # The lexicon skips some characters, so the tokens can't be
+            # located by their offsets in `text`.
+            return super().tokenize_compact(text, token_class=token_class)
+        offsets.append(end)
+
+        return TokenStream(text, offsets, codes, token_class=token_class)
+
+    def tokenize_ids(self, text, vocabulary, token_class=None):
+        """
+        Tokenizes a text into a sequence of ids.  A
+        :class:`~deltas.Token` is only constructed the first time that a
+        token is added to `vocabulary`.
+
+        :Parameters:
+            text : `str`
+                The text to tokenize
+            vocabulary : :class:`~deltas.Vocabulary`
+                A vocabulary to look up and assign token ids with
+            token_class : `class`
+                A class to construct tokens with
+
+        :Returns:
+            An `array` of `int`
+        """
+        token_class = token_class or Token
+        ids = array('I')
+        known_ids = vocabulary.ids
+
+        for match in self.scanner.finditer(text):
+            value = match.group(0)
+            if value in known_ids:
+                ids.append(known_ids[value])
+            else:
+                ids.append(vocabulary.add(
+                    token_class(value, type=match.lastgroup)))
+
+        return ids
+
+    def retokenize(self, text, last_text, last_tokens, span=None,
+                   token_class=None, lookahead=LOOKAHEAD):
+        """
+        Tokenizes a new version of a text given the tokens of its previous
+        version.  Only a window around the edit is re-lexed.  Tokens from the
+        previous version are re-used up to `lookahead` characters before the
+        start of the edit and from the first token boundary after the edit
+        that lines up with a boundary in `last_tokens`.
+
+        :Parameters:
+            text : `str`
+                The text to tokenize
+            last_text : `str`
+                The previous version of the text
+            last_tokens : `list` ( :class:`~deltas.Token` ) | :class:`~deltas.TokenStream`
+                The tokens of `last_text`
+            span : ( `int`, `int`, `int` )
+                The (`start`, `last_end`, `end`) character span of the edit
+                such that ``text[start:end]`` replaced
+                ``last_text[start:last_end]``.  If not provided, the span
+                will be inferred.
+            token_class : `class`
+                A class to construct tokens with
+            lookahead : `int`
+                The number of characters before the edit that are re-lexed
+
+        :Returns:
+            Tokens of the same type as `last_tokens`
+        """  # noqa
+        compact = isinstance(last_tokens, TokenStream)
+        if compact:
+            if last_tokens.types is not TYPE_NAMES or \
+               len(last_tokens) != len(last_tokens.codes):
+                return self.tokenize_compact(text, token_class=token_class)
+            offsets = last_tokens.offsets
+        else:
+            offsets = [0]
+            offsets.extend(accumulate(len(token) for token in last_tokens))
+
+        if offsets[-1] != len(last_text):
+            # The lexicon skipped some characters.  Can't line up offsets.
+            return super().retokenize(text, last_text, last_tokens,
+                                      token_class=token_class)
+
+        start, last_end, end = span or edit_span(last_text, text)
+        delta = end - last_end
+        n_tokens = len(offsets) - 1
+
+        # Find the first token that might have been affected by the edit
+        first = max(0, bisect_left(offsets, start - lookahead) - 1)
+        first = min(first, n_tokens)
+
+        # Re-lex until we line up with an old token boundary after the edit
+        matches = []
+        resume = n_tokens
+        for match in self.scanner.finditer(text, offsets[first]):
+            if match.start() >= end:
+                last_start = match.start() - delta
+                k = bisect_left(offsets, last_start, lo=first)
+                if k < n_tokens and offsets[k] == last_start:
+                    resume = k
+                    break
+            matches.append(match)
+
+        if compact:
+            new_offsets = offset_array(len(text))
+            new_offsets.extend(offsets[:first])
+            new_offsets.extend(match.start() for match in matches)
+            new_offsets.extend(offset + delta for offset in offsets[resume:])
+            new_codes = code_array(len(TYPE_NAMES),
+                                   last_tokens.codes[:first])
+            new_codes.extend(self.type_codes[match.lastgroup]
+                             for match in matches)
+            new_codes.extend(last_tokens.codes[resume:])
+
+            return TokenStream(text, new_offsets, new_codes,
+                               token_class=token_class)
+        else:
+            token_class = token_class or Token
+            tokens = {}
+            return last_tokens[:first] + \
+                [self._token(match, tokens, token_class)
+                 for match in matches] + \
+                last_tokens[resume:]
+
+    def __getstate__(self):
+        # Type codes are assigned per-process so they are rebuilt on load.
+        return {'lexicon': self.lexicon, 'dispatch': self.dispatch}
+
+    def __setstate__(self, state):
+        self.__init__(**state)
+
     def _tokenize(self, text, token_class=None):
         """
         Tokenizes a text
@@ -47,14 +533,59 @@ class RegexTokenizer(Tokenizer):
         token_class = token_class or Token
         tokens = {}
 
-        for i, match in enumerate(self.regex.finditer(text)):
-            value = match.group(0)
+        for match in self.scanner.finditer(text):
+            yield self._token(match, tokens, token_class)
 
-            try:
-                token = tokens[value]
-            except KeyError:
-                type = match.lastgroup
-                token = token_class(value, type=type)
-                tokens[value] = token
+    @staticmethod
+    def _token(match, tokens, token_class):
+        value = match.group(0)
+
+        try:
+            return tokens[value]
+        except KeyError:
+            token = token_class(value, type=match.lastgroup)
+            tokens[value] = token
+            return token
+
+
+def utf8_length(text):
+    """
+    Returns the number of bytes that `text` occupies when encoded as UTF-8.
+    """
+    return len(text.encode("utf-8"))
+
+
+_worker_tokenizers = {}
+
+
+def _tokenize_batch(pickled_tokenizer, texts):
+    tokenizer = _worker_tokenizers.get(pickled_tokenizer)
+    if tokenizer is None:
+        import pickle
+        tokenizer = pickle.loads(pickled_tokenizer)
+        _worker_tokenizers[pickled_tokenizer] = tokenizer
+
+    results = []
+    for text in texts:
+        stream = tokenizer.tokenize_compact(text)
+        # The text is only sent back if characters were skipped
+        joined = stream.text if len(stream.text) != len(text) else None
+        results.append((joined, stream.offsets, stream.codes))
+
+    return list(TYPE_NAMES), results
+
+
+def iter_chunks(chunks, chunk_size=CHUNK_SIZE):
+    """
+    Normalizes a `str`, a file-like object or an `iterable` of `str` into an
+    `iterator` of non-empty `str` chunks.
+    """
+    if isinstance(chunks, str):
+        chunks = [chunks]
+    elif hasattr(chunks, "read"):
+        f = chunks
+        chunks = iter(lambda: f.read(chunk_size), "")
 
-            yield token
+    for chunk in chunks:
+        if len(chunk) > 0:
+            yield chunk
@@ -0,0 +1,92 @@
+"""
+A :class:`~deltas.Vocabulary` maps the text of tokens to small integer ids.
+A single vocabulary can be shared across all of the revisions of a text so
+that diff algorithms compare and hash `int` rather than `str`.
+
+.. autoclass:: deltas.Vocabulary
+    :members:
+"""
+from array import array
+
+
+class Vocabulary:
+    """
+    Constructs a mapping between tokens and integer ids.  Ids are assigned in
+    the order that tokens are first seen.
+
+    :Parameters:
+        tokens : `iterable` ( `str` )
+            Tokens to pre-populate the vocabulary with
+
+    :Example:
+        >>> from deltas import Vocabulary, text_split
+        >>>
+        >>> vocabulary = Vocabulary()
+        >>> list(vocabulary.encode(text_split.tokenize("foo bar foo")))
+        [0, 1, 2, 1, 0]
+        >>> "".join(vocabulary.decode([2, 1, 0]))
+        'bar foo'
+    """
+    def __init__(self, tokens=None):
+        self.tokens = []
+        self.ids = _Ids(self.tokens)
+        if tokens is not None:
+            self.encode(tokens)
+
+    def __len__(self):
+        return len(self.tokens)
+
+    def __contains__(self, token):
+        return token in self.ids
+
+    def __getitem__(self, token):
+        """
+        Returns the id of `token`, assigning a new one if `token` has never
+        been seen.
+        """
+        return self.ids[token]
+
+    def add(self, token):
+        """
+        Adds `token` to the vocabulary unless an equal token is already
+        present and returns its id.
+        """
+        return self.ids[token]
+
+    def token(self, id):
+        """
+        Returns the first token that was assigned `id`.
+        """
+        return self.tokens[id]
+
+    def encode(self, tokens):
+        """
+        Converts a sequence of tokens into an `array` of ids.
+        """
+        return array('I', map(self.ids.__getitem__, tokens))
+
+    def decode(self, ids):
+        """
+        Converts a sequence of ids into a `list` of tokens.
+        """
+        return list(map(self.tokens.__getitem__, ids))
+
+    def __getstate__(self):
+        return self.tokens
+
+    def __setstate__(self, tokens):
+        self.__init__(tokens)
+
+
+class _Ids(dict):
+    __slots__ = ("tokens", )
+
+    def __init__(self, tokens):
+        super().__init__()
+        self.tokens = tokens
+
+    def __missing__(self, token):
+        id = len(self.tokens)
+        self.tokens.append(token)
+        self[token] = id
+        return id
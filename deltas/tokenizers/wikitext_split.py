@@ -97,4 +97,4 @@ LEXICON = [
     ("etc", r"."),
 ]
 
-wikitext_split = RegexTokenizer(LEXICON)
+wikitext_split = RegexTokenizer(LEXICON, dispatch=True)
@@ -1,4 +1,12 @@
 
+from array import array
+from collections import OrderedDict, deque
+from itertools import islice
+
+# Sequences whose slices compare by value
+_SLICEABLE = (list, tuple, str, bytes, array)
+
+
 class LookAhead:
 
     class DONE:
@@ -53,3 +61,101 @@ class LookAhead:
 
     def empty(self):
         return self.next == self.DONE
+
+    def skip(self, n):
+        """
+        Skips over the next `n` items.
+        """
+        if n > 0 and not self.empty():
+            deque(islice(self.iterable, n - 1), maxlen=0)
+            self.i += n - 1
+            self._load_next()
+
+
+class LRUCache(OrderedDict):
+    """
+    A `dict` that holds at most `maxsize` items.  When full, the least
+    recently used item is evicted to make room for a new one.
+    """
+    def __init__(self, maxsize=1024):
+        super().__init__()
+        self.maxsize = int(maxsize)
+
+    def get(self, key, default=None):
+        try:
+            value = super().__getitem__(key)
+        except KeyError:
+            return default
+        self.move_to_end(key)
+        return value
+
+    def __setitem__(self, key, value):
+        super().__setitem__(key, value)
+        self.move_to_end(key)
+        if len(self) > self.maxsize:
+            self.popitem(last=False)
+
+
+def common_prefix_length(a, b):
+    """
+    Returns the length of the longest common prefix of two sequences.  Slices
+    are compared in a binary search so that the bulk of the comparisons
+    happen in C.  Other indexable sequences (e.g. a
+    :class:`~deltas.TokenStream`) are compared item by item.
+    """
+    if not _sliceable(a, b):
+        length = 0
+        for item_a, item_b in zip(a, b):
+            if item_a != item_b:
+                break
+            length += 1
+        return length
+
+    lo, hi = 0, min(len(a), len(b))
+    while lo < hi:
+        mid = (lo + hi + 1) // 2
+        if a[lo:mid] == b[lo:mid]:
+            lo = mid
+        else:
+            hi = mid - 1
+
+    return lo
+
+
+def common_suffix_length(a, b, limit=None):
+    """
+    Returns the length of the longest common suffix of two sequences.  If
+    `limit` is provided, the suffix will be no longer than `limit`.
+    """
+    a_len, b_len = len(a), len(b)
+    lo, hi = 0, min(a_len, b_len)
+    if limit is not None:
+        hi = min(hi, limit)
+    if not _sliceable(a, b):
+        while lo < hi and a[a_len - lo - 1] == b[b_len - lo - 1]:
+            lo += 1
+        return lo
+
+    while lo < hi:
+        mid = (lo + hi + 1) // 2
+        if a[a_len - mid:a_len - lo] == b[b_len - mid:b_len - lo]:
+            lo = mid
+        else:
+            hi = mid - 1
+
+    return lo
+
+
+def edit_span(a, b):
+    """
+    Returns the span of a single edit that converts `a` into `b` as a
+    tuple of (`start`, `a_end`, `b_end`) such that ``a[:start] == b[:start]``
+    and ``a[a_end:] == b[b_end:]``.
+    """
+    start = common_prefix_length(a, b)
+    suffix = common_suffix_length(a, b, limit=min(len(a), len(b)) - start)
+    return start, len(a) - suffix, len(b) - suffix
+
+
+def _sliceable(a, b):
+    return type(a) is type(b) and isinstance(a, _SLICEABLE)